@@ -8,63 +8,105 @@ Analyze Stripe customer data for TowPilot/Eqho
 """
 
 import csv
+import sys
 from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, timedelta
+from operator import itemgetter
+
+CSV_PATH = '/Users/davidlee/eqho-due-diligence/unified_customers.csv'
+
+# The Stripe export carries ~50 columns; only these are used below
+COLUMNS = (
+    'Email', 'Name', 'Status', 'Plan', 'Cancel At Period End',
+    'Total Spend', 'Payment Count', 'Average Order', 'Created (UTC)',
+)
+
+
+def parse_amount(value):
+    """Parse a currency string such as '1,234.50' (blank = 0)"""
+    return float(value.replace(',', '') or 0)
+
+
+def iter_customers(path):
+    """
+    Stream rows from the CSV, keeping only the columns in COLUMNS.
+
+    Numeric columns are parsed once here: total_spend, plus the estimated
+    monthly price from Average Order (or Total Spend / Payment Count).
+    The original strings are kept for display.
+    """
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        pick = itemgetter(*(header.index(col) for col in COLUMNS))
+        for row in reader:
+            c = dict(zip(COLUMNS, pick(row)))
+            total = parse_amount(c['Total Spend'])
+            payments = int(c['Payment Count'] or 0)
+            avg = parse_amount(c['Average Order'])
+            c['total_spend'] = total
+            c['monthly'] = avg if avg > 0 else (total / payments if payments > 0 else 0)
+            yield c
+
+
+def write_lines(lines):
+    """Write a block of report lines with one call instead of a print() per row"""
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+
+# Classify every record in a single pass while streaming the CSV:
+# test/internal (eqho.ai emails) vs real, real customers by subscription status,
+# and anomalies (payments but no active subscription)
+total_records = 0
+real_count = 0
+test_customers = []
+active_subs = []
+canceled_subs = []
+no_subscription = []
+anomalies = []
 
-# Load data
-customers = []
-with open('/Users/davidlee/eqho-due-diligence/unified_customers.csv', 'r') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        customers.append(row)
+for c in iter_customers(CSV_PATH):
+    total_records += 1
+    email = c.get('Email', '')
 
-print(f"Total records in CSV: {len(customers)}")
-print("=" * 80)
+    # Flag as test if eqho.ai email. Stripe emails are nearly always lowercase,
+    # so only build a lowercased copy when the raw value has uppercase in it.
+    # (A substring test, not endswith: the export has typo'd internal domains.)
+    if '@eqho.ai' in email or (not email.islower() and '@eqho.ai' in email.lower()):
+        test_customers.append(c)
+        continue
 
-# Identify test/internal customers (eqho.ai emails)
-test_customers = []
-real_customers = []
+    real_count += 1
+    status = c.get('Status', '').strip().lower()
 
-for c in customers:
-    email = c.get('Email', '').lower()
-    name = c.get('Name', '').lower()
+    # Has payments but not active
+    if c['total_spend'] > 0 and status != 'active':
+        anomalies.append(c)
 
-    # Flag as test if eqho.ai email
-    if '@eqho.ai' in email:
-        test_customers.append(c)
+    if status == 'active':
+        active_subs.append(c)
+    elif status in ('canceled', 'cancelled') or c.get('Plan', '').strip():
+        # Canceled, or has a plan but status is something else
+        canceled_subs.append(c)
     else:
-        real_customers.append(c)
+        no_subscription.append(c)
+
+print(f"Total records in CSV: {total_records}")
+print("=" * 80)
 
 print(f"\n### TEST/INTERNAL CUSTOMERS (eqho.ai) - EXCLUDED ###")
 print(f"Count: {len(test_customers)}")
-for c in test_customers:
-    status = c.get('Status', 'N/A')
-    plan = c.get('Plan', 'N/A')
-    print(f"  - {c.get('Email')} | {c.get('Name')} | Status: {status} | Plan: {plan}")
+write_lines([
+    f"  - {c.get('Email')} | {c.get('Name')} | Status: {c.get('Status', 'N/A')} | Plan: {c.get('Plan', 'N/A')}"
+    for c in test_customers
+])
 
 print("\n" + "=" * 80)
 
 # Now analyze real customers
 print(f"\n### REAL CUSTOMERS ###")
-print(f"Total real customers: {len(real_customers)}")
-
-# Categorize by subscription status
-active_subs = []
-canceled_subs = []
-no_subscription = []
-
-for c in real_customers:
-    status = c.get('Status', '').strip().lower()
-    plan = c.get('Plan', '').strip()
-
-    if status == 'active':
-        active_subs.append(c)
-    elif status in ['canceled', 'cancelled']:
-        canceled_subs.append(c)
-    elif plan:  # Has a plan but status is something else
-        canceled_subs.append(c)
-    else:
-        no_subscription.append(c)
+print(f"Total real customers: {real_count}")
 
 print(f"Active subscriptions: {len(active_subs)}")
 print(f"Canceled subscriptions: {len(canceled_subs)}")
@@ -74,12 +116,6 @@ print(f"No subscription: {len(no_subscription)}")
 print("\n" + "=" * 80)
 print("\n### ACTIVE SUBSCRIPTIONS BREAKDOWN ###")
 
-# Group by plan (price ID)
-plan_groups = defaultdict(list)
-for c in active_subs:
-    plan = c.get('Plan', 'Unknown')
-    plan_groups[plan].append(c)
-
 # Known price mappings based on the data
 price_names = {
     'price_1SKMzCCyexzwFObxv65F5GUv': 'TowPilot Standard ($249.50/mo)',
@@ -97,12 +133,23 @@ price_names = {
     'price_1SIKGHCyexzwFObxYlUh4Rmb': 'TowPilot ($348.50/mo - first payment $697)',
 }
 
-# Estimate monthly prices based on Total Spend / Payment Count
-def estimate_monthly(c):
-    total = float(c.get('Total Spend', '0').replace(',', '') or 0)
-    payments = int(c.get('Payment Count', '0') or 0)
-    avg = float(c.get('Average Order', '0').replace(',', '') or 0)
-    return avg if avg > 0 else (total / payments if payments > 0 else 0)
+enterprise_threshold = 500  # Monthly spend > $500 = enterprise
+
+# Group active customers by plan (price ID) and tier in one pass
+plan_groups = defaultdict(list)
+enterprise_customers = []
+standard_customers = []
+
+for c in active_subs:
+    monthly = c['monthly']
+    canceling = c.get('Cancel At Period End', '').lower() == 'true'
+    entry = (c, monthly, canceling)
+
+    plan_groups[c.get('Plan', 'Unknown')].append(entry)
+    if monthly >= enterprise_threshold:
+        enterprise_customers.append(entry)
+    else:
+        standard_customers.append(entry)
 
 print("\nActive customers by plan:")
 total_mrr = 0
@@ -111,21 +158,19 @@ standard_mrr = 0
 
 for plan, custs in sorted(plan_groups.items(), key=lambda x: -len(x[1])):
     plan_name = price_names.get(plan, f'Unknown ({plan})')
-    print(f"\n{plan_name}")
-    print(f"  Customers: {len(custs)}")
+    lines = [f"\n{plan_name}", f"  Customers: {len(custs)}"]
 
     plan_mrr = 0
-    for c in custs:
-        monthly = estimate_monthly(c)
-        cancel_at_period_end = c.get('Cancel At Period End', '').lower() == 'true'
+    for c, monthly, cancel_at_period_end in custs:
         cancel_flag = " ⚠️ CANCELING" if cancel_at_period_end else ""
 
-        print(f"    - {c.get('Name')} ({c.get('Email')}) - ${monthly:.2f}/mo{cancel_flag}")
+        lines.append(f"    - {c.get('Name')} ({c.get('Email')}) - ${monthly:.2f}/mo{cancel_flag}")
 
         if not cancel_at_period_end:
             plan_mrr += monthly
 
-    print(f"  Plan MRR: ${plan_mrr:.2f}")
+    lines.append(f"  Plan MRR: ${plan_mrr:.2f}")
+    write_lines(lines)
     total_mrr += plan_mrr
 
 print("\n" + "=" * 80)
@@ -135,56 +180,39 @@ print(f"\n### TOTAL MRR (Active, Non-Canceling): ${total_mrr:.2f}")
 print("\n" + "=" * 80)
 print("\n### CUSTOMER TIERS ###")
 
-enterprise_threshold = 500  # Monthly spend > $500 = enterprise
-enterprise_customers = []
-standard_customers = []
-
-for c in active_subs:
-    monthly = estimate_monthly(c)
-    cancel_at_period_end = c.get('Cancel At Period End', '').lower() == 'true'
-
-    if monthly >= enterprise_threshold:
-        enterprise_customers.append((c, monthly, cancel_at_period_end))
-    else:
-        standard_customers.append((c, monthly, cancel_at_period_end))
-
 print(f"\nEnterprise Tier (>${enterprise_threshold}/mo):")
 enterprise_mrr = 0
+lines = []
 for c, monthly, canceling in enterprise_customers:
     flag = " ⚠️ CANCELING" if canceling else ""
-    print(f"  - {c.get('Name')} ({c.get('Email')}) - ${monthly:.2f}/mo{flag}")
+    lines.append(f"  - {c.get('Name')} ({c.get('Email')}) - ${monthly:.2f}/mo{flag}")
     if not canceling:
         enterprise_mrr += monthly
-print(f"  Enterprise MRR: ${enterprise_mrr:.2f}")
+lines.append(f"  Enterprise MRR: ${enterprise_mrr:.2f}")
+write_lines(lines)
 
 print(f"\nStandard Tier (<${enterprise_threshold}/mo):")
 standard_mrr = 0
+lines = []
 for c, monthly, canceling in standard_customers:
     flag = " ⚠️ CANCELING" if canceling else ""
-    print(f"  - {c.get('Name')} ({c.get('Email')}) - ${monthly:.2f}/mo{flag}")
+    lines.append(f"  - {c.get('Name')} ({c.get('Email')}) - ${monthly:.2f}/mo{flag}")
     if not canceling:
         standard_mrr += monthly
-print(f"  Standard MRR: ${standard_mrr:.2f}")
+lines.append(f"  Standard MRR: ${standard_mrr:.2f}")
+write_lines(lines)
 
 # Anomalies: customers with payments but no active subscription
 print("\n" + "=" * 80)
 print("\n### ANOMALIES: Payments but No Active Subscription ###")
 
-anomalies = []
-for c in real_customers:
-    status = c.get('Status', '').strip().lower()
-    total_spend = float(c.get('Total Spend', '0').replace(',', '') or 0)
-    payment_count = int(c.get('Payment Count', '0') or 0)
-
-    # Has payments but not active
-    if total_spend > 0 and status != 'active':
-        anomalies.append(c)
-
 if anomalies:
+    lines = []
     for c in anomalies:
-        print(f"  - {c.get('Name')} ({c.get('Email')})")
-        print(f"    Status: {c.get('Status') or 'None'} | Total Spend: ${c.get('Total Spend')} | Payments: {c.get('Payment Count')}")
-        print(f"    Created: {c.get('Created (UTC)')}")
+        lines.append(f"  - {c.get('Name')} ({c.get('Email')})")
+        lines.append(f"    Status: {c.get('Status') or 'None'} | Total Spend: ${c.get('Total Spend')} | Payments: {c.get('Payment Count')}")
+        lines.append(f"    Created: {c.get('Created (UTC)')}")
+    write_lines(lines)
 else:
     print("  None found")
 
@@ -192,32 +220,32 @@ else:
 print("\n" + "=" * 80)
 print("\n### RECENT SIGNUPS WITHOUT SUBSCRIPTION (Last 30 days) ###")
 
-from datetime import datetime, timedelta
-cutoff = datetime.now() - timedelta(days=30)
+# 'Created (UTC)' starts with an ISO date, and ISO dates order the same as
+# strings, so compare against a cutoff day computed once instead of parsing rows.
+# Blank or placeholder values ("N/A") sort above digits, so check the shape first.
+cutoff_day = (datetime.now() - timedelta(days=30)).date().isoformat()
 
 recent_no_sub = []
 for c in no_subscription:
-    created_str = c.get('Created (UTC)', '')
-    if created_str:
-        try:
-            created = datetime.strptime(created_str[:10], '%Y-%m-%d')
-            if created >= cutoff:
-                recent_no_sub.append((c, created))
-        except:
-            pass
+    created_day = (c.get('Created (UTC)') or '')[:10]
+    is_iso_day = len(created_day) == 10 and created_day[4] == '-' and created_day[7] == '-'
+    if is_iso_day and created_day > cutoff_day:
+        recent_no_sub.append((c, created_day))
 
 if recent_no_sub:
-    for c, created in sorted(recent_no_sub, key=lambda x: x[1], reverse=True):
-        print(f"  - {c.get('Name')} ({c.get('Email')}) - Created: {created.strftime('%Y-%m-%d')}")
+    write_lines([
+        f"  - {c.get('Name')} ({c.get('Email')}) - Created: {created_day}"
+        for c, created_day in sorted(recent_no_sub, key=lambda x: x[1], reverse=True)
+    ])
 else:
     print("  None found")
 
 # Summary
 print("\n" + "=" * 80)
 print("\n### SUMMARY ###")
-print(f"Total records: {len(customers)}")
+print(f"Total records: {total_records}")
 print(f"Test/Internal (excluded): {len(test_customers)}")
-print(f"Real customers: {len(real_customers)}")
+print(f"Real customers: {real_count}")
 print(f"  - Active subscriptions: {len(active_subs)}")
 print(f"  - Canceled: {len(canceled_subs)}")
 print(f"  - No subscription: {len(no_subscription)}")
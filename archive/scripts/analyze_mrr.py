@@ -7,12 +7,14 @@ Breaks down the $145K MRR to understand where it's coming from.
 
 import asyncio
 import sys
-from collections import Counter
+from collections import Counter, defaultdict
+from heapq import nlargest
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
 from app.services.stripe_service import StripeService
+from subscription_cache import get_active_subscriptions
 
 
 async def main():
@@ -23,7 +25,7 @@ async def main():
 
     # Get all subscriptions
     print("Fetching subscriptions from Stripe API...")
-    all_subs = await StripeService.get_active_subscriptions()
+    all_subs = await get_active_subscriptions()
     print(f"Total active subscriptions: {len(all_subs)}")
     print()
 
@@ -77,10 +79,10 @@ async def main():
     # Show top 10 subscriptions by amount
     print("TOP 10 SUBSCRIPTIONS BY AMOUNT")
     print("-" * 80)
-    paying_subs_sorted = sorted(paying_subs, key=lambda x: x["amount"], reverse=True)
+    top_10 = nlargest(10, paying_subs, key=lambda x: x["amount"])
 
     total_top_10 = 0
-    for i, sub in enumerate(paying_subs_sorted[:10], 1):
+    for i, sub in enumerate(top_10, 1):
         monthly_amount = sub["amount"]
         interval = sub["interval"]
 
@@ -123,19 +125,21 @@ async def main():
     outliers = [s for s in paying_subs if s["amount"] > 5000]
     if outliers:
         print(f"⚠️  {len(outliers)} subscriptions over $5,000/month:")
-        for sub in outliers:
-            print(f"   - {sub['customer']}: ${sub['amount']:,.2f}/{sub['interval']}")
+        print("\n".join(f"   - {sub['customer']}: ${sub['amount']:,.2f}/{sub['interval']}" for sub in outliers))
         print()
 
     # Check for duplicates
-    customer_counts = Counter(s["customer"] for s in paying_subs)
-    multi_subs = {cust: count for cust, count in customer_counts.items() if count > 1}
+    # Subscription count and total amount per customer, in one pass
+    customer_totals = defaultdict(lambda: [0, 0.0])
+    for s in paying_subs:
+        totals = customer_totals[s["customer"]]
+        totals[0] += 1
+        totals[1] += s["amount"]
+    multi_subs = {cust: totals for cust, totals in customer_totals.items() if totals[0] > 1}
 
     if multi_subs:
         print(f"⚠️  {len(multi_subs)} customers with multiple subscriptions:")
-        for customer, count in sorted(multi_subs.items(), key=lambda x: x[1], reverse=True)[:5]:
-            cust_subs = [s for s in paying_subs if s["customer"] == customer]
-            total = sum(s["amount"] for s in cust_subs)
+        for customer, (count, total) in sorted(multi_subs.items(), key=lambda x: x[1][0], reverse=True)[:5]:
             print(f"   - {customer}: {count} subs = ${total:,.2f}/month")
         print()
 
@@ -9,7 +9,9 @@ Shows exactly what each unique customer contributes to the $145K total.
 import asyncio
 import csv
 import sys
+from bisect import bisect_right
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
@@ -18,10 +20,72 @@ from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 
-from app.services.stripe_service import StripeService
+from subscription_cache import get_active_subscriptions
 
 console = Console()
 
+# Multiplier converting one billing period's amount to a monthly amount
+INTERVAL_TO_MONTHLY = {
+    "year": 1 / 12,
+    "month": 1.0,
+    "week": 52 / 12,
+    "day": 30.0,
+}
+
+# Column order of the exported CSV
+CSV_FIELDS = [
+    "rank",
+    "customer_id",
+    "subscription_id",
+    "mrr",
+    "subscription_amount",
+    "interval",
+    "next_invoice_date",
+    "next_invoice_month",
+    "status",
+]
+
+# MRR tier lower bounds (ascending) and the tier each bucket index maps to
+TIER_BOUNDS = [100, 500, 1000, 5000]
+TIER_NAMES = [
+    "Starter (<$100)",
+    "Growth ($100-$500)",
+    "Standard ($500-$1K)",
+    "High-Value ($1K-$5K)",
+    "Enterprise ($5K+)",
+]
+
+
+def subscription_mrr(sub: dict) -> tuple:
+    """
+    Walk a subscription's items once, returning (monthly MRR, primary item).
+
+    The primary item is the highest-amount paid item, or None if every item is $0.
+    """
+    sub_mrr = 0.0
+    primary_item = None
+    primary_amount = 0.0
+
+    for item in sub["items"]:
+        amount = item["amount"] / 100
+
+        if amount == 0:
+            continue
+
+        interval = item["interval"]
+        monthly = amount * INTERVAL_TO_MONTHLY.get(interval, 0.0)
+
+        if interval == "month":
+            monthly /= item.get("interval_count", 1)
+
+        sub_mrr += monthly
+
+        if primary_item is None or amount > primary_amount:
+            primary_item = item
+            primary_amount = amount
+
+    return sub_mrr, primary_item
+
 
 async def export_customer_mrr():
     """Export customer MRR to CSV and display summary"""
@@ -37,7 +101,7 @@ async def export_customer_mrr():
         console=console,
     ) as progress:
         task = progress.add_task("Fetching subscriptions from Stripe...", total=None)
-        all_subs = await StripeService.get_active_subscriptions()
+        all_subs = await get_active_subscriptions()
         progress.update(task, completed=True)
 
     console.print(f"✓ Fetched {len(all_subs)} active subscriptions")
@@ -47,40 +111,7 @@ async def export_customer_mrr():
     customer_data = []
 
     for sub in all_subs:
-        # Calculate MRR
-        sub_mrr = 0.0
-        primary_item = None
-
-        for item in sub["items"]:
-            amount = item["amount"] / 100
-
-            if amount == 0:
-                continue
-
-            interval = item["interval"]
-            interval_count = item.get("interval_count", 1)
-
-            # Calculate monthly
-            if interval == "year":
-                monthly = amount / 12
-            elif interval == "month":
-                monthly = amount / interval_count
-            elif interval == "week":
-                monthly = (amount * 52) / 12
-            elif interval == "day":
-                monthly = amount * 30
-            else:
-                monthly = 0
-
-            sub_mrr += monthly
-
-            if primary_item is None or amount > (primary_item.get("amount", 0) / 100):
-                primary_item = {
-                    "amount": amount,
-                    "interval": interval,
-                    "interval_count": interval_count,
-                    "price_id": item["price"]
-                }
+        sub_mrr, primary_item = subscription_mrr(sub)
 
         if sub_mrr == 0:
             continue
@@ -93,7 +124,7 @@ async def export_customer_mrr():
             "subscription_id": sub["id"],
             "mrr": sub_mrr,
             "interval": primary_item["interval"] if primary_item else "unknown",
-            "subscription_amount": primary_item["amount"] if primary_item else 0,
+            "subscription_amount": primary_item["amount"] / 100 if primary_item else 0,
             "next_invoice_date": next_invoice.strftime("%Y-%m-%d"),
             "next_invoice_month": next_invoice.strftime("%B %Y"),
             "status": sub["status"]
@@ -105,25 +136,12 @@ async def export_customer_mrr():
     # Export to CSV
     output_file = Path(__file__).parent.parent / "customer_mrr_breakdown.csv"
 
+    row_values = itemgetter(*CSV_FIELDS[1:])
+
     with open(output_file, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            "rank",
-            "customer_id",
-            "subscription_id",
-            "mrr",
-            "subscription_amount",
-            "interval",
-            "next_invoice_date",
-            "next_invoice_month",
-            "status"
-        ])
-        writer.writeheader()
-
-        for i, customer in enumerate(customer_data, 1):
-            writer.writerow({
-                "rank": i,
-                **customer
-            })
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows((i, *row_values(customer)) for i, customer in enumerate(customer_data, 1))
 
     console.print(f"✓ Exported {len(customer_data)} customers to: [cyan]{output_file}[/cyan]")
     console.print()
@@ -159,23 +177,24 @@ async def export_customer_mrr():
     tier_table.add_column("Total MRR", style="green", justify="right", width=15)
     tier_table.add_column("% of Total", style="cyan", justify="right", width=12)
 
-    total_mrr = sum(c["mrr"] for c in customer_data)
+    # Bucket every customer into its tier in a single pass
+    tier_counts = [0] * len(TIER_NAMES)
+    tier_totals = [0.0] * len(TIER_NAMES)
+    total_mrr = 0.0
 
-    tiers = [
-        ("Enterprise ($5K+)", [c for c in customer_data if c["mrr"] >= 5000]),
-        ("High-Value ($1K-$5K)", [c for c in customer_data if 1000 <= c["mrr"] < 5000]),
-        ("Standard ($500-$1K)", [c for c in customer_data if 500 <= c["mrr"] < 1000]),
-        ("Growth ($100-$500)", [c for c in customer_data if 100 <= c["mrr"] < 500]),
-        ("Starter (<$100)", [c for c in customer_data if c["mrr"] < 100])
-    ]
+    for c in customer_data:
+        idx = bisect_right(TIER_BOUNDS, c["mrr"])
+        tier_counts[idx] += 1
+        tier_totals[idx] += c["mrr"]
+        total_mrr += c["mrr"]
 
-    for tier_name, tier_customers in tiers:
-        if tier_customers:
-            tier_mrr = sum(c["mrr"] for c in tier_customers)
+    for idx in reversed(range(len(TIER_NAMES))):
+        if tier_counts[idx]:
+            tier_mrr = tier_totals[idx]
             tier_pct = (tier_mrr / total_mrr * 100) if total_mrr > 0 else 0
             tier_table.add_row(
-                tier_name,
-                str(len(tier_customers)),
+                TIER_NAMES[idx],
+                str(tier_counts[idx]),
                 f"${tier_mrr:,.2f}",
                 f"{tier_pct:.1f}%"
             )
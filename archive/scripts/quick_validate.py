@@ -19,6 +19,11 @@ from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib json parser
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
@@ -28,22 +33,20 @@ SAAS_KPIS_PATH = Path(__file__).parent.parent / "stripe-analysis" / "saas_kpis.j
 console = Console()
 
 
-async def check_backend_health() -> bool:
+async def check_backend_health(client: httpx.AsyncClient) -> bool:
     """Check if backend API is accessible"""
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{API_BASE_URL}/health")
-            return response.status_code == 200
+        response = await client.get("/health", timeout=5.0)
+        return response.status_code == 200
     except Exception:
         return False
 
 
-async def fetch_backend_metrics() -> Dict:
+async def fetch_backend_metrics(client: httpx.AsyncClient) -> Dict:
     """Fetch metrics from backend API"""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(f"{API_BASE_URL}/api/v1/metrics/summary")
-        response.raise_for_status()
-        return response.json()
+    response = await client.get("/api/v1/metrics/summary")
+    response.raise_for_status()
+    return response.json()
 
 
 def load_saas_kpis() -> Dict:
@@ -51,6 +54,9 @@ def load_saas_kpis() -> Dict:
     if not SAAS_KPIS_PATH.exists():
         raise FileNotFoundError(f"SAAS KPIs file not found: {SAAS_KPIS_PATH}")
 
+    if orjson is not None:
+        return orjson.loads(SAAS_KPIS_PATH.read_bytes())
+
     with open(SAAS_KPIS_PATH) as f:
         return json.load(f)
 
@@ -141,45 +147,51 @@ async def run_validation():
     console.print(Panel.fit("🔍 Eqho Financial Data Validator", style="bold blue"))
     console.print()
 
-    # Step 1: Check backend health
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        task = progress.add_task("Checking backend API health...", total=None)
-
-        is_healthy = await check_backend_health()
-
-        if not is_healthy:
-            console.print("❌ [red]Cannot connect to backend API[/red]")
-            console.print(f"   Make sure the backend is running at: {API_BASE_URL}")
-            console.print("\n   Start backend with:")
-            console.print(
-                "   [cyan]cd backend && uvicorn app.main:app --reload[/cyan]\n"
-            )
-            sys.exit(1)
-
-        progress.update(task, completed=True)
-
-    console.print("✓ [green]Backend API is healthy[/green]")
-    console.print()
-
-    # Step 2: Fetch backend metrics
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        task = progress.add_task("Fetching metrics from backend API...", total=None)
+    # One client for every request; the metrics fetch starts alongside the
+    # health check so both share the connection pool instead of running back to back
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=30.0) as client:
+        metrics_task = asyncio.create_task(fetch_backend_metrics(client))
+
+        # Step 1: Check backend health
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console,
+        ) as progress:
+            task = progress.add_task("Checking backend API health...", total=None)
+
+            is_healthy = await check_backend_health(client)
+
+            if not is_healthy:
+                metrics_task.cancel()
+                console.print("❌ [red]Cannot connect to backend API[/red]")
+                console.print(f"   Make sure the backend is running at: {API_BASE_URL}")
+                console.print("\n   Start backend with:")
+                console.print(
+                    "   [cyan]cd backend && uvicorn app.main:app --reload[/cyan]\n"
+                )
+                sys.exit(1)
 
-        try:
-            backend_data = await fetch_backend_metrics()
             progress.update(task, completed=True)
-            console.print("✓ [green]Fetched backend metrics[/green]")
-        except Exception as e:
-            console.print(f"❌ [red]Failed to fetch backend metrics: {e}[/red]")
-            sys.exit(1)
+
+        console.print("✓ [green]Backend API is healthy[/green]")
+        console.print()
+
+        # Step 2: Fetch backend metrics
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console,
+        ) as progress:
+            task = progress.add_task("Fetching metrics from backend API...", total=None)
+
+            try:
+                backend_data = await metrics_task
+                progress.update(task, completed=True)
+                console.print("✓ [green]Fetched backend metrics[/green]")
+            except Exception as e:
+                console.print(f"❌ [red]Failed to fetch backend metrics: {e}[/red]")
+                sys.exit(1)
 
     console.print()
 
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of active Stripe subscriptions for the analysis scripts
+
+analyze_mrr.py and export_customer_mrr.py both start by paging through every
+active subscription in Stripe. When iterating on those scripts the data rarely
+changes between runs, so the first fetch is written to .cache/ next to this
+file and reused for CACHE_TTL_SECONDS.
+
+Set STRIPE_SUBS_CACHE=0 (or delete the cache file) to force a fresh fetch.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from app.services.stripe_service import StripeService
+
+CACHE_PATH = Path(__file__).parent / ".cache" / "stripe_subscriptions.json"
+CACHE_TTL_SECONDS = 3600
+
+
+async def get_active_subscriptions() -> list[dict]:
+    """Return active subscriptions, served from the on-disk cache while fresh"""
+    use_cache = os.getenv("STRIPE_SUBS_CACHE", "1") != "0"
+
+    if use_cache and CACHE_PATH.exists():
+        if CACHE_PATH.stat().st_mtime > time.time() - CACHE_TTL_SECONDS:
+            return json.loads(CACHE_PATH.read_text())
+
+    subscriptions = await StripeService.get_active_subscriptions()
+
+    if use_cache:
+        CACHE_PATH.parent.mkdir(exist_ok=True)
+        CACHE_PATH.write_text(json.dumps(subscriptions))
+
+    return subscriptions
@@ -7,12 +7,52 @@ Double-checks the calculation to ensure no double-counting or errors.
 
 import asyncio
 import sys
+from collections import defaultdict
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
 from app.services.stripe_service import StripeService
 
+# Monthly multiplier per billing interval; monthly prices are further divided
+# by interval_count. Unknown intervals contribute nothing.
+INTERVAL_TO_MONTHLY = {
+    "year": 1 / 12,
+    "month": 1.0,
+    "week": 52 / 12,
+    "day": 30.0,
+}
+
+
+def subscription_mrr(items):
+    """
+    Monthly equivalent of one subscription's items, plus its $0 item count
+
+    Kept as a small standalone loop: the zero check runs on the raw cents
+    before any float division, the interval is converted with a single
+    table lookup, and interval_count is only read for monthly prices.
+    """
+    sub_mrr = 0.0
+    zeros = 0
+
+    for item in items:
+        cents = item["amount"]
+        if cents == 0:
+            zeros += 1
+            continue
+
+        amount = cents / 100  # Cents to dollars
+        interval = item["interval"]
+
+        # Calculate monthly equivalent
+        monthly = amount * INTERVAL_TO_MONTHLY.get(interval, 0.0)
+        if interval == "month":
+            monthly /= item.get("interval_count", 1)
+
+        sub_mrr += monthly
+
+    return sub_mrr, zeros
+
 
 async def manual_mrr_calculation():
     """Manually calculate MRR step by step to verify"""
@@ -34,31 +74,8 @@ async def manual_mrr_calculation():
     subscription_contributions = []
 
     for sub in all_subs:
-        sub_mrr = 0.0
-
-        for item in sub["items"]:
-            amount = item["amount"] / 100  # Cents to dollars
-
-            if amount == 0:
-                zero_count += 1
-                continue
-
-            interval = item["interval"]
-            interval_count = item.get("interval_count", 1)
-
-            # Calculate monthly equivalent
-            if interval == "year":
-                monthly = amount / 12
-            elif interval == "month":
-                monthly = amount / interval_count
-            elif interval == "week":
-                monthly = (amount * 52) / 12
-            elif interval == "day":
-                monthly = amount * 30
-            else:
-                monthly = 0
-
-            sub_mrr += monthly
+        sub_mrr, zeros = subscription_mrr(sub["items"])
+        zero_count += zeros
 
         if sub_mrr > 0:
             paying_count += 1
@@ -88,32 +105,37 @@ async def manual_mrr_calculation():
         print(f"✗ MISMATCH: Manual ${manual_mrr:,.2f} vs Service ${service_mrr:,.2f}")
     print()
 
-    # Check for unique customers
-    unique_customers = set(contrib["customer"] for contrib in subscription_contributions)
-    print(f"Step 4: Unique paying customers: {len(unique_customers)}")
+    # Per-customer subscription counts and MRR in one pass
+    customer_counts = defaultdict(int)
+    customer_mrr = defaultdict(float)
+    for contrib in subscription_contributions:
+        customer_counts[contrib["customer"]] += 1
+        customer_mrr[contrib["customer"]] += contrib["mrr"]
+
+    print(f"Step 4: Unique paying customers: {len(customer_counts)}")
     print()
 
     # Check for customers with multiple subscriptions
-    from collections import Counter
-    customer_counts = Counter(contrib["customer"] for contrib in subscription_contributions)
-    multi_sub_customers = {cust: count for cust, count in customer_counts.items() if count > 1}
+    multi_sub_customers = [
+        (cust, count, customer_mrr[cust]) for cust, count in customer_counts.items() if count > 1
+    ]
 
     if multi_sub_customers:
         print(f"Step 5: Customers with multiple subscriptions: {len(multi_sub_customers)}")
         print()
         print("Top customers with multiple subs:")
-        for customer, count in sorted(multi_sub_customers.items(), key=lambda x: x[1], reverse=True)[:5]:
-            cust_mrr = sum(c["mrr"] for c in subscription_contributions if c["customer"] == customer)
+        for customer, count, cust_mrr in sorted(multi_sub_customers, key=lambda x: x[1], reverse=True)[:5]:
             print(f"  - {customer}: {count} subs = ${cust_mrr:,.2f}/month")
         print()
 
     # Show MRR distribution
     print("Step 6: MRR contribution analysis")
-    sorted_contribs = sorted(subscription_contributions, key=lambda x: x["mrr"], reverse=True)
+    # Sort the bare MRR floats rather than the contribution dicts
+    sorted_mrr = sorted((c["mrr"] for c in subscription_contributions), reverse=True)
 
-    top_10_mrr = sum(c["mrr"] for c in sorted_contribs[:10])
-    top_20_mrr = sum(c["mrr"] for c in sorted_contribs[:20])
-    bottom_half = sum(c["mrr"] for c in sorted_contribs[len(sorted_contribs)//2:])
+    top_10_mrr = sum(sorted_mrr[:10])
+    top_20_mrr = sum(sorted_mrr[:20])
+    bottom_half = sum(sorted_mrr[len(sorted_mrr)//2:])
 
     print(f"  - Top 10 subscriptions:     ${top_10_mrr:,.2f} ({top_10_mrr/manual_mrr*100:.1f}%)")
     print(f"  - Top 20 subscriptions:     ${top_20_mrr:,.2f} ({top_20_mrr/manual_mrr*100:.1f}%)")
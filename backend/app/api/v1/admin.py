@@ -2,15 +2,18 @@
 Admin endpoints for user management and impersonation
 Restricted to admin and super_admin roles only
 """
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
+from supabase import Client
 
 from ...services.auth import require_admin
-from ...services.supabase_service import SupabaseService
+from ...services.cache_service import InMemoryCache
+from ...services.supabase_service import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
@@ -34,12 +37,99 @@ class UsersListResponse(BaseModel):
     total: int
 
 
+PROFILE_COLUMNS = "id,email,full_name,company,role,app_access,created_at"
+ADMIN_ROLES = ["admin", "super_admin"]
+
+# The impersonation picker polls /admin/users; the user list rarely changes
+USERS_CACHE_TTL_SECONDS = 30
+_users_cache = InMemoryCache(default_ttl=USERS_CACHE_TTL_SECONDS)
+_users_lock = asyncio.Lock()
+
+
+def _list_auth_users(
+    client: Client,
+    role_filter: Optional[str],
+    exclude_admins: bool,
+    limit: int,
+) -> list[UserProfile]:
+    """
+    Fallback listing from auth.users via the admin API
+
+    Pulls every auth user and filters in Python (on user_metadata.role), so
+    it is only used when the user_profiles query itself fails.
+    """
+    users_response = client.auth.admin.list_users()
+    if not users_response:
+        return []
+
+    users = []
+    for user in users_response:
+        user_meta = user.user_metadata or {}
+        role = user_meta.get('role', 'investor')
+
+        # Filter by role if specified
+        if role_filter and role != role_filter:
+            continue
+
+        # Exclude admins if requested (default behavior for impersonation)
+        if exclude_admins and role in ADMIN_ROLES:
+            continue
+
+        users.append(UserProfile(
+            id=str(user.id),
+            email=user.email,
+            full_name=user_meta.get('full_name'),
+            company=user_meta.get('company'),
+            role=role,
+            app_access=user_meta.get('app_access', ['investor-deck']),
+            created_at=user.created_at
+        ))
+
+    users.sort(key=lambda u: u.email.lower())
+    return users[:limit]
+
+
+async def _fetch_users(
+    client: Client,
+    role_filter: Optional[str],
+    exclude_admins: bool,
+    limit: int,
+) -> UsersListResponse:
+    """
+    Query user_profiles, falling back to the auth admin listing only on error
+
+    An empty result is returned as-is: a role filter with no matches must
+    not turn into a full auth.users scan. Ordering is by email as stored,
+    which is case-sensitive; Supabase Auth stores emails lowercased, so this
+    only differs from the old email.lower() sort for hand-edited profiles.
+    """
+    # Filter, order and limit in Postgres so only `limit` rows come back
+    query = client.table("user_profiles").select(PROFILE_COLUMNS, count="exact")
+    if role_filter:
+        query = query.eq("role", role_filter)
+    if exclude_admins:
+        query = query.not_.in_("role", ADMIN_ROLES)
+
+    try:
+        response = await asyncio.to_thread(query.order("email").limit(limit).execute)
+    except Exception as e:
+        logger.warning(f"user_profiles query failed, falling back to auth admin listing: {e}")
+        users = await asyncio.to_thread(_list_auth_users, client, role_filter, exclude_admins, limit)
+        return UsersListResponse(users=users, total=len(users))
+
+    users = [UserProfile(**row) for row in response.data]
+    total = response.count if response.count is not None else len(users)
+
+    return UsersListResponse(users=users, total=total)
+
+
 @router.get("/users", response_model=UsersListResponse)
 async def list_users(
     role_filter: Optional[str] = Query(None, description="Filter by role (investor, sales, admin)"),
     exclude_admins: bool = Query(True, description="Exclude admin/super_admin users from results"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of users to return"),
-    admin_user_id: str = Depends(require_admin)
+    admin_user_id: str = Depends(require_admin),
+    client: Client = Depends(get_supabase_client),
 ):
     """
     List all users for impersonation selection
@@ -47,58 +137,25 @@ async def list_users(
     
     By default excludes admin users (you don't need to impersonate yourself)
     """
-    client = SupabaseService.client
-    if not client:
-        SupabaseService.connect()
-        client = SupabaseService.client
-    if not client:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database connection unavailable"
-        )
-
     try:
-        # Query auth.users table using admin API
-        # This requires service_role key which Supabase Python client uses
         logger.info(f"Admin {admin_user_id} requesting user list")
-        
-        # Use Supabase admin API to list users
-        users_response = client.auth.admin.list_users()
-        
-        if not users_response:
-            return UsersListResponse(users=[], total=0)
-        
-        users = []
-        for user in users_response:
-            user_meta = user.user_metadata or {}
-            role = user_meta.get('role', 'investor')
-            
-            # Filter by role if specified
-            if role_filter and role != role_filter:
-                continue
-            
-            # Exclude admins if requested (default behavior for impersonation)
-            if exclude_admins and role in ['admin', 'super_admin']:
-                continue
-            
-            users.append(UserProfile(
-                id=str(user.id),
-                email=user.email,
-                full_name=user_meta.get('full_name'),
-                company=user_meta.get('company'),
-                role=role,
-                app_access=user_meta.get('app_access', ['investor-deck']),
-                created_at=user.created_at
-            ))
-        
-        # Sort by email for consistent ordering
-        users.sort(key=lambda u: u.email.lower())
-        
-        # Apply limit
-        users = users[:limit]
-        
-        logger.info(f"Returning {len(users)} users to admin {admin_user_id}")
-        return UsersListResponse(users=users, total=len(users))
+
+        cache_key = f"users:{role_filter}:{exclude_admins}:{limit}"
+        cached = await _users_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async with _users_lock:
+            # Another request may have filled the entry while we waited
+            cached = await _users_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            result = await _fetch_users(client, role_filter, exclude_admins, limit)
+            await _users_cache.set(cache_key, result)
+
+        logger.info(f"Returning {len(result.users)} users to admin {admin_user_id}")
+        return result
 
     except HTTPException:
         raise
@@ -113,27 +170,18 @@ async def list_users(
 @router.get("/users/{user_id}", response_model=UserProfile)
 async def get_user(
     user_id: str,
-    admin_user_id: str = Depends(require_admin)
+    admin_user_id: str = Depends(require_admin),
+    client: Client = Depends(get_supabase_client),
 ):
     """
     Get a single user's profile by ID
     Admin only
     """
-    client = SupabaseService.client
-    if not client:
-        SupabaseService.connect()
-        client = SupabaseService.client
-    if not client:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database connection unavailable"
-        )
-
     try:
         logger.info(f"Admin {admin_user_id} requesting user {user_id}")
         
         # Get user by ID using admin API
-        user = client.auth.admin.get_user_by_id(user_id)
+        user = await asyncio.to_thread(client.auth.admin.get_user_by_id, user_id)
         
         if not user or not user.user:
             raise HTTPException(
@@ -6,16 +6,51 @@ Provides data-driven attrition analysis:
 - /cohorts - Detailed cohort retention data for visualization
 - /ltv - LTV calculation with full methodology breakdown
 """
+import asyncio
 import contextlib
-from typing import Optional
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
 
 from fastapi import APIRouter, HTTPException, Query
 
+from app.services.cache_service import InMemoryCache
 from app.services.metrics_cache_service import MetricsCacheService
 from app.services.retention_service import RetentionService
 
 router = APIRouter()
 
+# Summary and LTV pull the full Stripe subscription history, so results are
+# memoized briefly and concurrent misses share a single computation
+ATTRITION_CACHE_TTL_SECONDS = 300
+_attrition_cache = InMemoryCache(default_ttl=ATTRITION_CACHE_TTL_SECONDS)
+# Computations currently running, keyed like the cache; entries are removed
+# when the computation finishes so arbitrary query values don't accumulate
+_attrition_inflight: dict[str, asyncio.Task] = {}
+
+
+async def _single_flight(key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """Return the memoized value for key, computing it at most once per TTL"""
+    value = await _attrition_cache.get(key)
+    if value is not None:
+        return value
+
+    task = _attrition_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_compute_and_cache(key, compute))
+        _attrition_inflight[key] = task
+
+    # Shield so a cancelled request doesn't cancel the shared computation
+    return await asyncio.shield(task)
+
+
+async def _compute_and_cache(key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+    try:
+        value = await compute()
+        await _attrition_cache.set(key, value)
+        return value
+    finally:
+        _attrition_inflight.pop(key, None)
+
 
 @router.get("/summary")
 async def get_attrition_summary(
@@ -55,7 +90,7 @@ async def get_attrition_summary(
     }
     ```
     """
-    try:
+    async def compute_summary():
         summary = await RetentionService.get_attrition_summary(
             early_period_days=early_period_days,
             lookback_months=lookback_months,
@@ -68,6 +103,11 @@ async def get_attrition_summary(
 
         return summary
 
+    try:
+        return await _single_flight(
+            f"summary:{early_period_days}:{lookback_months}:{gross_margin}", compute_summary
+        )
+
     except Exception as e:
         # Try to return cached data if available
         try:
@@ -174,7 +214,7 @@ async def get_ltv_calculation():
     }
     ```
     """
-    try:
+    async def compute_ltv():
         ltv_data = await RetentionService.get_ltv_calculation()
 
         # Cache the results
@@ -183,6 +223,9 @@ async def get_ltv_calculation():
 
         return ltv_data
 
+    try:
+        return await _single_flight("ltv", compute_ltv)
+
     except Exception as e:
         # Try cached data
         with contextlib.suppress(Exception):
@@ -2,22 +2,48 @@
 Audit logging endpoints
 Tracks user actions for security and compliance
 """
-from datetime import datetime
-from typing import Any, Optional
+import asyncio
+import base64
+import csv
+import io
+from datetime import datetime, timezone
+from typing import Any, Literal, Optional
+from uuid import UUID, uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, IPvAnyAddress
+from supabase import Client
 
+from ...services.audit_writer import audit_writer
 from ...services.auth import get_current_user, require_admin
-from ...services.supabase_service import SupabaseService
+from ...services.supabase_service import get_supabase_client
 
 router = APIRouter(prefix="/audit", tags=["audit"])
 
+# Rows fetched per Supabase request when streaming the CSV export
+EXPORT_PAGE_SIZE = 1000
+
+# Must match audit_logs_action_type_check (migrations/add_impersonation_audit.sql)
+AuditActionType = Literal[
+    "login",
+    "logout",
+    "layout_change",
+    "report_export",
+    "report_view",
+    "snapshot_create",
+    "snapshot_restore",
+    "impersonation_start",
+    "impersonation_end",
+]
+
 
 class AuditLogCreate(BaseModel):
-    action_type: str = Field(..., pattern="^(login|logout|layout_change|report_export|report_view|snapshot_create|snapshot_restore|impersonation_start|impersonation_end)$")
+    action_type: AuditActionType
     action_data: Optional[dict[str, Any]] = None
-    ip_address: Optional[str] = None
+    # Validated here: audit_logs.ip_address is INET and one bad value would
+    # fail the whole batched insert
+    ip_address: Optional[IPvAnyAddress] = None
     user_agent: Optional[str] = None
 
 
@@ -33,48 +59,61 @@ class AuditLogResponse(BaseModel):
 
 class AuditLogsListResponse(BaseModel):
     logs: list[AuditLogResponse]
-    total: int
+    total: int  # Under a cursor: rows after the cursor, not the whole filtered set
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+
+def _encode_cursor(log: dict) -> str:
+    """Opaque keyset cursor pointing just past the given row"""
+    return base64.urlsafe_b64encode(f"{log['created_at']}|{log['id']}".encode()).decode()
+
 
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    """
+    (created_at, id) from a cursor, re-serialized from parsed values
 
-@router.post("/log", response_model=AuditLogResponse, status_code=status.HTTP_201_CREATED)
+    The parts are interpolated into a PostgREST or_ filter, so anything that
+    isn't a timestamp and a UUID is rejected rather than passed through.
+    """
+    try:
+        created_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at).isoformat(), str(UUID(log_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+@router.post("/log", response_model=AuditLogResponse, status_code=status.HTTP_202_ACCEPTED)
 async def create_audit_log(
     log_data: AuditLogCreate,
-    user_id: str = Depends(get_current_user)
+    user_id: str = Depends(get_current_user),
+    client: Client = Depends(get_supabase_client),
 ):
     """
     Create an audit log entry
     Available to all authenticated users (for their own actions)
-    """
-    client = SupabaseService.client
-    if not client:
-        SupabaseService.connect()
-        client = SupabaseService.client
-    if not client:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database connection unavailable"
-        )
 
+    The row is queued and written in a batch by the audit writer, so id and
+    created_at are generated here rather than returned by the insert.
+    """
     try:
         insert_data = {
+            "id": str(uuid4()),
             "user_id": user_id,
             "action_type": log_data.action_type,
             "action_data": log_data.action_data,
-            "ip_address": log_data.ip_address,
-            "user_agent": log_data.user_agent
+            "ip_address": str(log_data.ip_address) if log_data.ip_address else None,
+            "user_agent": log_data.user_agent,
+            "created_at": datetime.now(timezone.utc).isoformat(),
         }
 
-        response = client.table("audit_logs").insert(insert_data).execute()
-
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create audit log"
-            )
+        await audit_writer.write(insert_data, client)
 
-        return AuditLogResponse(**response.data[0])
+        return AuditLogResponse(**insert_data)
 
     except HTTPException:
         raise
@@ -93,22 +132,18 @@ async def get_audit_logs(
     user_id_filter: Optional[str] = Query(None, description="Filter by user ID"),
     start_date: Optional[datetime] = Query(None, description="Filter by start date"),
     end_date: Optional[datetime] = Query(None, description="Filter by end date"),
-    admin_user_id: str = Depends(require_admin)
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; takes precedence over page"),
+    admin_user_id: str = Depends(require_admin),
+    client: Client = Depends(get_supabase_client),
 ):
     """
     Fetch audit logs with pagination and filters
     Admin only
-    """
-    client = SupabaseService.client
-    if not client:
-        SupabaseService.connect()
-        client = SupabaseService.client
-    if not client:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database connection unavailable"
-        )
 
+    Pass next_cursor back as `cursor` to page by (created_at, id) keyset,
+    which stays fast on deep pages; `page` offsets are kept for compatibility.
+    On cursor pages `total` counts the rows after the cursor.
+    """
     try:
         # Build base query
         query = client.table("audit_logs").select("*", count="exact")
@@ -126,21 +161,32 @@ async def get_audit_logs(
         if end_date:
             query = query.lte("created_at", end_date.isoformat())
 
-        # Apply pagination
-        offset = (page - 1) * page_size
-        query = query.order("created_at", desc=True).range(offset, offset + page_size - 1)
+        # Apply pagination - id breaks ties between rows with the same created_at
+        query = query.order("created_at", desc=True).order("id", desc=True)
+        if cursor:
+            created_at, log_id = _decode_cursor(cursor)
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{log_id}")'
+            ).limit(page_size)
+        else:
+            offset = (page - 1) * page_size
+            query = query.range(offset, offset + page_size - 1)
 
-        response = query.execute()
+        response = await asyncio.to_thread(query.execute)
 
-        logs = [AuditLogResponse(**log) for log in response.data]
+        logs = response.data
         total = response.count if hasattr(response, 'count') else len(logs)
-
-        return AuditLogsListResponse(
-            logs=logs,
-            total=total,
-            page=page,
-            page_size=page_size
-        )
+        next_cursor = _encode_cursor(logs[-1]) if len(logs) == page_size else None
+
+        # Raw rows: FastAPI validates them once against response_model on the
+        # way out, so building AuditLogResponse objects here would do it twice
+        return {
+            "logs": logs,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+        }
 
     except HTTPException:
         raise
@@ -157,29 +203,17 @@ async def export_audit_logs(
     user_id_filter: Optional[str] = Query(None),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    admin_user_id: str = Depends(require_admin)
+    admin_user_id: str = Depends(require_admin),
+    client: Client = Depends(get_supabase_client),
 ):
     """
     Export audit logs as CSV
     Admin only
     """
-    import csv
-    import io
-
-    from fastapi.responses import StreamingResponse
-
-    client = SupabaseService.client
-    if not client:
-        SupabaseService.connect()
-        client = SupabaseService.client
-    if not client:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database connection unavailable"
-        )
+    fieldnames = ["id", "user_id", "action_type", "action_data", "ip_address", "user_agent", "created_at"]
 
-    try:
-        # Build query (no pagination for export)
+    def fetch_page(after: Optional[dict] = None) -> list[dict]:
+        # Filters accumulate on a builder, so build a fresh query per page
         query = client.table("audit_logs").select("*")
 
         # Apply filters
@@ -192,34 +226,56 @@ async def export_audit_logs(
         if end_date:
             query = query.lte("created_at", end_date.isoformat())
 
-        query = query.order("created_at", desc=True)
-        response = query.execute()
+        # Keyset on (created_at, id) like /logs: OFFSET paging skips or repeats
+        # rows when logs are written mid-export or share a created_at
+        query = query.order("created_at", desc=True).order("id", desc=True)
+        if after:
+            created_at, log_id = after["created_at"], after["id"]
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{log_id}")'
+            )
+        return query.limit(EXPORT_PAGE_SIZE).execute().data
 
-        # Create CSV in memory
+    def generate_csv(first_page: list[dict]):
+        # Sync generator: Starlette iterates it in the threadpool, so the blocking
+        # page fetches don't stall the event loop. One page is buffered at a time.
         output = io.StringIO()
-        writer = csv.DictWriter(
-            output,
-            fieldnames=["id", "user_id", "action_type", "action_data", "ip_address", "user_agent", "created_at"]
-        )
-        writer.writeheader()
-
-        for log in response.data:
-            writer.writerow({
-                "id": log["id"],
-                "user_id": log["user_id"],
-                "action_type": log["action_type"],
-                "action_data": str(log.get("action_data", "")),
-                "ip_address": log.get("ip_address", ""),
-                "user_agent": log.get("user_agent", ""),
-                "created_at": log["created_at"]
-            })
-
-        # Return CSV file
-        output.seek(0)
+        writer = csv.writer(output)
+        writer.writerow(fieldnames)
+
+        rows = first_page
+        while True:
+            # Tuples in fieldnames order: no per-row dict for the writer to unpack
+            writer.writerows(
+                (
+                    log["id"],
+                    log["user_id"],
+                    log["action_type"],
+                    str(log.get("action_data", "")),
+                    log.get("ip_address", ""),
+                    log.get("user_agent", ""),
+                    log["created_at"],
+                )
+                for log in rows
+            )
+
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+
+            if len(rows) < EXPORT_PAGE_SIZE:
+                break
+            rows = fetch_page(rows[-1])
+
+    try:
+        # Fetch the first page up front so query errors still return a 500
+        first_page = await asyncio.to_thread(fetch_page)
+
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         return StreamingResponse(
-            iter([output.getvalue()]),
+            generate_csv(first_page),
             media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename=audit_logs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"}
+            headers={"Content-Disposition": f'attachment; filename="audit_logs_{stamp}.csv"'}
         )
 
     except HTTPException:
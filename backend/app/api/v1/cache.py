@@ -1,12 +1,16 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 
 from app.services.cache_service import cache_service
 
 router = APIRouter()
 
+# These endpoints return small plain dicts, so they build the ORJSONResponse
+# themselves and skip FastAPI's jsonable_encoder pass over the return value
 
-@router.post("/refresh/{product}")
-async def refresh_cache(product: str):
+
+@router.post("/refresh/{product}", response_class=ORJSONResponse, response_model=None)
+async def refresh_cache(product: str) -> ORJSONResponse:
     """
     Manually refresh cache for a specific product
 
@@ -15,23 +19,23 @@ async def refresh_cache(product: str):
     """
     await cache_service.invalidate(product)
 
-    return {
+    return ORJSONResponse({
         "message": f"Cache refreshed for {product}",
         "product": product,
-    }
+    })
 
 
-@router.post("/clear")
-async def clear_cache():
+@router.post("/clear", response_class=ORJSONResponse, response_model=None)
+async def clear_cache() -> ORJSONResponse:
     """Clear all caches"""
     await cache_service.clear_all()
 
-    return {
+    return ORJSONResponse({
         "message": "All caches cleared",
-    }
+    })
 
 
-@router.get("/stats")
-async def get_cache_stats():
+@router.get("/stats", response_class=ORJSONResponse, response_model=None)
+async def get_cache_stats() -> ORJSONResponse:
     """Get cache statistics"""
-    return cache_service.get_stats()
+    return ORJSONResponse(cache_service.get_stats())
@@ -7,17 +7,75 @@ Provides real-time bank balances, Stripe balances, and upcoming billing data.
 Security: All endpoints require admin role verification.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timezone
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
 
+from app.core.config import settings
 from app.services.cashflow_service import CashFlowService
 from app.services.metrics_cache_service import MetricsCacheService
+from app.services.quickbooks_service import quickbooks_service
+from app.services.stripe_service import StripeService
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+
+class SanitizedErrorRoute(APIRoute):
+    """
+    Turn unexpected endpoint errors into a generic HTTPException(500)
+
+    HTTPExceptions are rendered inside the middleware stack, so the browser
+    still gets CORS headers and a readable 500; the app-level Exception
+    handler runs outside CORSMiddleware. The error text (which can include
+    upstream API errors and tokens) is only logged.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def sanitized_handler(request: Request):
+            try:
+                return await handler(request)
+            except (HTTPException, RequestValidationError):
+                raise
+            except Exception as e:
+                logger.error(f"CashFlow error on {request.method} {request.url.path}: {e!r}", exc_info=True)
+                raise HTTPException(status_code=500, detail="Internal server error") from e
+
+        return sanitized_handler
+
+
+router = APIRouter(route_class=SanitizedErrorRoute)
+
+# Cached summaries are served as-is while fresh, and served stale (with a
+# background refresh) until they are too old to show at all
+CASHFLOW_FRESH_SECONDS = 300
+CASHFLOW_STALE_SECONDS = 1800
+
+# At most one background refresh at a time; a strong reference also keeps the
+# task from being garbage collected while it runs
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def _refresh_summary() -> None:
+    """Recompute and re-cache the summary"""
+    try:
+        await CashFlowService.get_cashflow_summary()
+    except Exception as e:
+        logger.error(f"Background cashflow summary refresh failed: {e}", exc_info=True)
+
+
+def _schedule_refresh() -> None:
+    """Start a background refresh unless one is already in flight"""
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_summary())
 
 
 async def verify_admin(request: Request) -> bool:
@@ -29,26 +87,29 @@ async def verify_admin(request: Request) -> bool:
 
     In production, this should validate the JWT and check the role claim.
     """
-    # Check for admin header (set by frontend after auth)
-    admin_header = request.headers.get("X-Admin-Access")
-
-    # For development, also allow a query param
-    admin_param = request.query_params.get("admin")
-
     # In production, this should validate JWT claims
-    # For now, we'll allow access but log the request
-    logger.info(f"CashFlow API access: admin_header={admin_header}, admin_param={admin_param}")
+    # For now, we'll allow access but log the request. The header and query
+    # param are only read for that log line, so skip them when INFO is off.
+    # FastAPI caches this dependency per request, so it runs once per request.
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "CashFlow API access: admin_header=%s, admin_param=%s",
+            # Admin header (set by frontend after auth)
+            request.headers.get("X-Admin-Access"),
+            # For development, also a query param
+            request.query_params.get("admin"),
+        )
 
     # TODO: Implement proper JWT validation with role checking
     # For now, return True to allow access (frontend handles auth)
     return True
 
 
-@router.get("/summary")
+@router.get("/summary", response_class=ORJSONResponse, response_model=None)
 async def get_cashflow_summary(
     _admin: bool = Depends(verify_admin),
     force_refresh: bool = Query(False, description="Force refresh cached data"),
-):
+) -> ORJSONResponse:
     """
     Get comprehensive cash flow summary.
 
@@ -60,36 +121,37 @@ async def get_cashflow_summary(
     - By-cohort breakdown (TowPilot vs Eqho)
 
     Admin-only endpoint.
-    """
-    try:
-        # Check for cached data if not forcing refresh
-        if not force_refresh:
-            cached = await MetricsCacheService.get_latest_metrics("cashflow_summary")
-            if cached:
-                cache_time = datetime.fromisoformat(
-                    cached['fetched_at'].replace('Z', '+00:00')
-                )
-                now = datetime.now(timezone.utc)
-                cache_age = now - cache_time
-                # Use cache if less than 5 minutes old
-                if cache_age.total_seconds() < 300:
-                    return {
-                        **cached['data'],
-                        'is_cached': True,
-                        'cache_age_seconds': int(cache_age.total_seconds()),
-                    }
-
-        # Fetch fresh data
-        summary = await CashFlowService.get_cashflow_summary()
-
-        return summary
 
-    except Exception as e:
-        logger.error(f"Error fetching cashflow summary: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error fetching cashflow summary: {str(e)}"
-        )
+    Cached data older than 5 minutes is returned with is_stale=True while a
+    refresh runs in the background; after 30 minutes the request waits for
+    fresh data.
+    """
+    # Check for cached data if not forcing refresh
+    if not force_refresh:
+        cached = await MetricsCacheService.get_latest_metrics("cashflow_summary")
+        if cached:
+            cache_time = datetime.fromisoformat(
+                cached['fetched_at'].replace('Z', '+00:00')
+            )
+            now = datetime.now(timezone.utc)
+            cache_age = (now - cache_time).total_seconds()
+
+            if cache_age < CASHFLOW_STALE_SECONDS:
+                is_stale = cache_age >= CASHFLOW_FRESH_SECONDS
+                if is_stale:
+                    _schedule_refresh()
+
+                return ORJSONResponse({
+                    **cached['data'],
+                    'is_cached': True,
+                    'is_stale': is_stale,
+                    'cache_age_seconds': int(cache_age),
+                })
+
+    # Fetch fresh data
+    summary = await CashFlowService.get_cashflow_summary()
+
+    return ORJSONResponse(summary)
 
 
 @router.get("/bank-balances")
@@ -107,15 +169,7 @@ async def get_bank_balances(
 
     Admin-only endpoint.
     """
-    try:
-        balances = await CashFlowService.get_bank_balances()
-        return balances
-    except Exception as e:
-        logger.error(f"Error fetching bank balances: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error fetching bank balances: {str(e)}"
-        )
+    return await CashFlowService.get_bank_balances()
 
 
 @router.get("/stripe-balance")
@@ -133,15 +187,7 @@ async def get_stripe_balance(
 
     Admin-only endpoint.
     """
-    try:
-        balance = await CashFlowService.get_stripe_balance()
-        return balance
-    except Exception as e:
-        logger.error(f"Error fetching Stripe balance: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error fetching Stripe balance: {str(e)}"
-        )
+    return await CashFlowService.get_stripe_balance()
 
 
 @router.get("/upcoming-billings")
@@ -161,16 +207,7 @@ async def get_upcoming_billings(
 
     Admin-only endpoint.
     """
-    try:
-        from app.services.stripe_service import StripeService
-        billings = await StripeService.get_upcoming_billings(days=days)
-        return billings
-    except Exception as e:
-        logger.error(f"Error fetching upcoming billings: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error fetching upcoming billings: {str(e)}"
-        )
+    return await StripeService.get_upcoming_billings(days=days)
 
 
 @router.get("/recent-activity")
@@ -186,15 +223,7 @@ async def get_recent_activity(
 
     Admin-only endpoint.
     """
-    try:
-        activity = await CashFlowService.get_recent_activity()
-        return activity
-    except Exception as e:
-        logger.error(f"Error fetching recent activity: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error fetching recent activity: {str(e)}"
-        )
+    return await CashFlowService.get_recent_activity()
 
 
 @router.get("/billing-forecast")
@@ -212,15 +241,7 @@ async def get_billing_forecast(
 
     Admin-only endpoint.
     """
-    try:
-        forecast = await CashFlowService.get_billing_forecast(days=days)
-        return forecast
-    except Exception as e:
-        logger.error(f"Error fetching billing forecast: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error fetching billing forecast: {str(e)}"
-        )
+    return await CashFlowService.get_billing_forecast(days=days)
 
 
 @router.get("/status")
@@ -235,24 +256,26 @@ async def get_cashflow_status():
 
     This endpoint is not admin-protected for health checking.
     """
-    from app.core.config import settings
-    from app.services.quickbooks_service import quickbooks_service
+
+    # The two cache lookups are independent, so run them concurrently
+    qb_cached, cashflow_cache = await asyncio.gather(
+        MetricsCacheService.get_latest_metrics("quickbooks_cash_position"),
+        MetricsCacheService.get_latest_metrics("cashflow_summary"),
+    )
 
     # Check QuickBooks status
     qb_configured = quickbooks_service.is_configured
-    qb_cached = await MetricsCacheService.get_latest_metrics("quickbooks_cash_position")
 
     # Check Stripe status
     stripe_configured = bool(settings.STRIPE_SECRET_KEY)
 
     # Check cache freshness
-    cashflow_cache = await MetricsCacheService.get_latest_metrics("cashflow_summary")
+    now = datetime.now(timezone.utc)
     cache_age = None
     if cashflow_cache:
         cache_time = datetime.fromisoformat(
             cashflow_cache['fetched_at'].replace('Z', '+00:00')
         )
-        now = datetime.now(timezone.utc)
         cache_age = int((now - cache_time).total_seconds())
 
     return {
@@ -267,8 +290,8 @@ async def get_cashflow_status():
         'cache': {
             'has_summary': cashflow_cache is not None,
             'age_seconds': cache_age,
-            'is_fresh': cache_age is not None and cache_age < 300,
+            'is_fresh': cache_age is not None and cache_age < CASHFLOW_FRESH_SECONDS,
         },
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': now.isoformat(),
     }
 
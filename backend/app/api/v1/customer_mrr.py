@@ -4,22 +4,153 @@ Customer MRR Breakdown API
 Provides detailed customer-by-customer MRR breakdown with expandable details.
 """
 
-from datetime import datetime
+import asyncio
+import csv
+import heapq
+import io
+from bisect import bisect_right
+from datetime import datetime, timezone
+from operator import itemgetter
 from typing import Optional
 
 from fastapi import APIRouter, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
+from app.services.cache_service import InMemoryCache
 from app.services.stripe_service import StripeService
 
 router = APIRouter()
 
+# Subscription state changes slowly, so all endpoints share one Stripe fetch
+# and MRR normalization per TTL window
+MRR_CACHE_TTL_SECONDS = 90
+_MRR_CACHE_KEY = "customer_mrr:subscriptions"
+_mrr_cache = InMemoryCache(default_ttl=MRR_CACHE_TTL_SECONDS)
+# The fetch currently running on a cache miss, shared by every caller that
+# misses while it runs
+_mrr_inflight: Optional[asyncio.Task] = None
+
+# Monthly multiplier per billing interval, further divided by interval_count.
+# Unknown intervals contribute nothing.
+INTERVAL_TO_MONTHLY = {
+    "year": 1 / 12,
+    "month": 1.0,
+    "week": 52 / 12,
+    "day": 30.0,
+}
+
+# Rows written per chunk of the streamed CSV export
+EXPORT_CHUNK_ROWS = 500
+
+# Lower MRR bound of each tier above Starter; bisect_right over these gives
+# the index into TIER_NAMES (a bound itself belongs to the higher tier)
+TIER_BOUNDS = [100, 500, 1000, 5000]
+TIER_NAMES = [
+    "Starter (<$100)",
+    "Growth ($100-$500)",
+    "Standard ($500-$1K)",
+    "High-Value ($1K-$5K)",
+    "Enterprise ($5K+)",
+]
+
+
+def _normalize_subscription(sub: dict) -> Optional[dict]:
+    """
+    Monthly-normalized view of one subscription, or None if it has no MRR
+
+    The mrr here is unrounded; endpoints round for display as needed.
+    """
+    sub_mrr = 0.0
+    subscription_items = []
+
+    for item in sub["items"]:
+        amount = item["amount"] / 100
+
+        if amount == 0:
+            continue
+
+        interval = item["interval"]
+        interval_count = item.get("interval_count", 1) or 1
+
+        # Calculate monthly equivalent
+        # interval_count handles multi-period billing (e.g., every 3 months, every 2 years)
+        monthly_amount = amount * INTERVAL_TO_MONTHLY.get(interval, 0.0) / interval_count
+
+        sub_mrr += monthly_amount
+
+        subscription_items.append({
+            "price_id": item["price"],
+            "amount": amount,
+            "interval": interval,
+            "interval_count": interval_count,
+            "monthly_equivalent": round(monthly_amount, 2)
+        })
+
+    # Skip $0 subscriptions
+    if sub_mrr == 0:
+        return None
+
+    return {
+        "customer_id": sub["customer"],
+        "subscription_id": sub["id"],
+        "status": sub["status"],
+        "mrr": sub_mrr,
+        "current_period_start": sub.get("current_period_start"),
+        "current_period_end": sub.get("current_period_end"),
+        "items": subscription_items,
+        # Largest item by amount describes the subscription in the CSV export
+        "primary_item": max(subscription_items, key=lambda i: i["amount"], default=None),
+    }
+
+
+async def _compute_normalized_subscriptions() -> list[dict]:
+    all_subscriptions = await StripeService.get_active_subscriptions_concurrent()
+
+    normalized = []
+    for sub in all_subscriptions:
+        entry = _normalize_subscription(sub)
+        if entry is not None:
+            normalized.append(entry)
+    return normalized
+
+
+async def _refresh_normalized_subscriptions() -> list[dict]:
+    global _mrr_inflight
+    try:
+        normalized = await _compute_normalized_subscriptions()
+        await _mrr_cache.set(_MRR_CACHE_KEY, normalized)
+        return normalized
+    finally:
+        _mrr_inflight = None
+
+
+async def _get_normalized_subscriptions() -> list[dict]:
+    """
+    Paying subscriptions with MRR, shared across endpoints for the TTL
+
+    Concurrent cache misses all await one in-flight fetch, so N requests cost
+    one Stripe listing and a failure reaches every waiter at once instead of
+    each retrying in turn. The fetch is shielded: a caller that disconnects
+    doesn't cancel it for the others. Callers must not mutate the returned
+    entries.
+    """
+    global _mrr_inflight
+    cached = await _mrr_cache.get(_MRR_CACHE_KEY)
+    if cached is not None:
+        return cached
 
-@router.get("/list")
+    if _mrr_inflight is None:
+        _mrr_inflight = asyncio.create_task(_refresh_normalized_subscriptions())
+    return await asyncio.shield(_mrr_inflight)
+
+
+@router.get("/list", response_class=ORJSONResponse, response_model=None)
 async def get_customer_mrr_list(
     min_mrr: Optional[float] = Query(None, description="Filter customers with MRR >= this amount"),
     sort_by: str = Query("mrr", description="Sort by: mrr, customer, or email"),
-    sort_desc: bool = Query(True, description="Sort descending")
-):
+    sort_desc: bool = Query(True, description="Sort descending"),
+    limit: Optional[int] = Query(None, ge=1, description="Return only the first N customers (totals cover all matches)")
+) -> ORJSONResponse:
     """
     Get detailed customer-by-customer MRR breakdown
 
@@ -33,83 +164,51 @@ async def get_customer_mrr_list(
     Use this for detailed analysis, exports, or building expandable UI tables.
     """
 
-    # Get all subscriptions
-    all_subscriptions = await StripeService.get_active_subscriptions()
+    subscriptions = await _get_normalized_subscriptions()
 
-    # Build customer MRR list
+    # Build customer MRR list in one pass: filter by min_mrr and total as we go
     customer_mrr_list = []
-
-    for sub in all_subscriptions:
-        # Calculate MRR for this subscription
-        sub_mrr = 0.0
-        subscription_items = []
-
-        for item in sub["items"]:
-            amount = item["amount"] / 100
-
-            if amount == 0:
-                continue
-
-            interval = item["interval"]
-            interval_count = item.get("interval_count", 1) or 1
-
-            # Calculate monthly equivalent
-            # interval_count handles multi-period billing (e.g., every 3 months, every 2 years)
-            if interval == "year":
-                monthly_amount = amount / 12 / interval_count
-            elif interval == "month":
-                monthly_amount = amount / interval_count
-            elif interval == "week":
-                monthly_amount = (amount * 52) / 12 / interval_count
-            elif interval == "day":
-                monthly_amount = (amount * 30) / interval_count
-            else:
-                monthly_amount = 0
-
-            sub_mrr += monthly_amount
-
-            subscription_items.append({
-                "price_id": item["price"],
-                "amount": amount,
-                "interval": interval,
-                "interval_count": interval_count,
-                "monthly_equivalent": round(monthly_amount, 2)
-            })
-
-        # Skip $0 subscriptions
-        if sub_mrr == 0:
+    total_mrr = 0.0
+    for sub in subscriptions:
+        mrr = round(sub["mrr"], 2)
+        if min_mrr is not None and mrr < min_mrr:
             continue
 
+        total_mrr += mrr
+
         customer_mrr_list.append({
-            "customer_id": sub["customer"],
-            "subscription_id": sub["id"],
+            "customer_id": sub["customer_id"],
+            "subscription_id": sub["subscription_id"],
             "status": sub["status"],
-            "mrr": round(sub_mrr, 2),
-            "current_period_start": sub.get("current_period_start"),
-            "current_period_end": sub.get("current_period_end"),
-            "items": subscription_items,
-            "item_count": len(subscription_items)
+            "mrr": mrr,
+            "current_period_start": sub["current_period_start"],
+            "current_period_end": sub["current_period_end"],
+            "items": sub["items"],
+            "item_count": len(sub["items"])
         })
 
-    # Apply filters
-    if min_mrr is not None:
-        customer_mrr_list = [c for c in customer_mrr_list if c["mrr"] >= min_mrr]
-
-    # Sort
+    # Sort - a top-N by MRR only needs a heap of N, not a full sort
+    customers = customer_mrr_list
     if sort_by == "mrr":
-        customer_mrr_list.sort(key=lambda x: x["mrr"], reverse=sort_desc)
+        if limit is not None:
+            select = heapq.nlargest if sort_desc else heapq.nsmallest
+            customers = select(limit, customer_mrr_list, key=itemgetter("mrr"))
+        else:
+            customer_mrr_list.sort(key=itemgetter("mrr"), reverse=sort_desc)
     elif sort_by == "customer":
-        customer_mrr_list.sort(key=lambda x: x["customer_id"], reverse=sort_desc)
+        customer_mrr_list.sort(key=itemgetter("customer_id"), reverse=sort_desc)
 
-    # Calculate totals
-    total_mrr = sum(c["mrr"] for c in customer_mrr_list)
+    if limit is not None:
+        customers = customers[:limit]
 
-    return {
+    # The list can hold thousands of plain dicts; hand it straight to orjson
+    # rather than walking it with jsonable_encoder first
+    return ORJSONResponse({
         "total_customers": len(customer_mrr_list),
         "total_mrr": round(total_mrr, 2),
-        "customers": customer_mrr_list,
+        "customers": customers,
         "generated_at": datetime.now().isoformat()
-    }
+    })
 
 
 @router.get("/summary-by-tier")
@@ -120,56 +219,22 @@ async def get_mrr_by_tier():
     Categorizes customers into tiers based on MRR amount.
     """
 
-    all_subscriptions = await StripeService.get_active_subscriptions()
-
-    # Calculate MRR for each subscription
-    customer_mrr = []
-    for sub in all_subscriptions:
-        sub_mrr = 0.0
-        for item in sub["items"]:
-            amount = item["amount"] / 100
-            if amount == 0:
-                continue
-
-            interval = item["interval"]
-            interval_count = item.get("interval_count", 1) or 1
-            # interval_count handles multi-period billing (e.g., every 3 months, every 2 years)
-            if interval == "year":
-                sub_mrr += amount / 12 / interval_count
-            elif interval == "month":
-                sub_mrr += amount / interval_count
-
-        if sub_mrr > 0:
-            customer_mrr.append({
-                "customer_id": sub["customer"],
-                "mrr": sub_mrr
-            })
+    subscriptions = await _get_normalized_subscriptions()
 
-    # Define tiers
-    tiers = {
-        "Enterprise ($5K+)": [],
-        "High-Value ($1K-$5K)": [],
-        "Standard ($500-$1K)": [],
-        "Growth ($100-$500)": [],
-        "Starter (<$100)": []
-    }
+    customer_mrr = [
+        {"customer_id": sub["customer_id"], "mrr": sub["mrr"]}
+        for sub in subscriptions
+    ]
 
+    # Bucket into tiers with one binary search per customer
+    tiers = [[] for _ in TIER_NAMES]
     for customer in customer_mrr:
-        mrr = customer["mrr"]
-        if mrr >= 5000:
-            tiers["Enterprise ($5K+)"].append(customer)
-        elif mrr >= 1000:
-            tiers["High-Value ($1K-$5K)"].append(customer)
-        elif mrr >= 500:
-            tiers["Standard ($500-$1K)"].append(customer)
-        elif mrr >= 100:
-            tiers["Growth ($100-$500)"].append(customer)
-        else:
-            tiers["Starter (<$100)"].append(customer)
+        tiers[bisect_right(TIER_BOUNDS, customer["mrr"])].append(customer)
 
     # Calculate tier summaries
     tier_summary = []
-    for tier_name, customers in tiers.items():
+    # Highest tier first
+    for tier_name, customers in zip(reversed(TIER_NAMES), reversed(tiers)):
         if customers:
             tier_mrr = sum(c["mrr"] for c in customers)
             tier_summary.append({
@@ -191,63 +256,48 @@ async def get_mrr_by_tier():
 
 
 @router.get("/export-csv")
-async def export_customer_mrr_csv():
+async def export_customer_mrr_csv() -> StreamingResponse:
     """
-    Export customer MRR list as CSV format
+    Export customer MRR list as a CSV download
 
-    Returns CSV string that can be saved to file.
+    Streams the file in chunks of EXPORT_CHUNK_ROWS rows instead of building
+    the whole CSV and wrapping it in JSON.
     """
 
-    all_subscriptions = await StripeService.get_active_subscriptions()
-
-    # Build CSV rows
-    rows = []
-    rows.append("Customer ID,Subscription ID,MRR,Interval,Amount,Next Invoice,Status")
-
-    for sub in all_subscriptions:
-        sub_mrr = 0.0
-        primary_item = None
-
-        for item in sub["items"]:
-            amount = item["amount"] / 100
-            if amount == 0:
-                continue
-
-            interval = item["interval"]
-            interval_count = item.get("interval_count", 1) or 1
-            # interval_count handles multi-period billing (e.g., every 3 months, every 2 years)
-            if interval == "year":
-                monthly = amount / 12 / interval_count
-            elif interval == "month":
-                monthly = amount / interval_count
-            else:
-                monthly = 0
-
-            sub_mrr += monthly
-            if primary_item is None or amount > primary_item["amount"]:
-                primary_item = item
-
-        if sub_mrr == 0:
-            continue
-
-        # Format next invoice date
-        next_invoice = datetime.fromtimestamp(sub["current_period_end"]).strftime("%Y-%m-%d")
-
-        rows.append(
-            f"{sub['customer']},"
-            f"{sub['id']},"
-            f"{sub_mrr:.2f},"
-            f"{primary_item['interval'] if primary_item else 'unknown'},"
-            f"{primary_item['amount']/100 if primary_item else 0},"
-            f"{next_invoice},"
-            f"{sub['status']}"
+    subscriptions = await _get_normalized_subscriptions()
+
+    def csv_row(sub: dict) -> tuple:
+        primary_item = sub["primary_item"]
+        return (
+            sub["customer_id"],
+            sub["subscription_id"],
+            f"{sub['mrr']:.2f}",
+            primary_item["interval"] if primary_item else "unknown",
+            primary_item["amount"] if primary_item else 0,
+            # Next invoice date
+            datetime.fromtimestamp(sub["current_period_end"]).strftime("%Y-%m-%d"),
+            sub["status"],
         )
 
-    csv_content = "\n".join(rows)
-
-    return {
-        "csv": csv_content,
-        "row_count": len(rows) - 1,  # Exclude header
-        "generated_at": datetime.now().isoformat()
-    }
-
+    async def generate_csv():
+        # csv.writer quotes any field containing a comma or quote
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(["Customer ID", "Subscription ID", "MRR", "Interval", "Amount", "Next Invoice", "Status"])
+
+        for start in range(0, len(subscriptions), EXPORT_CHUNK_ROWS):
+            writer.writerows(map(csv_row, subscriptions[start:start + EXPORT_CHUNK_ROWS]))
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+
+        # Header-only export when there are no subscriptions
+        if output.tell():
+            yield output.getvalue()
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    return StreamingResponse(
+        generate_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="customer_mrr_{stamp}.csv"'}
+    )
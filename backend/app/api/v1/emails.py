@@ -3,39 +3,58 @@ Email API endpoints
 Handles sending transactional emails via Resend
 """
 
+from functools import lru_cache
+from typing import Annotated
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, EmailStr
+from pydantic import AfterValidator, BaseModel
+from pydantic.json_schema import WithJsonSchema
+from pydantic.networks import validate_email
 
 from app.services.email_service import EmailService
 
 router = APIRouter()
 
 
+@lru_cache(maxsize=1024)
+def _normalize_email(value: str) -> str:
+    """EmailStr's validation, memoized - these endpoints see the same few addresses repeatedly"""
+    return validate_email(value)[1]
+
+
+# Same checks, normalization and OpenAPI format as EmailStr; invalid addresses
+# still raise (exceptions are not cached) and return 422
+CachedEmailStr = Annotated[
+    str,
+    AfterValidator(_normalize_email),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
+
+
 class InvestorInviteRequest(BaseModel):
     """Request model for investor invitation"""
-    to_email: EmailStr
+    to_email: CachedEmailStr
     investor_name: str
     invite_url: str
 
 
 class WelcomeEmailRequest(BaseModel):
     """Request model for welcome email"""
-    to_email: EmailStr
+    to_email: CachedEmailStr
     user_name: str
 
 
 class DealUpdateRequest(BaseModel):
     """Request model for deal update"""
-    to_email: EmailStr
+    to_email: CachedEmailStr
     update_title: str
     update_content: str
 
 
 class AccessNotificationRequest(BaseModel):
     """Request model for access notification"""
-    admin_email: EmailStr
-    user_email: EmailStr
+    admin_email: CachedEmailStr
+    user_email: CachedEmailStr
     user_name: str
     user_role: str
 
@@ -9,17 +9,23 @@ Provides feature flags for the frontend. Flags can be configured via:
 The endpoint caches flags in memory to reduce latency.
 """
 
+import asyncio
 import os
 import time
+from collections.abc import Mapping
 from datetime import datetime
+from types import MappingProxyType
 from typing import Any, Optional
+from urllib.parse import urlsplit, urlunsplit
 
+import httpx
 from fastapi import APIRouter
 
 router = APIRouter()
 
-# Default flags - used when Edge Config is unavailable
-DEFAULT_FLAGS = {
+# Default flags - used when Edge Config is unavailable. Read-only, so the
+# common no-override case can hand this mapping out without copying it.
+DEFAULT_FLAGS: Mapping[str, bool] = MappingProxyType({
     "show_admin_controls": False,
     "show_drill_downs": True,
     "show_api_errors": False,
@@ -31,37 +37,75 @@ DEFAULT_FLAGS = {
     "read_only_mode": False,
     "use_cached_data_only": False,
     "show_data_timestamps": True,
-}
+})
 
-# In-memory cache for flags
-_flags_cache: dict[str, Any] = {
-    "flags": None,
-    "timestamp": 0,
-}
+# Env var for each flag, built once since DEFAULT_FLAGS never changes
+_ENV_KEYS: list[tuple[str, str]] = [
+    (flag_name, f"FEATURE_FLAG_{flag_name.upper()}") for flag_name in DEFAULT_FLAGS
+]
+_TRUTHY = frozenset({"true", "1", "yes"})
+
+# In-memory cache for flags: (flags, expiry in time.monotonic_ns() units).
+# The tuple is replaced wholesale, never mutated, so a reader always sees a
+# flags/expiry pair that belong together.
+_snapshot: Optional[tuple[Mapping[str, Any], int]] = None
 
 # Cache TTL in seconds (5 minutes)
 FLAGS_CACHE_TTL = 300
+_FLAGS_CACHE_TTL_NS = FLAGS_CACHE_TTL * 1_000_000_000
+
+# Edge Config item holding the flag overrides, and how long to wait for it
+# before falling back to environment flags
+EDGE_CONFIG_FLAGS_KEY = "feature_flags"
+EDGE_CONFIG_TIMEOUT_SECONDS = 0.5
 
+# One source fetch per cache miss: concurrent misses wait here and then read
+# the cache the first one filled
+_refresh_lock = asyncio.Lock()
+_edge_client: Optional[httpx.AsyncClient] = None
 
-def get_flags_from_env() -> dict[str, Any]:
+
+def get_flags_from_env() -> Mapping[str, Any]:
     """
     Read flag overrides from environment variables.
     Environment variables take precedence over defaults.
 
+    Returns DEFAULT_FLAGS itself when nothing is overridden.
+
     Format: FEATURE_FLAG_{FLAG_NAME}=true|false
     Example: FEATURE_FLAG_MAINTENANCE_MODE=true
     """
-    flags = DEFAULT_FLAGS.copy()
+    overrides = {}
 
-    for flag_name in DEFAULT_FLAGS:
-        env_key = f"FEATURE_FLAG_{flag_name.upper()}"
+    for flag_name, env_key in _ENV_KEYS:
         env_value = os.environ.get(env_key)
 
         if env_value is not None:
             # Convert string to boolean
-            flags[flag_name] = env_value.lower() in ("true", "1", "yes")
+            overrides[flag_name] = env_value.lower() in _TRUTHY
+
+    if not overrides:
+        return DEFAULT_FLAGS
+    return {**DEFAULT_FLAGS, **overrides}
+
+
+def _get_edge_client() -> httpx.AsyncClient:
+    """Shared client, so Edge Config reads reuse one connection pool."""
+    global _edge_client
+    if _edge_client is None:
+        _edge_client = httpx.AsyncClient(timeout=EDGE_CONFIG_TIMEOUT_SECONDS)
+    return _edge_client
 
-    return flags
+
+def _edge_config_item_url(connection_string: str, key: str) -> str:
+    """
+    Turn an EDGE_CONFIG connection string into the REST URL for one item.
+
+    https://edge-config.vercel.com/<id>?token=<token>
+    -> https://edge-config.vercel.com/<id>/item/<key>?token=<token>
+    """
+    parts = urlsplit(connection_string)
+    return urlunsplit(parts._replace(path=f"{parts.path.rstrip('/')}/item/{key}"))
 
 
 async def fetch_edge_config_flags() -> Optional[dict[str, Any]]:
@@ -69,7 +113,8 @@ async def fetch_edge_config_flags() -> Optional[dict[str, Any]]:
     Fetch flags from Vercel Edge Config.
 
     Requires EDGE_CONFIG environment variable to be set.
-    Returns None if Edge Config is not configured or fails.
+    Returns None if Edge Config is not configured, has no flags item,
+    or doesn't answer within EDGE_CONFIG_TIMEOUT_SECONDS.
     """
     edge_config_url = os.environ.get("EDGE_CONFIG")
 
@@ -77,37 +122,47 @@ async def fetch_edge_config_flags() -> Optional[dict[str, Any]]:
         return None
 
     try:
-        # Vercel Edge Config SDK would be used here in production
-        # For now, we'll use environment variables as the primary source
-        # This is a placeholder for Edge Config integration
-        #
-        # Example with Edge Config SDK:
-        # from vercel_edge_config import get
-        # flags = await get("feature_flags")
-        # return flags
-
-        return None
+        response = await _get_edge_client().get(
+            _edge_config_item_url(edge_config_url, EDGE_CONFIG_FLAGS_KEY)
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+
+        flags = response.json()
+        return flags if isinstance(flags, dict) else None
     except Exception as e:
         print(f"[Flags] Error fetching from Edge Config: {e}")
         return None
 
 
-def get_cached_flags() -> Optional[dict[str, Any]]:
+def get_cached_flags() -> Optional[Mapping[str, Any]]:
     """Get flags from cache if not expired."""
-    if _flags_cache["flags"] is None:
-        return None
+    snap = _snapshot
+    if snap is not None and snap[1] > time.monotonic_ns():
+        return snap[0]
+    return None
 
-    now = time.time()
-    if now - _flags_cache["timestamp"] > FLAGS_CACHE_TTL:
-        return None
 
-    return _flags_cache["flags"]
+def cache_flags(flags: Mapping[str, Any]) -> None:
+    """Cache flags in memory."""
+    global _snapshot
+    _snapshot = (flags, time.monotonic_ns() + _FLAGS_CACHE_TTL_NS)
+
 
+def clear_cached_flags() -> None:
+    """Drop the cached flags so the next read goes to the source."""
+    global _snapshot
+    _snapshot = None
 
-def cache_flags(flags: dict[str, Any]) -> None:
-    """Cache flags in memory."""
-    _flags_cache["flags"] = flags
-    _flags_cache["timestamp"] = time.time()
+
+def _flags_response(flags: Mapping[str, Any], source: str) -> dict[str, Any]:
+    """Wrap flags with their source and a response timestamp."""
+    return {
+        "flags": flags,
+        "source": source,
+        "timestamp": datetime.now().isoformat(),
+    }
 
 
 @router.get("")
@@ -128,33 +183,27 @@ async def get_feature_flags():
     # Check cache first
     cached = get_cached_flags()
     if cached is not None:
-        return {
-            "flags": cached,
-            "source": "cache",
-            "timestamp": datetime.now().isoformat(),
-        }
-
-    # Try Edge Config
-    edge_flags = await fetch_edge_config_flags()
-    if edge_flags is not None:
-        # Merge with defaults to ensure all flags exist
-        merged = {**DEFAULT_FLAGS, **edge_flags}
-        cache_flags(merged)
-        return {
-            "flags": merged,
-            "source": "edge_config",
-            "timestamp": datetime.now().isoformat(),
-        }
-
-    # Fall back to environment variables
-    env_flags = get_flags_from_env()
-    cache_flags(env_flags)
+        return _flags_response(cached, "cache")
 
-    return {
-        "flags": env_flags,
-        "source": "environment",
-        "timestamp": datetime.now().isoformat(),
-    }
+    async with _refresh_lock:
+        # Another request may have refilled the cache while we waited
+        cached = get_cached_flags()
+        if cached is not None:
+            return _flags_response(cached, "cache")
+
+        # Try Edge Config
+        edge_flags = await fetch_edge_config_flags()
+        if edge_flags is not None:
+            # Merge with defaults to ensure all flags exist
+            merged = {**DEFAULT_FLAGS, **edge_flags} if edge_flags else DEFAULT_FLAGS
+            cache_flags(merged)
+            return _flags_response(merged, "edge_config")
+
+        # Fall back to environment variables
+        env_flags = get_flags_from_env()
+        cache_flags(env_flags)
+
+        return _flags_response(env_flags, "environment")
 
 
 @router.post("/refresh")
@@ -168,8 +217,7 @@ async def refresh_flags():
         dict: Refreshed feature flags
     """
     # Clear cache
-    _flags_cache["flags"] = None
-    _flags_cache["timestamp"] = 0
+    clear_cached_flags()
 
     # Fetch fresh flags
     return await get_feature_flags()
@@ -7,21 +7,116 @@ Supports QuickBooks, Stripe, Google Sheets, Slack, and other OAuth-based integra
 Security: All endpoints require admin role verification.
 """
 
+import asyncio
 import logging
 import uuid
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+from supabase import Client
 
 from app.core.config import settings
+from app.services.cache_service import InMemoryCache
+from app.services.db_pool import db_pool
 from app.services.pipedream_service import pipedream_service
+from app.services.supabase_service import create_pooled_client
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Only the two sync timestamps are read out of metadata, which can be large
+STORED_CONNECTIONS_SQL = """
+    SELECT app, status, account_id, to_json(connected_at) #>> '{}' AS connected_at,
+           metadata->>'last_sync' AS last_sync, metadata->>'pipedream_sync' AS pipedream_sync
+    FROM pipedream_connections
+    WHERE app = ANY($1::text[])
+"""
+STORED_CONNECTION_COLUMNS = (
+    "app,status,account_id,connected_at,"
+    "last_sync:metadata->>last_sync,pipedream_sync:metadata->>pipedream_sync"
+)
+# Columns handlers read from a single connection row
+CONNECTION_ROW_COLUMNS = "id,status,account_id"
+
+# The status endpoint calls Pipedream and writes to Supabase, so results are
+# briefly cached; connection changes through this API invalidate it
+STATUS_CACHE_TTL_SECONDS = 30
+_STATUS_CACHE_KEY = "integrations:status"
+_status_cache = InMemoryCache(default_ttl=STATUS_CACHE_TTL_SECONDS)
+_status_lock = asyncio.Lock()
+# Last successful status, served if a refresh fails
+_last_status: Optional[dict] = None
+
+# Per-app fields of the status response that never change, built once
+_STATIC_APP_FIELDS = tuple(
+    (
+        app_id,
+        {
+            "app": app_id,
+            "app_name": app_config["name"],
+            "description": app_config["description"],
+            "icon": app_config["icon"],
+        },
+    )
+    for app_id, app_config in pipedream_service.SUPPORTED_APPS.items()
+)
+_SUPPORTED_APP_IDS = [app_id for app_id, _ in _STATIC_APP_FIELDS]
+_SUPPORTED_APP_SET = frozenset(_SUPPORTED_APP_IDS)
+_SUPPORTED_APPS_LIST = pipedream_service.get_supported_apps()
+# Single-app status for an app with no (verifiable) connection
+_DISCONNECTED_STATUS = {
+    app_id: {
+        "app": app_id,
+        "app_name": app_config["name"],
+        "status": "disconnected",
+        "account_id": None,
+        "connected_at": None,
+    }
+    for app_id, app_config in pipedream_service.SUPPORTED_APPS.items()
+}
+
+
+async def _invalidate_status() -> None:
+    """Drop the cached status after a connection changes"""
+    await _status_cache.delete(_STATUS_CACHE_KEY)
+
+
+def _require_supported(app: str) -> None:
+    """Reject app slugs that aren't in SUPPORTED_APPS with a 400"""
+    if app not in _SUPPORTED_APP_SET:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported app: {app}. Supported: {_SUPPORTED_APP_IDS}",
+        )
+
+
+def _uuid_or_none(value: Optional[str]) -> Optional[str]:
+    """Value if it parses as a UUID (valid for the user_id column), else None"""
+    if not value:
+        return None
+    try:
+        uuid.UUID(value)
+    except (ValueError, TypeError):
+        logger.debug(f"external_id '{value}' is not a valid UUID, skipping user_id")
+        return None
+    return value
+
+
+def _known_account_id(app: str) -> Optional[str]:
+    """Account ID for an app from the last good status, if any"""
+    if _last_status is None:
+        return None
+    for conn in _last_status.get("connections", []):
+        if conn["app"] == app:
+            return conn.get("account_id")
+    return None
+
 
 # Pydantic models for request/response
 class ConnectRequest(BaseModel):
@@ -60,25 +155,26 @@ async def verify_admin(request: Request) -> bool:
 
     In production, this should validate the JWT and check the role claim.
     """
-    admin_header = request.headers.get("X-Admin-Access")
-    admin_param = request.query_params.get("admin")
-
-    logger.info(f"Integrations API access: admin_header={admin_header}, admin_param={admin_param}")
+    # Runs on every integrations request, so only format the log line when
+    # debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        admin_header = request.headers.get("X-Admin-Access")
+        admin_param = request.query_params.get("admin")
+        logger.debug(f"Integrations API access: admin_header={admin_header}, admin_param={admin_param}")
 
     # TODO: Implement proper JWT validation with role checking
     # For now, return True to allow access (frontend handles auth)
     return True
 
 
-async def get_supabase_client():
+@lru_cache(maxsize=1)
+def _build_supabase_client() -> Optional[Client]:
     """
-    Get Supabase client for database operations.
+    Create the integrations Supabase client once per process.
 
     Uses service role key to bypass RLS for admin operations.
     Falls back to anon key if service role not configured.
     """
-    from supabase import create_client
-
     if not settings.SUPABASE_URL:
         return None
 
@@ -86,16 +182,54 @@ async def get_supabase_client():
     # Check both naming conventions (SERVICE_ROLE_KEY and SERVICE_KEY)
     service_key = settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_SERVICE_KEY
     if service_key:
-        return create_client(settings.SUPABASE_URL, service_key)
+        return create_pooled_client(settings.SUPABASE_URL, service_key)
 
     # Fallback to anon key (subject to RLS - may fail for some operations)
     if settings.SUPABASE_ANON_KEY:
         logger.warning("Using anon key for Supabase - some operations may fail due to RLS")
-        return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+        return create_pooled_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
 
     return None
 
 
+async def get_supabase_client() -> Optional[Client]:
+    """
+    Get Supabase client for database operations.
+
+    Returns the same client on every call, so its HTTP session and
+    connections are reused across requests.
+    """
+    return _build_supabase_client()
+
+
+async def supported_app(app: str, _admin: bool = Depends(verify_admin)) -> str:
+    """App slug from the path, once the caller is verified as admin and the app is supported"""
+    _require_supported(app)
+    return app
+
+
+async def get_connection_for_app(app: str = Depends(supported_app)) -> Optional[dict]:
+    """
+    Stored connection row for the path app, or None if it was never connected
+
+    FastAPI caches dependencies per request, so handlers and other
+    dependencies that need the row share one Supabase read.
+    """
+    supabase = await get_supabase_client()
+    if not supabase:
+        raise HTTPException(status_code=500, detail="Database not configured")
+
+    try:
+        result = await asyncio.to_thread(
+            supabase.table("pipedream_connections").select(CONNECTION_ROW_COLUMNS).eq("app", app).limit(1).execute
+        )
+    except Exception as e:
+        logger.error(f"Error fetching {app} connection: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error fetching connection: {str(e)}")
+
+    return result.data[0] if result.data else None
+
+
 @router.get("/apps")
 async def get_supported_apps(
     _admin: bool = Depends(verify_admin),
@@ -110,9 +244,8 @@ async def get_supported_apps(
     Admin-only endpoint.
     """
     try:
-        apps = pipedream_service.get_supported_apps()
         return {
-            "apps": apps,
+            "apps": _SUPPORTED_APPS_LIST,
             "pipedream_configured": pipedream_service.is_configured,
             "timestamp": datetime.now().isoformat(),
         }
@@ -121,11 +254,11 @@ async def get_supported_apps(
         raise HTTPException(status_code=500, detail=f"Error getting supported apps: {str(e)}")
 
 
-@router.get("/status")
+@router.get("/status", response_class=ORJSONResponse, response_model=None)
 async def get_all_connection_status(
     _admin: bool = Depends(verify_admin),
     user_id: Optional[str] = Query(None, description="Filter by user ID"),
-):
+) -> ORJSONResponse:
     """
     Get status of all integrations.
 
@@ -137,204 +270,235 @@ async def get_all_connection_status(
     - Connection status for each supported app
     - Last sync timestamps
 
+    Results are cached for STATUS_CACHE_TTL_SECONDS and dropped whenever a
+    connection changes. If a refresh fails, the last good result is
+    returned with is_stale=True.
+
     Admin-only endpoint.
     """
-    try:
-        supabase = await get_supabase_client()
+    return ORJSONResponse(await _cached_connection_status())
+
+
+async def _cached_connection_status() -> dict:
+    """Status payload from cache, recomputed under a lock on a miss"""
+    global _last_status
+
+    cached = await _status_cache.get(_STATUS_CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    async with _status_lock:
+        cached = await _status_cache.get(_STATUS_CACHE_KEY)
+        if cached is not None:
+            return cached
+
+        try:
+            result = await _compute_connection_status()
+        except Exception as e:
+            logger.error(f"Error getting connection status: {e}", exc_info=True)
+            if _last_status is not None:
+                return {**_last_status, "is_stale": True}
+            raise HTTPException(status_code=500, detail=f"Error getting connection status: {str(e)}")
+
+        await _status_cache.set(_STATUS_CACHE_KEY, result)
+        _last_status = result
+        return result
+
+
+async def _compute_connection_status() -> dict:
+    """Sync Pipedream accounts into Supabase and build the status response"""
+    supabase = await get_supabase_client() if pipedream_service.is_configured else None
+
+    # Step 1: Fetch ALL connected accounts from Pipedream (source of truth)
+    # We fetch all accounts in the project regardless of external_user_id
+    pipedream_accounts = []
+    if pipedream_service.is_configured:
+        try:
+            # Fetch all accounts in the project (no external_user_id filter)
+            pipedream_accounts = await pipedream_service.get_accounts_for_user()
+            logger.info(f"Found {len(pipedream_accounts)} accounts from Pipedream")
+        except Exception as e:
+            logger.warning(f"Failed to fetch Pipedream accounts: {e}")
+
+    # Step 2: Sync Pipedream accounts to Supabase
+    logger.info(f"Syncing: supabase={supabase is not None}, pipedream_accounts={len(pipedream_accounts)}")
+    if supabase and pipedream_accounts:
+        now = datetime.now(timezone.utc).isoformat()
 
-        # Step 1: Fetch ALL connected accounts from Pipedream (source of truth)
-        # We fetch all accounts in the project regardless of external_user_id
-        pipedream_accounts = []
-        if pipedream_service.is_configured:
-            try:
-                # Fetch all accounts in the project (no external_user_id filter)
-                pipedream_accounts = await pipedream_service.get_accounts_for_user()
-                logger.info(f"Found {len(pipedream_accounts)} accounts from Pipedream")
-            except Exception as e:
-                logger.warning(f"Failed to fetch Pipedream accounts: {e}")
+        for pd_account in pipedream_accounts:
+            logger.info(f"Processing account: {pd_account.get('id')} - {pd_account.get('name')}")
+            # Extract app name from Pipedream account
+            # Pipedream returns accounts with 'app' as a dict containing 'name_slug'
+            # Example: {"app": {"name_slug": "quickbooks", "name": "QuickBooks"}}
+            app_field = pd_account.get("app", {})
+            if isinstance(app_field, dict):
+                app_slug = app_field.get("name_slug") or app_field.get("name", "").lower()
+            else:
+                app_slug = str(app_field) if app_field else pd_account.get("name", "").lower()
 
-        # Step 2: Sync Pipedream accounts to Supabase
-        logger.info(f"Syncing: supabase={supabase is not None}, pipedream_accounts={len(pipedream_accounts)}")
-        if supabase and pipedream_accounts:
-            now = datetime.now(timezone.utc).isoformat()
-
-            for pd_account in pipedream_accounts:
-                logger.info(f"Processing account: {pd_account.get('id')} - {pd_account.get('name')}")
-                # Extract app name from Pipedream account
-                # Pipedream returns accounts with 'app' as a dict containing 'name_slug'
-                # Example: {"app": {"name_slug": "quickbooks", "name": "QuickBooks"}}
-                app_field = pd_account.get("app", {})
-                if isinstance(app_field, dict):
-                    app_slug = app_field.get("name_slug") or app_field.get("name", "").lower()
-                else:
-                    app_slug = str(app_field) if app_field else pd_account.get("name", "").lower()
+            account_id = pd_account.get("id")
 
-                account_id = pd_account.get("id")
+            if not app_slug or not account_id:
+                logger.warning(f"Skipping Pipedream account with missing data: {pd_account}")
+                continue
 
-                if not app_slug or not account_id:
-                    logger.warning(f"Skipping Pipedream account with missing data: {pd_account}")
-                    continue
+            # Normalize app slug to our supported apps
+            normalized_app = _normalize_app_slug(app_slug)
+            if not normalized_app:
+                logger.debug(f"Skipping unsupported app: {app_slug}")
+                continue
 
-                # Normalize app slug to our supported apps
-                normalized_app = _normalize_app_slug(app_slug)
-                if not normalized_app:
-                    logger.debug(f"Skipping unsupported app: {app_slug}")
-                    continue
+            # Use the Pipedream external_id as the user identifier
+            # This is a UUID assigned by Pipedream per-account
+            pd_external_id = pd_account.get("external_id")
 
-                # Use the Pipedream external_id as the user identifier
-                # This is a UUID assigned by Pipedream per-account
-                pd_external_id = pd_account.get("external_id")
+            logger.info(
+                f"Syncing Pipedream account: app={normalized_app}, account_id={account_id}, external_id={pd_external_id}"
+            )
 
-                logger.info(
-                    f"Syncing Pipedream account: app={normalized_app}, account_id={account_id}, external_id={pd_external_id}"
+            # Check if this connection already exists in Supabase (by account_id)
+            try:
+                existing = await asyncio.to_thread(
+                    supabase.table("pipedream_connections")
+                    .select("id, status, account_id")
+                    .eq("app", normalized_app)
+                    .eq("account_id", account_id)
+                    .limit(1)
+                    .execute
                 )
 
-                # Check if this connection already exists in Supabase (by account_id)
-                try:
-                    existing = (
-                        supabase.table("pipedream_connections")
-                        .select("id, status, account_id")
-                        .eq("app", normalized_app)
-                        .eq("account_id", account_id)
-                        .limit(1)
-                        .execute()
-                    )
-
-                    if existing.data:
-                        # Update existing record if account_id changed or status needs update
-                        current = existing.data[0]
-                        if current["account_id"] != account_id or current["status"] != "active":
-                            supabase.table("pipedream_connections").update(
-                                {
-                                    "account_id": account_id,
-                                    "status": "active",
-                                    "updated_at": now,
-                                    "metadata": {
-                                        "pipedream_sync": now,
-                                        "app_details": pd_account.get("app_details", {}),
-                                    },
-                                }
-                            ).eq("id", current["id"]).execute()
-                            logger.info(f"Updated connection for {normalized_app}")
-                    else:
-                        # Create new connection record
-                        # Check if external_id is a valid UUID before using it as user_id
-                        user_id_for_db = None
-                        if pd_external_id:
-                            try:
-                                # Validate it's a proper UUID
-                                uuid.UUID(pd_external_id)
-                                user_id_for_db = pd_external_id
-                            except (ValueError, TypeError):
-                                # Not a valid UUID, skip setting user_id
-                                logger.debug(f"external_id '{pd_external_id}' is not a valid UUID, skipping user_id")
-
-                        insert_data = {
-                            "account_id": account_id,
-                            "app": normalized_app,
-                            "provider": "pipedream",
-                            "status": "active",
-                            "connected_at": now,
-                            "metadata": {
-                                "pipedream_sync": now,
-                                "pipedream_external_id": pd_external_id,
-                                "app_details": pd_account.get("app_details", {}),
-                            },
-                        }
-
-                        # Only include user_id if we have a valid UUID
-                        if user_id_for_db:
-                            insert_data["user_id"] = user_id_for_db
-
-                        supabase.table("pipedream_connections").insert(insert_data).execute()
-                        logger.info(f"Created new connection for {normalized_app}")
-
-                except Exception as e:
-                    logger.error(f"Failed to sync connection for {normalized_app}: {e}", exc_info=True)
-
-        # Step 3: Build connections dict from Pipedream accounts (source of truth)
-        # Even if Supabase sync fails, we can still show connection status from Pipedream
-        connections = {}
-
-        # First, add all Pipedream accounts to connections
-        for pd_account in pipedream_accounts:
-            app_field = pd_account.get("app", {})
-            if isinstance(app_field, dict):
-                app_slug = app_field.get("name_slug") or app_field.get("name", "").lower()
-            else:
-                app_slug = str(app_field) if app_field else ""
-
-            normalized_app = _normalize_app_slug(app_slug) if app_slug else None
-            if normalized_app:
-                connections[normalized_app] = {
-                    "status": "active" if pd_account.get("healthy", True) else "error",
-                    "account_id": pd_account.get("id"),
-                    "connected_at": pd_account.get("created_at"),
-                    "metadata": {
-                        "pipedream_sync": pd_account.get("updated_at"),
-                        "healthy": pd_account.get("healthy"),
-                    },
-                }
+                if existing.data:
+                    # Update existing record if account_id changed or status needs update
+                    current = existing.data[0]
+                    if current["account_id"] != account_id or current["status"] != "active":
+                        update = supabase.table("pipedream_connections").update(
+                            {
+                                "account_id": account_id,
+                                "status": "active",
+                                "updated_at": now,
+                                "metadata": {
+                                    "pipedream_sync": now,
+                                    "app_details": pd_account.get("app_details", {}),
+                                },
+                            }
+                        ).eq("id", current["id"])
+                        await asyncio.to_thread(update.execute)
+                        logger.info(f"Updated connection for {normalized_app}")
+                else:
+                    # Create new connection record
+                    # Check if external_id is a valid UUID before using it as user_id
+                    user_id_for_db = _uuid_or_none(pd_external_id)
+
+                    insert_data = {
+                        "account_id": account_id,
+                        "app": normalized_app,
+                        "provider": "pipedream",
+                        "status": "active",
+                        "connected_at": now,
+                        "metadata": {
+                            "pipedream_sync": now,
+                            "pipedream_external_id": pd_external_id,
+                            "app_details": pd_account.get("app_details", {}),
+                        },
+                    }
+
+                    # Only include user_id if we have a valid UUID
+                    if user_id_for_db:
+                        insert_data["user_id"] = user_id_for_db
+
+                    await asyncio.to_thread(supabase.table("pipedream_connections").insert(insert_data).execute)
+                    logger.info(f"Created new connection for {normalized_app}")
 
-        # Then, try to merge with Supabase data (if available)
-        if supabase:
-            try:
-                result = supabase.table("pipedream_connections").select("*").execute()
-                for conn in result.data or []:
-                    app_key = conn["app"]
-                    if app_key not in connections:
-                        connections[app_key] = {
-                            "status": conn["status"],
-                            "account_id": conn["account_id"],
-                            "connected_at": conn["connected_at"],
-                            "metadata": conn.get("metadata", {}),
-                        }
             except Exception as e:
-                logger.warning(f"Could not fetch from Supabase: {e}")
-
-        # Step 4: Build response with all supported apps
-        apps_status = []
-        for app_id, app_config in pipedream_service.SUPPORTED_APPS.items():
-            conn = connections.get(app_id, {})
-
-            # Check for direct API connections (Stripe uses STRIPE_SECRET_KEY)
-            connection_type = "oauth"  # default
-            status = conn.get("status", "disconnected")
-            connected_at = conn.get("connected_at")
-
-            if app_id == "stripe" and settings.STRIPE_SECRET_KEY:
-                # Stripe is connected via direct API key, not OAuth
-                connection_type = "direct_api"
-                status = "active"
-                # Use current time if no connected_at (direct API doesn't have a "connected" event)
-                if not connected_at:
-                    connected_at = "Direct API"
-
-            apps_status.append(
-                {
-                    "app": app_id,
-                    "app_name": app_config["name"],
-                    "description": app_config["description"],
-                    "icon": app_config["icon"],
-                    "status": status,
-                    "connection_type": connection_type,
-                    "account_id": conn.get("account_id"),
-                    "connected_at": connected_at,
-                    "last_sync": conn.get("metadata", {}).get("last_sync")
-                    or conn.get("metadata", {}).get("pipedream_sync"),
-                }
-            )
+                logger.error(f"Failed to sync connection for {normalized_app}: {e}", exc_info=True)
+
+    # Step 3: Build connections dict from Pipedream accounts (source of truth)
+    # Even if Supabase sync fails, we can still show connection status from Pipedream
+    connections = {}
+
+    # First, add all Pipedream accounts to connections
+    for pd_account in pipedream_accounts:
+        app_field = pd_account.get("app", {})
+        if isinstance(app_field, dict):
+            app_slug = app_field.get("name_slug") or app_field.get("name", "").lower()
+        else:
+            app_slug = str(app_field) if app_field else ""
+
+        normalized_app = _normalize_app_slug(app_slug) if app_slug else None
+        if normalized_app:
+            connections[normalized_app] = {
+                "status": "active" if pd_account.get("healthy", True) else "error",
+                "account_id": pd_account.get("id"),
+                "connected_at": pd_account.get("created_at"),
+                "pipedream_sync": pd_account.get("updated_at"),
+            }
 
-        return {
-            "pipedream_configured": pipedream_service.is_configured,
-            "connections": apps_status,
-            "pipedream_accounts_found": len(pipedream_accounts),
-            "timestamp": datetime.now().isoformat(),
-        }
+    # Then, try to merge with stored connections (if available). Without
+    # Pipedream nothing can be verified, so the database isn't read at all
+    if pipedream_service.is_configured and (supabase or db_pool.pool is not None):
+        try:
+            # Pipedream entries win; stored rows only fill in missing apps
+            for conn in await _fetch_stored_connections(supabase):
+                connections.setdefault(conn["app"], conn)
+        except Exception as e:
+            logger.warning(f"Could not fetch from Supabase: {e}")
+
+    # Step 4: Build response with all supported apps
+    apps_status = []
+    for app_id, static_fields in _STATIC_APP_FIELDS:
+        conn = connections.get(app_id, {})
+
+        # Check for direct API connections (Stripe uses STRIPE_SECRET_KEY)
+        connection_type = "oauth"  # default
+        status = conn.get("status", "disconnected")
+        connected_at = conn.get("connected_at")
+
+        if app_id == "stripe" and settings.STRIPE_SECRET_KEY:
+            # Stripe is connected via direct API key, not OAuth
+            connection_type = "direct_api"
+            status = "active"
+            # Use current time if no connected_at (direct API doesn't have a "connected" event)
+            if not connected_at:
+                connected_at = "Direct API"
+
+        apps_status.append(
+            {
+                **static_fields,
+                "status": status,
+                "connection_type": connection_type,
+                "account_id": conn.get("account_id"),
+                "connected_at": connected_at,
+                "last_sync": conn.get("last_sync") or conn.get("pipedream_sync"),
+            }
+        )
 
-    except Exception as e:
-        logger.error(f"Error getting connection status: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error getting connection status: {str(e)}")
+    return {
+        "pipedream_configured": pipedream_service.is_configured,
+        "connections": apps_status,
+        "pipedream_accounts_found": len(pipedream_accounts),
+        "timestamp": datetime.now(),
+    }
+
+
+async def _fetch_stored_connections(supabase: Optional[Client]) -> list[dict]:
+    """
+    Stored connection rows for supported apps, read over the asyncpg pool
+    when it's running
+
+    connected_at goes through to_json so it's formatted exactly as PostgREST
+    returns it.
+    """
+    if db_pool.pool is not None:
+        rows = await db_pool.pool.fetch(STORED_CONNECTIONS_SQL, _SUPPORTED_APP_IDS)
+        return [dict(row) for row in rows]
+
+    result = await asyncio.to_thread(
+        supabase.table("pipedream_connections")
+        .select(STORED_CONNECTION_COLUMNS)
+        .in_("app", _SUPPORTED_APP_IDS)
+        .execute
+    )
+    return result.data or []
 
 
 def _normalize_app_slug(app_slug: str) -> Optional[str]:
@@ -374,8 +538,7 @@ def _normalize_app_slug(app_slug: str) -> Optional[str]:
 
 @router.get("/status/{app}")
 async def get_connection_status(
-    app: str,
-    _admin: bool = Depends(verify_admin),
+    app: str = Depends(supported_app),
 ):
     """
     Get status of a specific integration.
@@ -390,11 +553,9 @@ async def get_connection_status(
 
     Admin-only endpoint.
     """
-    if app not in pipedream_service.SUPPORTED_APPS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported app: {app}. Supported: {list(pipedream_service.SUPPORTED_APPS.keys())}",
-        )
+    # Stored rows can't be verified without Pipedream, so don't read them
+    if not pipedream_service.is_configured:
+        return dict(_DISCONNECTED_STATUS[app])
 
     try:
         supabase = await get_supabase_client()
@@ -402,18 +563,43 @@ async def get_connection_status(
         if not supabase:
             raise HTTPException(status_code=500, detail="Database not configured")
 
+        # Start verifying the last known account with Pipedream while the
+        # database is read; it is only used if the account is unchanged
+        known_account_id = _known_account_id(app)
+        verify_task = None
+        if known_account_id and pipedream_service.is_configured:
+            verify_task = asyncio.create_task(pipedream_service.get_account(known_account_id))
+
         # Get connection from database
-        result = supabase.table("pipedream_connections").select("*").eq("app", app).limit(1).execute()
+        try:
+            result = await asyncio.to_thread(
+                supabase.table("pipedream_connections")
+                .select("status,account_id,connected_at,metadata")
+                .eq("app", app)
+                .limit(1)
+                .execute
+            )
+        except BaseException:
+            if verify_task:
+                verify_task.cancel()
+            raise
 
         app_config = pipedream_service.SUPPORTED_APPS[app]
+        account_id = result.data[0].get("account_id") if result.data else None
+
+        if verify_task and account_id != known_account_id:
+            verify_task.cancel()
+            verify_task = None
 
         if result.data:
             conn = result.data[0]
 
             # Optionally verify with Pipedream
             account_status = None
-            if conn.get("account_id") and pipedream_service.is_configured:
-                account_status = await pipedream_service.get_account(conn["account_id"])
+            if verify_task:
+                account_status = await verify_task
+            elif account_id and pipedream_service.is_configured:
+                account_status = await pipedream_service.get_account(account_id)
 
             return {
                 "app": app,
@@ -425,13 +611,7 @@ async def get_connection_status(
                 "pipedream_verified": account_status is not None,
             }
 
-        return {
-            "app": app,
-            "app_name": app_config["name"],
-            "status": "disconnected",
-            "account_id": None,
-            "connected_at": None,
-        }
+        return dict(_DISCONNECTED_STATUS[app])
 
     except HTTPException:
         raise
@@ -442,9 +622,8 @@ async def get_connection_status(
 
 @router.post("/connect/{app}")
 async def initiate_connection(
-    app: str,
     request: ConnectRequest,
-    _admin: bool = Depends(verify_admin),
+    app: str = Depends(supported_app),
 ):
     """
     Initiate OAuth connection for an app via Pipedream Connect.
@@ -459,12 +638,6 @@ async def initiate_connection(
 
     Admin-only endpoint.
     """
-    if app not in pipedream_service.SUPPORTED_APPS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported app: {app}. Supported: {list(pipedream_service.SUPPORTED_APPS.keys())}",
-        )
-
     if not pipedream_service.is_configured:
         raise HTTPException(
             status_code=503,
@@ -538,7 +711,7 @@ async def handle_callback(
     Admin-only endpoint (though Pipedream will call this).
     """
     try:
-        body = await request.json()
+        body = orjson.loads(await request.body())
 
         event = body.get("event")
         account_id = body.get("account_id")
@@ -551,64 +724,58 @@ async def handle_callback(
         if not supabase:
             raise HTTPException(status_code=500, detail="Database not configured")
 
-        if event == "connect":
-            # New connection established
-            # Upsert connection record
-            now = datetime.now(timezone.utc).isoformat()
+        now = datetime.now(timezone.utc).isoformat()
+        if account_id:
+            await pipedream_service.invalidate_account(account_id)
 
-            # Check if connection exists
-            existing = supabase.table("pipedream_connections").select("id").eq("app", app).limit(1).execute()
-
-            if existing.data:
-                # Update existing
-                supabase.table("pipedream_connections").update(
-                    {
-                        "account_id": account_id,
-                        "status": "active",
-                        "connected_at": now,
-                        "updated_at": now,
-                        "metadata": body.get("metadata", {}),
-                    }
-                ).eq("id", existing.data[0]["id"]).execute()
-            else:
-                # Create new
-                supabase.table("pipedream_connections").insert(
-                    {
-                        "user_id": external_user_id or "eqho-admin",
-                        "account_id": account_id,
-                        "app": app,
-                        "provider": "pipedream",
-                        "status": "active",
-                        "connected_at": now,
-                        "metadata": body.get("metadata", {}),
-                    }
-                ).execute()
+        if event == "connect":
+            # New connection established; one upsert on the unique app column
+            # instead of a lookup followed by an update or insert
+            row = {
+                "account_id": account_id,
+                "app": app,
+                "provider": "pipedream",
+                "status": "active",
+                "connected_at": now,
+                "updated_at": now,
+                "metadata": body.get("metadata", {}),
+            }
+            # Only include user_id if we have a valid UUID, so a reconnect
+            # doesn't overwrite the stored owner with a placeholder
+            user_id_for_db = _uuid_or_none(external_user_id)
+            if user_id_for_db:
+                row["user_id"] = user_id_for_db
+            query = supabase.table("pipedream_connections").upsert(row, on_conflict="app")
+            await asyncio.to_thread(query.execute)
 
             logger.info(f"✅ Connection stored for {app}")
 
         elif event == "disconnect":
             # Connection removed
-            supabase.table("pipedream_connections").update(
+            query = supabase.table("pipedream_connections").update(
                 {
                     "status": "disconnected",
-                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                    "updated_at": now,
                 }
-            ).eq("account_id", account_id).execute()
+            ).eq("account_id", account_id)
+            await asyncio.to_thread(query.execute)
 
             logger.info(f"🔌 Disconnected {app}")
 
         elif event == "error":
             # Connection error
-            supabase.table("pipedream_connections").update(
+            query = supabase.table("pipedream_connections").update(
                 {
                     "status": "error",
-                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                    "updated_at": now,
                     "metadata": {"error": body.get("error", "Unknown error")},
                 }
-            ).eq("account_id", account_id).execute()
+            ).eq("account_id", account_id)
+            await asyncio.to_thread(query.execute)
 
             logger.error(f"❌ Connection error for {app}: {body.get('error')}")
 
+        await _invalidate_status()
         return {"status": "ok", "event": event}
 
     except Exception as e:
@@ -618,8 +785,8 @@ async def handle_callback(
 
 @router.delete("/{app}")
 async def disconnect_app(
-    app: str,
-    _admin: bool = Depends(verify_admin),
+    app: str = Depends(supported_app),
+    conn: Optional[dict] = Depends(get_connection_for_app),
 ):
     """
     Disconnect an integration.
@@ -632,37 +799,28 @@ async def disconnect_app(
 
     Admin-only endpoint.
     """
-    if app not in pipedream_service.SUPPORTED_APPS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported app: {app}. Supported: {list(pipedream_service.SUPPORTED_APPS.keys())}",
-        )
+    if conn is None:
+        return {"success": True, "message": f"{app} was not connected"}
 
     try:
         supabase = await get_supabase_client()
-        if not supabase:
-            raise HTTPException(status_code=500, detail="Database not configured")
-
-        # Get the connection
-        result = supabase.table("pipedream_connections").select("*").eq("app", app).limit(1).execute()
-
-        if not result.data:
-            return {"success": True, "message": f"{app} was not connected"}
-
-        conn = result.data[0]
         account_id = conn.get("account_id")
 
-        # Delete from Pipedream
-        if account_id and pipedream_service.is_configured:
-            await pipedream_service.delete_account(account_id)
-
-        # Update database
-        supabase.table("pipedream_connections").update(
+        # Delete from Pipedream and update the database concurrently
+        update = supabase.table("pipedream_connections").update(
             {
                 "status": "disconnected",
                 "updated_at": datetime.now(timezone.utc).isoformat(),
             }
-        ).eq("id", conn["id"]).execute()
+        ).eq("id", conn["id"])
+        if account_id and pipedream_service.is_configured:
+            await asyncio.gather(
+                pipedream_service.delete_account(account_id),
+                asyncio.to_thread(update.execute),
+            )
+        else:
+            await asyncio.to_thread(update.execute)
+        await _invalidate_status()
 
         logger.info(f"🔌 Disconnected {app}")
 
@@ -681,8 +839,8 @@ async def disconnect_app(
 
 @router.post("/sync/{app}")
 async def trigger_sync(
-    app: str,
-    _admin: bool = Depends(verify_admin),
+    app: str = Depends(supported_app),
+    conn: Optional[dict] = Depends(get_connection_for_app),
 ):
     """
     Manually trigger a data sync for an integration.
@@ -696,49 +854,36 @@ async def trigger_sync(
 
     Admin-only endpoint.
     """
-    if app not in pipedream_service.SUPPORTED_APPS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported app: {app}. Supported: {list(pipedream_service.SUPPORTED_APPS.keys())}",
-        )
+    if conn is None or conn["status"] != "active":
+        raise HTTPException(status_code=400, detail=f"{app} is not connected. Please connect first.")
 
     try:
         supabase = await get_supabase_client()
-        if not supabase:
-            raise HTTPException(status_code=500, detail="Database not configured")
-
-        # Get the connection
-        result = (
-            supabase.table("pipedream_connections").select("*").eq("app", app).eq("status", "active").limit(1).execute()
-        )
-
-        if not result.data:
-            raise HTTPException(status_code=400, detail=f"{app} is not connected. Please connect first.")
-
-        conn = result.data[0]
         account_id = conn.get("account_id")
 
         # Perform app-specific sync
         sync_result = await _sync_app_data(app, account_id)
+        now = datetime.now(timezone.utc).isoformat()
 
-        # Update last sync timestamp
-        supabase.table("pipedream_connections").update(
+        # Record the sync in metadata server-side, without a read-modify-write
+        # of the whole blob (see add_update_sync_metadata_function.sql)
+        query = supabase.rpc(
+            "update_sync_metadata",
             {
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-                "metadata": {
-                    **(conn.get("metadata") or {}),
-                    "last_sync": datetime.now(timezone.utc).isoformat(),
-                    "last_sync_status": "success" if sync_result.get("success") else "error",
-                },
-            }
-        ).eq("id", conn["id"]).execute()
+                "conn_id": conn["id"],
+                "sync_ts": now,
+                "sync_status": "success" if sync_result.get("success") else "error",
+            },
+        )
+        await asyncio.to_thread(query.execute)
+        await _invalidate_status()
 
         return {
             "success": sync_result.get("success", False),
             "app": app,
             "message": sync_result.get("message", "Sync completed"),
             "data_summary": sync_result.get("summary"),
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now,
         }
 
     except HTTPException:
@@ -750,8 +895,7 @@ async def trigger_sync(
 
 @router.post("/test/{app}")
 async def test_connection(
-    app: str,
-    _admin: bool = Depends(verify_admin),
+    app: str = Depends(supported_app),
 ):
     """
     Test if an integration connection is working.
@@ -768,12 +912,6 @@ async def test_connection(
 
     Admin-only endpoint.
     """
-    if app not in pipedream_service.SUPPORTED_APPS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported app: {app}. Supported: {list(pipedream_service.SUPPORTED_APPS.keys())}",
-        )
-
     try:
         # For Stripe, use direct API if configured (bypass Pipedream for faster/more reliable tests)
         if app == "stripe" and settings.STRIPE_SECRET_KEY:
@@ -838,13 +976,13 @@ async def test_connection(
         if not account_id:
             supabase = await get_supabase_client()
             if supabase:
-                result = (
+                result = await asyncio.to_thread(
                     supabase.table("pipedream_connections")
                     .select("account_id")
                     .eq("app", app)
                     .eq("status", "active")
                     .limit(1)
-                    .execute()
+                    .execute
                 )
                 if result.data:
                     account_id = result.data[0].get("account_id")
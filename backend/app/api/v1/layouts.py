@@ -2,17 +2,34 @@
 Card layout management endpoints
 Handles fetching and updating dashboard card layouts
 """
+import asyncio
 from datetime import datetime
 from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from supabase import Client
 
 from ...services.auth import get_current_user, require_admin
-from ...services.supabase_service import SupabaseService
+from ...services.cache_service import InMemoryCache
+from ...services.db_pool import db_pool
+from ...services.supabase_service import get_supabase_client
 
 router = APIRouter(prefix="/layouts", tags=["layouts"])
 
+LAYOUT_SQL = """
+    SELECT id::text AS id, layout_data, updated_by::text AS updated_by, updated_at, created_at
+    FROM card_layouts
+    LIMIT 1
+"""
+
+# The layout only changes on an admin PUT, which refreshes this process's
+# copy; other workers pick it up within the TTL
+LAYOUT_CACHE_TTL_SECONDS = 60
+_LAYOUT_CACHE_KEY = "layout"
+_layout_cache = InMemoryCache(default_ttl=LAYOUT_CACHE_TTL_SECONDS)
+_layout_lock = asyncio.Lock()
+
 
 class LayoutData(BaseModel):
     layout_data: list[dict[str, Any]]
@@ -27,81 +44,83 @@ class LayoutResponse(BaseModel):
 
 
 @router.get("", response_model=LayoutResponse)
-async def get_layout(user_id: str = Depends(get_current_user)):
+async def get_layout(
+    user_id: str = Depends(get_current_user),
+    client: Client = Depends(get_supabase_client)
+):
     """
     Fetch the current card layout configuration
     Available to all authenticated users
     """
-    client = SupabaseService.client
-    if not client:
-        SupabaseService.connect()
-        client = SupabaseService.client
+    cached = await _layout_cache.get(_LAYOUT_CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    async with _layout_lock:
+        cached = await _layout_cache.get(_LAYOUT_CACHE_KEY)
+        if cached is not None:
+            return cached
+
+        try:
+            layout = await _load_layout(client)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to fetch layout: {str(e)}"
+            )
 
-    if not client:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database connection unavailable"
-        )
+        await _layout_cache.set(_LAYOUT_CACHE_KEY, layout)
+        return layout
 
-    try:
-        # Fetch the single layout row (should only be one)
-        response = client.table("card_layouts").select("*").limit(1).execute()
 
-        if not response.data or len(response.data) == 0:
-            # If no layout exists, create default empty layout
-            default_layout = {"layout_data": []}
-            insert_response = client.table("card_layouts").insert(default_layout).execute()
-            return LayoutResponse(**insert_response.data[0])
+async def _load_layout(client: Client) -> LayoutResponse:
+    """Read the layout row, creating the default empty layout if there is none"""
+    # Read over the asyncpg pool when it's running; a missing row falls
+    # through to the Supabase path below, which creates the default
+    if db_pool.pool is not None:
+        row = await db_pool.pool.fetchrow(LAYOUT_SQL)
+        if row is not None:
+            return LayoutResponse(**row)
 
+    # Fetch the single layout row (should only be one)
+    response = await asyncio.to_thread(client.table("card_layouts").select("*").limit(1).execute)
+    if response.data:
         return LayoutResponse(**response.data[0])
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch layout: {str(e)}"
-        )
+    # No layout yet: create the default. ON CONFLICT DO NOTHING on the
+    # singleton key keeps this idempotent if another worker got there first,
+    # in which case nothing is returned and the row is read back
+    query = client.table("card_layouts").upsert(
+        {"layout_data": []}, on_conflict="singleton", ignore_duplicates=True
+    )
+    insert_response = await asyncio.to_thread(query.execute)
+    if insert_response.data:
+        return LayoutResponse(**insert_response.data[0])
+
+    response = await asyncio.to_thread(client.table("card_layouts").select("*").limit(1).execute)
+    return LayoutResponse(**response.data[0])
 
 
 @router.put("", response_model=LayoutResponse)
 async def update_layout(
     layout: LayoutData,
-    user_id: str = Depends(require_admin)
+    user_id: str = Depends(require_admin),
+    client: Client = Depends(get_supabase_client)
 ):
     """
     Update the card layout configuration
     Admin only - changes apply to all users
     """
-    client = SupabaseService.client
-    if not client:
-        SupabaseService.connect()
-        client = SupabaseService.client
-
-    if not client:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database connection unavailable"
-        )
-
     try:
-        # Get the current layout ID (should only be one row)
-        current = client.table("card_layouts").select("id").limit(1).execute()
-
-        if not current.data or len(current.data) == 0:
-            # Create new layout if none exists
-            insert_data = {
-                "layout_data": layout.layout_data,
-                "updated_by": user_id
-            }
-            response = client.table("card_layouts").insert(insert_data).execute()
-        else:
-            # Update existing layout
-            layout_id = current.data[0]["id"]
-            update_data = {
-                "layout_data": layout.layout_data,
-                "updated_by": user_id,
-                "updated_at": datetime.utcnow().isoformat()
-            }
-            response = client.table("card_layouts").update(update_data).eq("id", layout_id).execute()
+        # Single row keyed on the singleton column; inserts it if missing.
+        # updated_at is set by the column default or a database trigger
+        upsert_data = {
+            "singleton": True,
+            "layout_data": layout.layout_data,
+            "updated_by": user_id
+        }
+        query = client.table("card_layouts").upsert(upsert_data, on_conflict="singleton")
+        response = await asyncio.to_thread(query.execute)
 
         if not response.data:
             raise HTTPException(
@@ -109,7 +128,9 @@ async def update_layout(
                 detail="Failed to update layout"
             )
 
-        return LayoutResponse(**response.data[0])
+        saved = LayoutResponse(**response.data[0])
+        await _layout_cache.set(_LAYOUT_CACHE_KEY, saved)
+        return saved
 
     except HTTPException:
         raise
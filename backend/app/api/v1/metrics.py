@@ -1,13 +1,50 @@
+from typing import Optional
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 
 from app.services.metrics_calculator import MetricsCalculator
 
 router = APIRouter()
 
 
-@router.get("/towpilot", response_model=dict)
-async def get_towpilot_metrics():
+# Metrics payloads are large nested dicts of plain values, so handlers return
+# an ORJSONResponse directly rather than going through jsonable_encoder
+def _metrics_response(content: dict, hit: bool) -> ORJSONResponse:
+    return ORJSONResponse(content, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+# Summary field -> path into the TowPilot metrics dict
+_SUMMARY_PATHS = (
+    ("customers", ("customer_metrics", "towpilot_customers")),
+    ("arr", ("revenue_metrics", "arr")),
+    ("mrr", ("revenue_metrics", "mrr")),
+    ("acv", ("revenue_metrics", "acv")),
+    ("ltv", ("ltv_metrics", "average_ltv")),
+    ("cac", ("cac_metrics", "total_cac")),
+    ("ltv_cac_ratio", ("ltv_metrics", "ltv_cac_ratio")),
+    ("cac_payback_months", ("ltv_metrics", "cac_payback_months")),
+    ("gross_margin", ("financial_metrics", "gross_margin_percentage")),
+)
+
+# (metrics dict, summary) for the last cached metrics object summarized
+_last_summary: Optional[tuple[dict, dict]] = None
+
+
+def _summarize(towpilot: dict) -> dict:
+    """Project TowPilot metrics to the summary fields, reusing the last result for the same cached dict"""
+    global _last_summary
+
+    if _last_summary is not None and _last_summary[0] is towpilot:
+        return _last_summary[1]
+
+    summary = {field: towpilot[section][key] for field, (section, key) in _SUMMARY_PATHS}
+    _last_summary = (towpilot, summary)
+    return summary
+
+
+@router.get("/towpilot", response_class=ORJSONResponse, response_model=None)
+async def get_towpilot_metrics() -> ORJSONResponse:
     """
     Get all metrics specific to TowPilot product
 
@@ -20,16 +57,16 @@ async def get_towpilot_metrics():
     - Revenue trends
     """
     try:
-        metrics = await MetricsCalculator.calculate_towpilot_metrics()
-        return metrics
+        metrics, hit = await MetricsCalculator.towpilot_metrics_with_cache_status()
+        return _metrics_response(metrics, hit)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error calculating metrics: {str(e)}"
         )
 
 
-@router.get("/all-products", response_model=dict)
-async def get_all_products_metrics():
+@router.get("/all-products", response_class=ORJSONResponse, response_model=None)
+async def get_all_products_metrics() -> ORJSONResponse:
     """
     Get metrics for all products combined
 
@@ -40,37 +77,24 @@ async def get_all_products_metrics():
     - Churn metrics
     """
     try:
-        metrics = await MetricsCalculator.calculate_all_products_metrics()
-        return metrics
+        metrics, hit = await MetricsCalculator.all_products_metrics_with_cache_status()
+        return _metrics_response(metrics, hit)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error calculating metrics: {str(e)}"
         )
 
 
-@router.get("/summary")
-async def get_metrics_summary():
+@router.get("/summary", response_class=ORJSONResponse, response_model=None)
+async def get_metrics_summary() -> ORJSONResponse:
     """
     Get a high-level summary of key metrics for the investor deck
+
+    Reads the same cached TowPilot metrics as /towpilot.
     """
     try:
-        towpilot = await MetricsCalculator.calculate_towpilot_metrics()
-
-        return {
-            "towpilot": {
-                "customers": towpilot["customer_metrics"]["towpilot_customers"],
-                "arr": towpilot["revenue_metrics"]["arr"],
-                "mrr": towpilot["revenue_metrics"]["mrr"],
-                "acv": towpilot["revenue_metrics"]["acv"],
-                "ltv": towpilot["ltv_metrics"]["average_ltv"],
-                "cac": towpilot["cac_metrics"]["total_cac"],
-                "ltv_cac_ratio": towpilot["ltv_metrics"]["ltv_cac_ratio"],
-                "cac_payback_months": towpilot["ltv_metrics"]["cac_payback_months"],
-                "gross_margin": towpilot["financial_metrics"][
-                    "gross_margin_percentage"
-                ],
-            }
-        }
+        towpilot, hit = await MetricsCalculator.towpilot_metrics_with_cache_status()
+        return _metrics_response({"towpilot": _summarize(towpilot)}, hit)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error generating summary: {str(e)}"
@@ -12,12 +12,20 @@ from datetime import datetime
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 
+from app.services.cache_service import InMemoryCache
 from app.services.metrics_cache_service import MetricsCacheService
 from app.services.quickbooks_service import quickbooks_service
 
 router = APIRouter()
 
+# /status is polled by health checks; the token lookup behind is_connected
+# is reused for this long
+STATUS_CACHE_TTL_SECONDS = 30
+_TOKEN_STATUS_KEY = "token_status"
+_status_cache = InMemoryCache(default_ttl=STATUS_CACHE_TTL_SECONDS)
+
 
 @router.get("/auth/url")
 async def get_auth_url(state: Optional[str] = None):
@@ -55,6 +63,8 @@ async def auth_callback(code: str, state: Optional[str] = None, realmId: Optiona
 
         # Exchange code for tokens
         await quickbooks_service.exchange_code_for_tokens(code)
+        # /status must not report the pre-connect token lookup for the rest of the TTL
+        await _status_cache.delete(_TOKEN_STATUS_KEY)
 
         return {
             "success": True,
@@ -65,12 +75,12 @@ async def auth_callback(code: str, state: Optional[str] = None, realmId: Optiona
         raise HTTPException(status_code=500, detail=f"OAuth callback failed: {str(e)}")
 
 
-@router.get("/profit-loss")
+@router.get("/profit-loss", response_class=ORJSONResponse, response_model=None)
 async def get_profit_loss(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     accounting_method: str = Query("Accrual", description="Accounting method: Accrual or Cash"),
-):
+) -> ORJSONResponse:
     """
     Fetch Profit & Loss report from QuickBooks.
 
@@ -87,10 +97,10 @@ async def get_profit_loss(
             # Return cached data if available
             cached = await MetricsCacheService.get_latest_metrics("quickbooks_pl")
             if cached:
-                return {
+                return ORJSONResponse({
                     **cached,
                     "warning": "Using cached data - QuickBooks not configured",
-                }
+                })
             raise HTTPException(
                 status_code=503,
                 detail="QuickBooks integration not configured and no cached data available"
@@ -102,26 +112,26 @@ async def get_profit_loss(
             accounting_method=accounting_method,
         )
 
-        return {
+        return ORJSONResponse({
             "data": data,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "is_cached": False,
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
         # Try to return cached data on error
         cached = await MetricsCacheService.get_latest_metrics("quickbooks_pl")
         if cached:
-            return {
+            return ORJSONResponse({
                 **cached,
                 "warning": f"Using cached data due to error: {str(e)}",
-            }
+            })
         raise HTTPException(status_code=500, detail=f"Error fetching P&L: {str(e)}")
 
 
-@router.get("/profit-loss/ytd")
-async def get_profit_loss_ytd():
+@router.get("/profit-loss/ytd", response_class=ORJSONResponse, response_model=None)
+async def get_profit_loss_ytd() -> ORJSONResponse:
     """
     Get Year-to-Date Profit & Loss summary.
 
@@ -132,35 +142,35 @@ async def get_profit_loss_ytd():
             # Return cached data if available
             cached = await MetricsCacheService.get_latest_metrics("quickbooks_pl")
             if cached:
-                return {
+                return ORJSONResponse({
                     **cached,
                     "warning": "Using cached data - QuickBooks not configured",
-                }
+                })
             raise HTTPException(
                 status_code=503,
                 detail="QuickBooks integration not configured and no cached data available"
             )
 
         data = await quickbooks_service.get_profit_and_loss_ytd()
-        return data
+        return ORJSONResponse(data)
     except HTTPException:
         raise
     except Exception as e:
         # Try to return cached data on error
         cached = await MetricsCacheService.get_latest_metrics("quickbooks_pl")
         if cached:
-            return {
+            return ORJSONResponse({
                 **cached,
                 "warning": f"Using cached data due to error: {str(e)}",
-            }
+            })
         raise HTTPException(status_code=500, detail=f"Error fetching YTD P&L: {str(e)}")
 
 
-@router.get("/payroll")
+@router.get("/payroll", response_class=ORJSONResponse, response_model=None)
 async def get_payroll_summary(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-):
+) -> ORJSONResponse:
     """
     Get payroll/labor cost summary.
 
@@ -171,10 +181,10 @@ async def get_payroll_summary(
             # Return cached data if available
             cached = await MetricsCacheService.get_latest_metrics("quickbooks_payroll")
             if cached:
-                return {
+                return ORJSONResponse({
                     **cached,
                     "warning": "Using cached data - QuickBooks not configured",
-                }
+                })
             raise HTTPException(
                 status_code=503,
                 detail="QuickBooks integration not configured and no cached data available"
@@ -192,17 +202,17 @@ async def get_payroll_summary(
             source="quickbooks"
         )
 
-        return data
+        return ORJSONResponse(data)
     except HTTPException:
         raise
     except Exception as e:
         # Try to return cached data on error
         cached = await MetricsCacheService.get_latest_metrics("quickbooks_payroll")
         if cached:
-            return {
+            return ORJSONResponse({
                 **cached,
                 "warning": f"Using cached data due to error: {str(e)}",
-            }
+            })
         raise HTTPException(status_code=500, detail=f"Error fetching payroll: {str(e)}")
 
 
@@ -217,14 +227,19 @@ async def get_quickbooks_status():
         is_configured = quickbooks_service.is_configured
 
         # Check if we have cached tokens
-        cached_tokens = await MetricsCacheService.get_latest_metrics("quickbooks_tokens")
-        is_connected = cached_tokens is not None
+        token_status = await _status_cache.get(_TOKEN_STATUS_KEY)
+        if token_status is None:
+            cached_tokens = await MetricsCacheService.get_latest_metrics("quickbooks_tokens")
+            token_status = {
+                "is_connected": cached_tokens is not None,
+                "last_token_refresh": cached_tokens.get("fetched_at") if cached_tokens else None,
+            }
+            await _status_cache.set(_TOKEN_STATUS_KEY, token_status)
 
         return {
             "is_configured": is_configured,
-            "is_connected": is_connected,
-            "last_token_refresh": cached_tokens.get("fetched_at") if cached_tokens else None,
-            "timestamp": datetime.now().isoformat(),
+            **token_status,
+            "timestamp": datetime.now(),
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error checking status: {str(e)}")
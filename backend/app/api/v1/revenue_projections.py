@@ -6,132 +6,194 @@ Critical for cash flow planning and accurate revenue forecasting.
 """
 
 from calendar import monthrange
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 
-from app.services.stripe_service import StripeService
+from app.services.stripe_cache import get_subs_cached
 
 router = APIRouter()
 
 
-@router.get("/current-month")
-async def get_current_month_projections():
+class SubscriptionBilling(NamedTuple):
+    """Per-subscription billing figures, computed once from its items"""
+
+    sub: dict
+    amount: float  # Amount of the next invoice
+    mrr: float
+    interval: Optional[str]  # From the last priced item
+    interval_count: Optional[int]
+    invoice_date: datetime  # current_period_end, in local time
+
+
+@dataclass
+class InvoiceRow:
+    """One invoice in the month-detail listing; orjson serializes it natively"""
+
+    # Explicit rather than dataclass(slots=True), which needs Python 3.10
+    __slots__ = (
+        "customer_id",
+        "subscription_id",
+        "invoice_date",
+        "invoice_amount",
+        "mrr",
+        "interval",
+        "interval_count",
+        "billing_description",
+    )
+
+    customer_id: str
+    subscription_id: str
+    invoice_date: str  # YYYY-MM-DD
+    invoice_amount: float
+    mrr: float
+    interval: Optional[str]
+    interval_count: Optional[int]
+    billing_description: str
+
+
+def _summarize_sub(sub: dict) -> SubscriptionBilling:
+    """Sum invoice amount and MRR across a subscription's priced items"""
+    sub_amount = 0.0
+    sub_mrr = 0.0
+    interval = None
+    interval_count = None
+
+    for item in sub["items"]:
+        amount = item["amount"] / 100
+
+        if amount == 0:
+            continue
+
+        interval = item["interval"]
+        interval_count = item.get("interval_count", 1) or 1
+
+        # Calculate monthly MRR
+        # interval_count handles multi-period billing (e.g., every 3 months, every 2 years)
+        if interval == "year":
+            monthly = amount / 12 / interval_count
+        elif interval == "month":
+            monthly = amount / interval_count
+        elif interval == "week":
+            monthly = (amount * 52) / 12 / interval_count
+        else:
+            monthly = 0
+
+        sub_mrr += monthly
+        sub_amount += amount  # BUG FIX: Accumulate for multi-item subscriptions
+
+    return SubscriptionBilling(
+        sub=sub,
+        amount=sub_amount,
+        mrr=sub_mrr,
+        interval=interval,
+        interval_count=interval_count,
+        # Converted once per subscription per cached snapshot (buckets are
+        # reused across endpoints). Months are local time, as before; gmtime
+        # would move invoices near month boundaries.
+        invoice_date=datetime.fromtimestamp(sub["current_period_end"]),
+    )
+
+
+def _projection_response(result: dict, warning: Optional[str]) -> ORJSONResponse:
     """
-    Get actual and projected revenue for the current month
+    Serialize a projection straight to orjson, flagging stale subscription data
 
-    Returns:
-    - customers_invoicing: Count of customers with invoices this month
-    - invoiced_to_date: Amount already invoiced/collected
-    - projected_remaining: Amount expected from pending invoices
-    - total_projected: Total month projection
-    - mrr_represented: MRR value of invoicing customers
-    - collection_by_week: Weekly breakdown
+    Projections are plain dicts of floats and strings, so they skip
+    jsonable_encoder.
     """
+    if warning:
+        result["warning"] = warning
+    return ORJSONResponse(result)
 
-    now = datetime.now()
+
+def _invoice_ts(billing: SubscriptionBilling) -> int:
+    return billing.sub["current_period_end"]
+
+
+# (subscriptions list, buckets) for the last cached subscription snapshot bucketed
+_last_buckets: Optional[tuple[list[dict], dict[tuple[int, int], list[SubscriptionBilling]]]] = None
+
+
+def _bucket_by_invoice_month(all_subs: list[dict]) -> dict[tuple[int, int], list[SubscriptionBilling]]:
+    """
+    Group subscriptions by the (year, month) of their next invoice, each
+    month ordered by invoice time
+
+    One pass over all subscriptions, so forecasts look months up instead of
+    rescanning every subscription per month. get_subs_cached hands every
+    endpoint the same list until it expires, so the buckets for that list are
+    reused rather than recomputed per request. Callers must not mutate them.
+    """
+    global _last_buckets
+
+    if _last_buckets is not None and _last_buckets[0] is all_subs:
+        return _last_buckets[1]
+
+    buckets: dict[tuple[int, int], list[SubscriptionBilling]] = defaultdict(list)
+    for sub in all_subs:
+        billing = _summarize_sub(sub)
+        buckets[(billing.invoice_date.year, billing.invoice_date.month)].append(billing)
+
+    # Each month in invoice order, sorted on the integer timestamp once per
+    # snapshot so month-detail needn't sort per request. Plain dict so a
+    # lookup of an empty month can't insert into the shared copy
+    result = {month: sorted(billings, key=_invoice_ts) for month, billings in buckets.items()}
+    _last_buckets = (all_subs, result)
+    return result
+
+
+def _current_month(all_subs: list[dict], now: datetime) -> dict:
+    """Actual and projected invoicing for the month containing now"""
     current_month = now.month
     current_year = now.year
 
-    # Get all subscriptions
-    all_subs = await StripeService.get_active_subscriptions()
-
     # Analyze current month
-    month_invoices = []
+    month_invoices = [
+        billing
+        for billing in _bucket_by_invoice_month(all_subs).get((current_year, current_month), [])
+        if billing.mrr != 0
+    ]
     invoiced_to_date = 0.0
     projected_remaining = 0.0
 
-    for sub in all_subs:
-        # Calculate subscription amount and MRR
-        sub_amount = 0.0
-        sub_mrr = 0.0
-        interval_info = None
-
-        for item in sub["items"]:
-            amount = item["amount"] / 100
-
-            if amount == 0:
-                continue
-
-            interval = item["interval"]
-            interval_count = item.get("interval_count", 1) or 1
-
-            # Calculate monthly MRR
-            # interval_count handles multi-period billing (e.g., every 3 months, every 2 years)
-            if interval == "year":
-                monthly = amount / 12 / interval_count
-            elif interval == "month":
-                monthly = amount / interval_count
-            elif interval == "week":
-                monthly = (amount * 52) / 12 / interval_count
-            else:
-                monthly = 0
-
-            sub_mrr += monthly
-            sub_amount += amount  # BUG FIX: Accumulate for multi-item subscriptions
-            interval_info = {"interval": interval, "interval_count": interval_count}
-
-        if sub_mrr == 0:
-            continue
+    # Weekly breakdown: days 1-7 fall in bin 0, 8-14 in bin 1, ... (max 5 weeks)
+    week_bins: list[list[SubscriptionBilling]] = [[] for _ in range(5)]
 
-        # Check if invoice is in current month
-        next_invoice_ts = sub["current_period_end"]
-        next_invoice_date = datetime.fromtimestamp(next_invoice_ts)
-
-        if (
-            next_invoice_date.year == current_year
-            and next_invoice_date.month == current_month
-        ):
-            invoice_data = {
-                "customer_id": sub["customer"],
-                "invoice_date": next_invoice_date,
-                "invoice_amount": sub_amount,
-                "mrr": sub_mrr,
-                "interval": interval_info["interval"],
-                "interval_count": interval_info["interval_count"],
-            }
-
-            month_invoices.append(invoice_data)
+    for billing in month_invoices:
+        week_bins[(billing.invoice_date.day - 1) // 7].append(billing)
 
-            # Categorize as already invoiced or projected
-            if next_invoice_date <= now:
-                invoiced_to_date += sub_amount
-            else:
-                projected_remaining += sub_amount
+        # Categorize as already invoiced or projected
+        if billing.invoice_date <= now:
+            invoiced_to_date += billing.amount
+        else:
+            projected_remaining += billing.amount
 
-    # Weekly breakdown
     _, days_in_month = monthrange(current_year, current_month)
     weeks = []
 
-    for week_num in range(1, 6):  # Max 5 weeks in a month
+    for week_num, invoices in enumerate(week_bins, start=1):
+        if not invoices:
+            continue
+
         week_start_day = (week_num - 1) * 7 + 1
         week_end_day = min(week_num * 7, days_in_month)
 
-        if week_start_day > days_in_month:
-            break
-
-        week_start = datetime(current_year, current_month, week_start_day)
-        week_end = datetime(current_year, current_month, week_end_day, 23, 59, 59)
-
-        week_invoices = [
-            inv
-            for inv in month_invoices
-            if week_start <= inv["invoice_date"] <= week_end
-        ]
-
-        if week_invoices:
-            week_total = sum(inv["invoice_amount"] for inv in week_invoices)
-            weeks.append(
-                {
-                    "week_number": week_num,
-                    "date_range": f"{current_month}/{week_start_day}-{week_end_day}",
-                    "customer_count": len(week_invoices),
-                    "total_amount": round(week_total, 2),
-                    "customers": [inv["customer_id"] for inv in week_invoices],
-                }
-            )
+        weeks.append(
+            {
+                "week_number": week_num,
+                "date_range": f"{current_month}/{week_start_day}-{week_end_day}",
+                "customer_count": len(invoices),
+                "total_amount": round(sum(inv.amount for inv in invoices), 2),
+                "customers": [inv.sub["customer"] for inv in invoices],
+            }
+        )
 
-    total_mrr = sum(inv["mrr"] for inv in month_invoices)
+    total_mrr = sum(inv.mrr for inv in month_invoices)
 
     return {
         "month": now.strftime("%B %Y"),
@@ -148,125 +210,9 @@ async def get_current_month_projections():
     }
 
 
-@router.get("/month-detail")
-async def get_month_detail(
-    year: int = Query(None, description="Year (defaults to current)"),
-    month: int = Query(None, description="Month 1-12 (defaults to current)"),
-):
-    """
-    Get detailed invoice breakdown for a specific month
-
-    Shows every customer invoicing in the specified month with:
-    - Customer ID
-    - Invoice date
-    - Invoice amount
-    - MRR contribution
-    - Billing interval
-
-    Useful for cash flow forecasting and revenue planning.
-    """
-
-    # Default to current month
-    now = datetime.now()
-    target_year = year or now.year
-    target_month = month or now.month
-
-    # Validate month
-    if not 1 <= target_month <= 12:
-        raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
-
-    # Get subscriptions
-    all_subs = await StripeService.get_active_subscriptions()
-
-    # Find invoices in target month
-    month_invoices = []
-
-    for sub in all_subs:
-        sub_amount = 0.0
-        sub_mrr = 0.0
-        interval_info = None
-
-        for item in sub["items"]:
-            amount = item["amount"] / 100
-
-            if amount == 0:
-                continue
-
-            interval = item["interval"]
-            interval_count = item.get("interval_count", 1) or 1
-
-            # Calculate MRR
-            # interval_count handles multi-period billing (e.g., every 3 months, every 2 years)
-            if interval == "year":
-                monthly = amount / 12 / interval_count
-            elif interval == "month":
-                monthly = amount / interval_count
-            elif interval == "week":
-                monthly = (amount * 52) / 12 / interval_count
-            else:
-                monthly = 0
-
-            sub_mrr += monthly
-            sub_amount += amount  # BUG FIX: Accumulate for multi-item subscriptions
-            interval_info = {"interval": interval, "interval_count": interval_count}
-
-        if sub_mrr == 0:
-            continue
-
-        # Check if invoice in target month
-        next_invoice_ts = sub["current_period_end"]
-        next_invoice_date = datetime.fromtimestamp(next_invoice_ts)
-
-        if (
-            next_invoice_date.year == target_year
-            and next_invoice_date.month == target_month
-        ):
-            month_invoices.append(
-                {
-                    "customer_id": sub["customer"],
-                    "subscription_id": sub["id"],
-                    "invoice_date": next_invoice_date.strftime("%Y-%m-%d"),
-                    "invoice_amount": round(sub_amount, 2),
-                    "mrr": round(sub_mrr, 2),
-                    "interval": interval_info["interval"],
-                    "interval_count": interval_info["interval_count"],
-                    "billing_description": f"${sub_amount:,.2f} every {interval_info['interval_count']} {interval_info['interval']}(s)",
-                }
-            )
-
-    # Sort by invoice date
-    month_invoices.sort(key=lambda x: x["invoice_date"])
-
-    total_amount = sum(inv["invoice_amount"] for inv in month_invoices)
-    total_mrr = sum(inv["mrr"] for inv in month_invoices)
-
-    month_name = datetime(target_year, target_month, 1).strftime("%B %Y")
-
-    return {
-        "month": month_name,
-        "year": target_year,
-        "month_number": target_month,
-        "customer_count": len(month_invoices),
-        "total_invoice_amount": round(total_amount, 2),
-        "total_mrr_represented": round(total_mrr, 2),
-        "invoices": month_invoices,
-        "generated_at": datetime.now().isoformat(),
-    }
-
-
-@router.get("/quarterly-forecast")
-async def get_quarterly_revenue_forecast(
-    quarters: int = Query(4, ge=1, le=8, description="Number of quarters to project"),
-):
-    """
-    Project revenue for upcoming quarters based on subscription billing schedules
-
-    Returns quarterly breakdown of expected invoice amounts and MRR.
-    Useful for financial planning and investor projections.
-    """
-
-    now = datetime.now()
-    all_subs = await StripeService.get_active_subscriptions()
+def _quarterly(all_subs: list[dict], now: datetime, quarters: int) -> dict:
+    """Projected invoicing per quarter, starting with the month containing now"""
+    buckets = _bucket_by_invoice_month(all_subs)
 
     # Build quarterly projections
     quarterly_data = []
@@ -289,40 +235,9 @@ async def get_quarterly_revenue_forecast(
                 month -= 12
                 year += 1
 
-            # Find subscriptions invoicing in this month
-            for sub in all_subs:
-                next_invoice_date = datetime.fromtimestamp(sub["current_period_end"])
-
-                if next_invoice_date.year == year and next_invoice_date.month == month:
-                    # Calculate amounts
-                    sub_amount = 0.0
-                    sub_mrr = 0.0
-
-                    for item in sub["items"]:
-                        amount = item["amount"] / 100
-                        if amount == 0:
-                            continue
-
-                        interval = item["interval"]
-                        interval_count = item.get("interval_count", 1) or 1
-
-                        # interval_count handles multi-period billing
-                        if interval == "year":
-                            monthly = amount / 12 / interval_count
-                        elif interval == "month":
-                            monthly = amount / interval_count
-                        elif interval == "week":
-                            monthly = (amount * 52) / 12 / interval_count
-                        else:
-                            monthly = 0
-
-                        sub_mrr += monthly
-                        sub_amount += (
-                            amount  # BUG FIX: Accumulate for multi-item subscriptions
-                        )
-
-                    quarter_total += sub_amount
-                    quarter_mrr += sub_mrr
+            for billing in buckets.get((year, month), []):
+                quarter_total += billing.amount
+                quarter_mrr += billing.mrr
 
         quarter_name = f"Q{((quarter_start_month - 1) // 3) + 1} {quarter_year}"
 
@@ -347,22 +262,15 @@ async def get_quarterly_revenue_forecast(
 
     return {
         "projection_period": f"{quarters} quarters",
-        "generated_at": datetime.now().isoformat(),
+        "generated_at": now.isoformat(),
         "quarters": quarterly_data,
         "note": "Based on current subscription billing schedules",
     }
 
 
-@router.get("/annual-forecast")
-async def get_annual_revenue_forecast():
-    """
-    Project revenue for the next 12 months based on subscription schedules
-
-    Shows month-by-month breakdown of expected collections.
-    """
-
-    now = datetime.now()
-    all_subs = await StripeService.get_active_subscriptions()
+def _annual(all_subs: list[dict], now: datetime) -> dict:
+    """Projected invoicing for the next 12 months, in 30-day steps from now"""
+    buckets = _bucket_by_invoice_month(all_subs)
 
     monthly_projections = []
 
@@ -375,43 +283,11 @@ async def get_annual_revenue_forecast():
         month_customer_count = 0
         month_mrr = 0.0
 
-        for sub in all_subs:
-            next_invoice_date = datetime.fromtimestamp(sub["current_period_end"])
-
-            if (
-                next_invoice_date.year == target_year
-                and next_invoice_date.month == target_month
-            ):
-                # Calculate amounts
-                sub_amount = 0.0
-                sub_mrr = 0.0
-
-                for item in sub["items"]:
-                    amount = item["amount"] / 100
-                    if amount == 0:
-                        continue
-
-                    interval = item["interval"]
-                    interval_count = item.get("interval_count", 1) or 1
-
-                    # interval_count handles multi-period billing
-                    if interval == "year":
-                        monthly = amount / 12 / interval_count
-                    elif interval == "month":
-                        monthly = amount / interval_count
-                    elif interval == "week":
-                        monthly = (amount * 52) / 12 / interval_count
-                    else:
-                        monthly = 0
-
-                    sub_mrr += monthly
-                    sub_amount += (
-                        amount  # BUG FIX: Accumulate for multi-item subscriptions
-                    )
-
-                month_total += sub_amount
-                month_customer_count += 1
-                month_mrr += sub_mrr
+        # Zero-amount subscriptions still count as invoicing customers here
+        for billing in buckets.get((target_year, target_month), []):
+            month_total += billing.amount
+            month_customer_count += 1
+            month_mrr += billing.mrr
 
         monthly_projections.append(
             {
@@ -426,7 +302,147 @@ async def get_annual_revenue_forecast():
 
     return {
         "forecast_period": "12 months",
-        "generated_at": datetime.now().isoformat(),
+        "generated_at": now.isoformat(),
         "monthly_projections": monthly_projections,
         "note": "Based on current subscription billing cycles",
     }
+
+
+@router.get("/current-month", response_class=ORJSONResponse, response_model=None)
+async def get_current_month_projections() -> ORJSONResponse:
+    """
+    Get actual and projected revenue for the current month
+
+    Returns:
+    - customers_invoicing: Count of customers with invoices this month
+    - invoiced_to_date: Amount already invoiced/collected
+    - projected_remaining: Amount expected from pending invoices
+    - total_projected: Total month projection
+    - mrr_represented: MRR value of invoicing customers
+    - collection_by_week: Weekly breakdown
+    """
+
+    all_subs, warning = await get_subs_cached()
+    return _projection_response(_current_month(all_subs, datetime.now()), warning)
+
+
+@router.get("/month-detail", response_class=ORJSONResponse, response_model=None)
+async def get_month_detail(
+    year: int = Query(None, description="Year (defaults to current)"),
+    month: int = Query(None, description="Month 1-12 (defaults to current)"),
+) -> ORJSONResponse:
+    """
+    Get detailed invoice breakdown for a specific month
+
+    Shows every customer invoicing in the specified month with:
+    - Customer ID
+    - Invoice date
+    - Invoice amount
+    - MRR contribution
+    - Billing interval
+
+    Useful for cash flow forecasting and revenue planning.
+    """
+
+    # Default to current month
+    now = datetime.now()
+    target_year = year or now.year
+    target_month = month or now.month
+
+    # Validate month
+    if not 1 <= target_month <= 12:
+        raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
+
+    # Get subscriptions
+    all_subs, warning = await get_subs_cached()
+
+    # Find invoices in target month (buckets are already in invoice order)
+    month_invoices = []
+
+    for billing in _bucket_by_invoice_month(all_subs).get((target_year, target_month), []):
+        if billing.mrr == 0:
+            continue
+
+        month_invoices.append(
+            InvoiceRow(
+                customer_id=billing.sub["customer"],
+                subscription_id=billing.sub["id"],
+                invoice_date=billing.invoice_date.strftime("%Y-%m-%d"),
+                invoice_amount=round(billing.amount, 2),
+                mrr=round(billing.mrr, 2),
+                interval=billing.interval,
+                interval_count=billing.interval_count,
+                billing_description=f"${billing.amount:,.2f} every {billing.interval_count} {billing.interval}(s)",
+            )
+        )
+
+    total_amount = sum(inv.invoice_amount for inv in month_invoices)
+    total_mrr = sum(inv.mrr for inv in month_invoices)
+
+    month_name = datetime(target_year, target_month, 1).strftime("%B %Y")
+
+    return _projection_response(
+        {
+            "month": month_name,
+            "year": target_year,
+            "month_number": target_month,
+            "customer_count": len(month_invoices),
+            "total_invoice_amount": round(total_amount, 2),
+            "total_mrr_represented": round(total_mrr, 2),
+            "invoices": month_invoices,
+            "generated_at": datetime.now().isoformat(),
+        },
+        warning,
+    )
+
+
+@router.get("/quarterly-forecast", response_class=ORJSONResponse, response_model=None)
+async def get_quarterly_revenue_forecast(
+    quarters: int = Query(4, ge=1, le=8, description="Number of quarters to project"),
+) -> ORJSONResponse:
+    """
+    Project revenue for upcoming quarters based on subscription billing schedules
+
+    Returns quarterly breakdown of expected invoice amounts and MRR.
+    Useful for financial planning and investor projections.
+    """
+
+    all_subs, warning = await get_subs_cached()
+    return _projection_response(_quarterly(all_subs, datetime.now(), quarters), warning)
+
+
+@router.get("/annual-forecast", response_class=ORJSONResponse, response_model=None)
+async def get_annual_revenue_forecast() -> ORJSONResponse:
+    """
+    Project revenue for the next 12 months based on subscription schedules
+
+    Shows month-by-month breakdown of expected collections.
+    """
+
+    all_subs, warning = await get_subs_cached()
+    return _projection_response(_annual(all_subs, datetime.now()), warning)
+
+
+@router.get("/bundle", response_class=ORJSONResponse, response_model=None)
+async def get_revenue_projection_bundle(
+    quarters: int = Query(4, ge=1, le=8, description="Number of quarters to project"),
+) -> ORJSONResponse:
+    """
+    Current month, quarterly and annual projections in one response
+
+    Dashboards show all three together; this serves them from a single
+    subscription fetch and one HTTP round-trip. Each section matches the
+    corresponding endpoint's response.
+    """
+
+    all_subs, warning = await get_subs_cached()
+    now = datetime.now()
+
+    return _projection_response(
+        {
+            "current": _current_month(all_subs, now),
+            "quarterly": _quarterly(all_subs, now, quarters),
+            "annual": _annual(all_subs, now),
+        },
+        warning,
+    )
@@ -4,6 +4,7 @@ API endpoints for snapshot/version control functionality
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from app.services.snapshot_service import SnapshotService
@@ -57,12 +58,14 @@ async def create_snapshot(request: CreateSnapshotRequest):
         )
 
 
-@router.get("/", response_model=list[dict])
+# Read endpoints hand Supabase rows (which can carry large report payloads)
+# straight to orjson instead of validating and re-encoding them
+@router.get("/", response_class=ORJSONResponse, response_model=None)
 async def get_snapshots(
     user_id: str = Query(..., description="User ID"),
     snapshot_type: Optional[str] = Query(None, description="Filter by snapshot type"),
     limit: int = Query(50, description="Maximum number of snapshots to return"),
-):
+) -> ORJSONResponse:
     """
     Get all snapshots for a user
 
@@ -72,18 +75,18 @@ async def get_snapshots(
         snapshots = SnapshotService.get_snapshots(
             user_id=user_id, snapshot_type=snapshot_type, limit=limit
         )
-        return snapshots
+        return ORJSONResponse(snapshots)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch snapshots: {str(e)}"
         )
 
 
-@router.get("/{snapshot_id}", response_model=dict)
+@router.get("/{snapshot_id}", response_class=ORJSONResponse, response_model=None)
 async def get_snapshot(
     snapshot_id: str,
     user_id: str = Query(..., description="User ID for security check"),
-):
+) -> ORJSONResponse:
     """
     Get a specific snapshot by ID
     """
@@ -91,7 +94,7 @@ async def get_snapshot(
         snapshot = SnapshotService.get_snapshot(snapshot_id, user_id)
         if not snapshot:
             raise HTTPException(status_code=404, detail="Snapshot not found")
-        return snapshot
+        return ORJSONResponse(snapshot)
     except HTTPException:
         raise
     except Exception as e:
@@ -148,16 +151,16 @@ async def delete_snapshot(
         )
 
 
-@router.get("/stats/summary", response_model=dict)
+@router.get("/stats/summary", response_class=ORJSONResponse, response_model=None)
 async def get_snapshot_stats(
     user_id: str = Query(..., description="User ID"),
-):
+) -> ORJSONResponse:
     """
     Get statistics about user's snapshots
     """
     try:
         stats = SnapshotService.get_snapshot_stats(user_id)
-        return stats
+        return ORJSONResponse(stats)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch stats: {str(e)}"
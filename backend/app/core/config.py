@@ -33,6 +33,9 @@ class Settings(BaseSettings):
     # Accepts either SUPABASE_SERVICE_ROLE_KEY or SUPABASE_SERVICE_KEY
     SUPABASE_SERVICE_ROLE_KEY: str = ""
     SUPABASE_SERVICE_KEY: str = ""  # Alias for service role key
+    # Direct Postgres DSN (optional) - audit log batches and hot reads use an
+    # asyncpg pool instead of PostgREST when set
+    DATABASE_URL: str = ""
 
     # Cache Configuration
     CACHE_TTL: int = 300  # 5 minutes default
@@ -49,6 +49,9 @@ BACKEND_ENV_VARS = [
     EnvVar("QUICKBOOKS_CLIENT_SECRET", required=False, secret=True, description="QuickBooks OAuth client secret"),
     EnvVar("QUICKBOOKS_REALM_ID", required=False, description="QuickBooks company/realm ID"),
 
+    # Direct Postgres connection (optional, pooled audit writes and hot reads)
+    EnvVar("DATABASE_URL", required=False, secret=True, description="Postgres DSN for the asyncpg pool"),
+
     # Email (optional)
     EnvVar("RESEND_API_KEY", required=False, secret=True, description="Resend email API key"),
 ]
@@ -1,7 +1,11 @@
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api.v1 import (
     admin,
@@ -22,6 +26,11 @@ from app.api.v1 import (
 )
 from app.core.config import settings
 from app.core.env_validator import validate_env
+from app.services.audit_writer import audit_writer
+from app.services.db_pool import db_pool
+from app.services.metrics_cache_service import MetricsCacheService
+from app.services.quickbooks_service import quickbooks_service
+from app.services.stripe_cache import get_subs_cached
 from app.services.supabase_service import SupabaseService
 
 # Configure logging
@@ -38,13 +47,46 @@ logging.getLogger("app.api.v1.audit").setLevel(logging.INFO)
 
 logger = logging.getLogger(__name__)
 
+# Blocking Supabase/Stripe SDK calls run via asyncio.to_thread, which uses the
+# loop's default executor (min(32, cpus + 4) threads unless sized here)
+BLOCKING_IO_THREADS = 40
+
+GZIP_MINIMUM_SIZE = 1024
+GZIP_COMPRESS_LEVEL = 5
+
+# Cached fallbacks read on the first dashboard load; pre-warming them also
+# opens the metrics cache's Supabase client
+PREWARM_METRIC_TYPES = ("quickbooks_pl", "quickbooks_payroll")
+
 app = FastAPI(
     title="Eqho Due Diligence API",
     description="API for investor deck metrics and financial data",
     version="1.0.0",
+    # orjson handles datetimes natively and is much faster on large list payloads
+    default_response_class=ORJSONResponse,
 )
 
 
+async def prewarm_caches() -> None:
+    """
+    Fill cold-start caches so the first requests after a deploy don't pay for
+    them: QuickBooks tokens, the latest P&L/payroll fallbacks and the active
+    Stripe subscriptions. Runs in the background; failures are only logged.
+    """
+    warmups = [
+        quickbooks_service.warm_up(),
+        *(MetricsCacheService.get_latest_metrics(t) for t in PREWARM_METRIC_TYPES),
+    ]
+    if settings.STRIPE_SECRET_KEY:
+        warmups.append(get_subs_cached())
+
+    results = await asyncio.gather(*warmups, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Cache pre-warm step failed: {result}")
+    logger.info("✅ Caches pre-warmed")
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
@@ -59,10 +101,43 @@ async def startup_event():
         logger.info(f"Optional env vars not set: {', '.join(env_result['missing_optional'])}")
 
     logger.info(f"CORS Origins: {settings.CORS_ORIGINS}")
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=BLOCKING_IO_THREADS, thread_name_prefix="blocking-io")
+    )
     SupabaseService.connect()
+    await db_pool.start()
+    await audit_writer.start()
+    # Keep a reference so the task isn't garbage collected mid-run
+    app.state.prewarm_task = asyncio.create_task(prewarm_caches())
     logger.info("✅ Startup complete")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued audit logs and close database connections before exit"""
+    prewarm_task = getattr(app.state, "prewarm_task", None)
+    if prewarm_task is not None and not prewarm_task.done():
+        prewarm_task.cancel()
+    await audit_writer.stop()
+    await db_pool.stop()
+    SupabaseService.disconnect()
+
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
+    """
+    Return a generic 500 for unexpected errors instead of leaking details
+
+    Starlette runs this outside CORSMiddleware, so the response has no CORS
+    headers; routers called from the browser should raise HTTPException
+    instead (see cashflow.SanitizedErrorRoute).
+    """
+    # Starlette re-raises after this response is sent, so the server logs the
+    # traceback; a one-line entry here ties it to the request
+    logger.error(f"Unhandled error on {request.method} {request.url.path}: {exc!r}")
+    return ORJSONResponse(status_code=500, content={"detail": "Internal server error"})
+
+
 # CORS middleware for React frontend
 app.add_middleware(
     CORSMiddleware,
@@ -72,6 +147,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Forecast and customer list payloads repeat the same keys per row and
+# compress well; small responses aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+
 # Include routers
 app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["metrics"])
 app.include_router(
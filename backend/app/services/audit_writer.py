@@ -0,0 +1,163 @@
+"""
+Batched audit log writer
+
+POST /audit/log used to do one Supabase insert per request. Rows are now put on
+an in-process queue and a background task writes them with a single array
+insert every FLUSH_INTERVAL_SECONDS or MAX_BATCH_SIZE rows, whichever comes
+first.
+
+When the shared asyncpg pool is running (see db_pool), batches bypass
+PostgREST and go straight to Postgres.
+"""
+import asyncio
+import logging
+from typing import Any, Optional
+
+from supabase import Client
+
+from app.services.db_pool import db_pool
+from app.services.supabase_service import SupabaseService
+
+logger = logging.getLogger(__name__)
+
+QUEUE_MAXSIZE = 10_000
+MAX_BATCH_SIZE = 500
+FLUSH_INTERVAL_SECONDS = 0.1
+
+# id, user_id, ip_address and created_at are the strings the endpoint builds
+# for the PostgREST path, cast server-side; action_data goes through the
+# pool's jsonb codec
+INSERT_SQL = """
+    INSERT INTO audit_logs (id, user_id, action_type, action_data, ip_address, user_agent, created_at)
+    VALUES ($1::text::uuid, $2::text::uuid, $3, $4::jsonb, $5::text::inet, $6, $7::text::timestamptz)
+"""
+
+
+class AuditWriter:
+    """Queues audit rows and flushes them to Supabase in batches"""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pool = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the background flusher (called on app startup)"""
+        if self.running:
+            return
+        # Start db_pool first; the writer uses it if it came up
+        self._pool = db_pool.pool
+        if self._pool is not None:
+            logger.info("Audit writer using asyncpg pool")
+        self._queue = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+        self._task = asyncio.create_task(self._run())
+        logger.info("Audit writer started")
+
+    async def stop(self) -> None:
+        """Flush anything still queued and stop the flusher (called on shutdown)"""
+        if not self.running:
+            return
+        # None is the stop sentinel; queued rows ahead of it are still written
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._pool = None
+        logger.info("Audit writer stopped")
+
+    async def write(self, row: dict[str, Any], client: Client) -> None:
+        """
+        Queue a row for the next batch
+
+        Falls back to a direct insert when the flusher isn't running (tests,
+        scripts) or the queue is full, so rows are never dropped at enqueue.
+        """
+        if self.running:
+            try:
+                self._queue.put_nowait(row)
+                return
+            except asyncio.QueueFull:
+                logger.warning("Audit queue full, writing row directly")
+
+        await asyncio.to_thread(self._insert, client, [row])
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            row = await self._queue.get()
+            if row is None:
+                return
+
+            batch = [row]
+            stopping = False
+            deadline = loop.time() + FLUSH_INTERVAL_SECONDS
+
+            while len(batch) < MAX_BATCH_SIZE:
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: list[dict[str, Any]]) -> None:
+        try:
+            await self._write_batch(batch)
+            logger.debug(f"Flushed {len(batch)} audit logs")
+        except Exception as e:
+            if len(batch) == 1 or (self._pool is None and SupabaseService.client is None):
+                logger.error(f"Failed to write {len(batch)} audit logs: {e}", exc_info=True)
+                return
+
+            # One bad row fails the whole insert; retry row by row so only
+            # that row is lost
+            logger.warning(f"Batch write of {len(batch)} audit logs failed, retrying individually: {e}")
+            for row in batch:
+                try:
+                    await self._write_batch([row])
+                except Exception as row_error:
+                    logger.error(f"Failed to write audit log {row.get('id')}: {row_error}", exc_info=True)
+
+    async def _write_batch(self, batch: list[dict[str, Any]]) -> None:
+        if self._pool is not None:
+            await self._pool.executemany(INSERT_SQL, [self._to_record(row) for row in batch])
+            return
+
+        client = SupabaseService.client
+        if client is None:
+            SupabaseService.connect()
+            client = SupabaseService.client
+
+        if client is None:
+            raise RuntimeError("Supabase client unavailable")
+
+        await asyncio.to_thread(self._insert, client, batch)
+
+    @staticmethod
+    def _to_record(row: dict[str, Any]) -> tuple:
+        return (
+            row["id"],
+            row["user_id"],
+            row["action_type"],
+            row.get("action_data"),
+            row.get("ip_address"),
+            row.get("user_agent"),
+            row["created_at"],
+        )
+
+    @staticmethod
+    def _insert(client: Client, rows: list[dict[str, Any]]) -> None:
+        client.table("audit_logs").insert(rows).execute()
+
+
+audit_writer = AuditWriter()
@@ -2,15 +2,27 @@
 Authentication and authorization service
 Handles user role verification and JWT token validation
 """
+import hashlib
 import logging
 from typing import Optional
 
 from fastapi import Depends, Header, HTTPException, status
 
+from app.services.cache_service import InMemoryCache
 from app.services.supabase_service import SupabaseService
 
 logger = logging.getLogger(__name__)
 
+# Validated tokens map to their user ID for a short while, so repeat requests
+# with the same JWT skip the Supabase round trip. Keys are token digests so
+# raw tokens aren't held in memory.
+TOKEN_CACHE_TTL_SECONDS = 60
+_token_cache = InMemoryCache(default_ttl=TOKEN_CACHE_TTL_SECONDS)
+
+
+def _token_cache_key(token: str) -> str:
+    return "token:" + hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
 
 async def get_current_user(authorization: Optional[str] = Header(None)) -> str:
     """
@@ -33,6 +45,11 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> str:
         )
 
     token = authorization.replace("Bearer ", "")
+    cache_key = _token_cache_key(token)
+    cached_user_id = await _token_cache.get(cache_key)
+    if cached_user_id is not None:
+        return cached_user_id
+
     logger.debug(f"Attempting to validate JWT token (length: {len(token)})")
 
     try:
@@ -62,6 +79,7 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> str:
             )
 
         logger.info(f"Successfully authenticated user: {user.user.id}")
+        await _token_cache.set(cache_key, user.user.id)
         return user.user.id
 
     except HTTPException:
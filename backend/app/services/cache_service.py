@@ -133,6 +133,8 @@ class CacheService:
         from app.core.config import settings
 
         self.memory_cache = InMemoryCache(default_ttl=settings.CACHE_TTL)
+        # Metrics computations currently running, keyed like the cache
+        self._inflight: dict[str, asyncio.Task] = {}
 
     async def get_metrics(self, product: str, calculator: Callable) -> dict[str, Any]:
         """
@@ -145,22 +147,55 @@ class CacheService:
         Returns:
             Metrics dictionary
         """
+        metrics, _ = await self.get_metrics_with_status(product, calculator)
+        return metrics
+
+    async def get_metrics_with_status(
+        self, product: str, calculator: Callable
+    ) -> tuple[dict[str, Any], bool]:
+        """
+        Get metrics and whether they were served from cache
+
+        Concurrent misses for the same product share one in-flight
+        computation instead of each calling the calculator.
+
+        Args:
+            product: Product name (e.g., 'towpilot')
+            calculator: Async function to calculate metrics
+
+        Returns:
+            Tuple of (metrics dictionary, cache hit)
+        """
         cache_key = f"metrics:{product}"
 
         # Try in-memory cache
         value = await self.memory_cache.get(cache_key)
         if value:
             logger.info(f"📦 Cache hit for {product}")
-            return value
-
-        # Cache miss - compute fresh metrics
-        logger.info(f"🔄 Computing fresh metrics for {product}")
-        metrics = await calculator()
-
-        # Store in cache
-        await self.memory_cache.set(cache_key, metrics)
-
-        return metrics
+            return value, True
+
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._compute_metrics(cache_key, product, calculator))
+            self._inflight[cache_key] = task
+
+        # Shield so a cancelled request doesn't cancel the shared computation
+        return await asyncio.shield(task), False
+
+    async def _compute_metrics(
+        self, cache_key: str, product: str, calculator: Callable
+    ) -> dict[str, Any]:
+        try:
+            # Cache miss - compute fresh metrics
+            logger.info(f"🔄 Computing fresh metrics for {product}")
+            metrics = await calculator()
+
+            # Store in cache
+            await self.memory_cache.set(cache_key, metrics)
+
+            return metrics
+        finally:
+            self._inflight.pop(cache_key, None)
 
     async def invalidate(self, product: str) -> None:
         """
@@ -0,0 +1,70 @@
+"""
+Shared asyncpg connection pool
+
+Direct Postgres access for hot paths that would otherwise go through the
+blocking supabase-py client. Optional: when DATABASE_URL is unset, asyncpg
+isn't installed, or the pool can't be created, db_pool.pool stays None and
+callers fall back to Supabase.
+"""
+import logging
+
+import orjson
+
+from app.core.config import settings
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None  # Pooled access is optional; PostgREST is used instead
+
+logger = logging.getLogger(__name__)
+
+POOL_MIN_SIZE = 5
+POOL_MAX_SIZE = 20
+
+
+async def _init_connection(conn) -> None:
+    """Let asyncpg take and return jsonb values as Python objects, via orjson"""
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=lambda value: orjson.dumps(value).decode(),
+        decoder=orjson.loads,
+        schema="pg_catalog",
+    )
+
+
+class DatabasePool:
+    """Owns the process-wide asyncpg pool"""
+
+    def __init__(self):
+        self.pool = None
+
+    async def start(self) -> None:
+        """Create the pool (called on app startup)"""
+        if self.pool is not None or not settings.DATABASE_URL or asyncpg is None:
+            return
+        try:
+            self.pool = await asyncpg.create_pool(
+                settings.DATABASE_URL,
+                min_size=POOL_MIN_SIZE,
+                max_size=POOL_MAX_SIZE,
+                # Supavisor's transaction mode can't keep prepared statements
+                # across transactions
+                statement_cache_size=0,
+                init=_init_connection,
+            )
+            logger.info("Database pool started")
+        except Exception as e:
+            logger.warning(f"Could not create asyncpg pool, using PostgREST: {e}")
+            self.pool = None
+
+    async def stop(self) -> None:
+        """Close the pool (called on shutdown)"""
+        if self.pool is None:
+            return
+        await self.pool.close()
+        self.pool = None
+        logger.info("Database pool closed")
+
+
+db_pool = DatabasePool()
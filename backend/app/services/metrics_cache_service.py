@@ -4,6 +4,9 @@ Metrics Cache Service - Database-backed caching for API metrics
 Stores metrics from Stripe, QuickBooks, and other sources in Supabase
 for fallback when APIs are unavailable. Each metric includes a timestamp
 for displaying data freshness to users.
+
+Latest-entry reads are also held in process for LATEST_CACHE_TTL_SECONDS, so
+status pings and fallback paths don't query Supabase on every request.
 """
 
 import logging
@@ -13,9 +16,12 @@ from typing import Any, Optional
 from supabase import Client
 
 from app.core.config import settings
+from app.services.cache_service import InMemoryCache
 
 logger = logging.getLogger(__name__)
 
+LATEST_CACHE_TTL_SECONDS = 10
+
 
 class MetricsCacheService:
     """
@@ -27,6 +33,10 @@ class MetricsCacheService:
 
     client: Optional[Client] = None
 
+    # Latest entry per metric_type, wrapped in a 1-tuple so "no entry" is
+    # cached as well
+    _latest_cache = InMemoryCache(default_ttl=LATEST_CACHE_TTL_SECONDS)
+
     @classmethod
     def _get_client(cls) -> Optional[Client]:
         """Get or create Supabase client"""
@@ -79,6 +89,9 @@ class MetricsCacheService:
                 "fetched_at": datetime.now().isoformat(),
             }).execute()
 
+            # Drop the in-process copy so the next read sees this entry
+            await cls._latest_cache.delete(metric_type)
+
             if response.data:
                 logger.info(f"✅ Cached metrics: {metric_type} from {source}")
                 return True
@@ -104,6 +117,10 @@ class MetricsCacheService:
         Returns:
             Dict with 'data', 'fetched_at', and 'source' or None if not found
         """
+        cached = await cls._latest_cache.get(metric_type)
+        if cached is not None:
+            return cached[0]
+
         client = cls._get_client()
         if not client:
             logger.error("Cannot retrieve metrics: Supabase client unavailable")
@@ -122,7 +139,7 @@ class MetricsCacheService:
             if response.data and len(response.data) > 0:
                 entry = response.data[0]
                 logger.info(f"📦 Retrieved cached {metric_type} from {entry['fetched_at']}")
-                return {
+                result = {
                     "data": entry["data"],
                     "fetched_at": entry["fetched_at"],
                     "source": entry["source"],
@@ -130,7 +147,10 @@ class MetricsCacheService:
                 }
             else:
                 logger.info(f"No cached data found for {metric_type}")
-                return None
+                result = None
+
+            await cls._latest_cache.set(metric_type, (result,))
+            return result
 
         except Exception as e:
             logger.error(f"❌ Failed to retrieve cached metrics {metric_type}: {e}")
@@ -22,6 +22,13 @@ class MetricsCalculator:
             product="towpilot", calculator=MetricsCalculator._compute_towpilot_metrics
         )
 
+    @staticmethod
+    async def towpilot_metrics_with_cache_status() -> tuple[dict, bool]:
+        """Same as calculate_towpilot_metrics, plus whether it was a cache hit"""
+        return await cache_service.get_metrics_with_status(
+            product="towpilot", calculator=MetricsCalculator._compute_towpilot_metrics
+        )
+
     @staticmethod
     async def _compute_towpilot_metrics() -> dict:
         """Internal method to compute metrics from Stripe API
@@ -129,6 +136,14 @@ class MetricsCalculator:
             calculator=MetricsCalculator._compute_all_products_metrics,
         )
 
+    @staticmethod
+    async def all_products_metrics_with_cache_status() -> tuple[dict, bool]:
+        """Same as calculate_all_products_metrics, plus whether it was a cache hit"""
+        return await cache_service.get_metrics_with_status(
+            product="all_products",
+            calculator=MetricsCalculator._compute_all_products_metrics,
+        )
+
     @staticmethod
     async def _compute_all_products_metrics() -> dict:
         """Internal method to compute all products metrics from Stripe API"""
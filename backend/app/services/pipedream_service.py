@@ -20,12 +20,17 @@ from typing import Any, Optional
 import httpx
 
 from app.core.config import settings
+from app.services.cache_service import InMemoryCache
 
 logger = logging.getLogger(__name__)
 
 # Pipedream Connect API endpoints
 PIPEDREAM_API_BASE = "https://api.pipedream.com/v1"
 
+# Account details and credentials rarely change minute to minute, so lookups
+# are cached per account to save a Pipedream round trip on each request
+ACCOUNT_CACHE_TTL_SECONDS = 300
+
 
 class PipedreamService:
     """
@@ -80,6 +85,9 @@ class PipedreamService:
         self._access_token: Optional[str] = None
         self._token_expires_at: Optional[float] = None
 
+        # Per-account lookups (get_account, get_account_credentials)
+        self._account_cache = InMemoryCache(default_ttl=ACCOUNT_CACHE_TTL_SECONDS)
+
     @property
     def is_configured(self) -> bool:
         """Check if Pipedream credentials are configured"""
@@ -135,6 +143,25 @@ class PipedreamService:
             "x-pd-environment": self.environment,
         }
 
+    async def _get_with_auth(self, url: str) -> httpx.Response:
+        """
+        GET a Pipedream API URL, retrying once with a fresh OAuth token on 401.
+        """
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url, headers=await self._get_auth_headers())
+
+            if response.status_code == 401:
+                logger.info("Pipedream token rejected, fetching a new one")
+                self._access_token = None
+                response = await client.get(url, headers=await self._get_auth_headers())
+
+            return response
+
+    async def invalidate_account(self, account_id: str) -> None:
+        """Drop cached lookups for an account after it changes"""
+        await self._account_cache.delete(f"account:{account_id}")
+        await self._account_cache.delete(f"credentials:{account_id}")
+
     async def create_connect_token(
         self,
         external_user_id: str,
@@ -221,21 +248,23 @@ class PipedreamService:
         if not self.is_configured:
             return None
 
-        headers = await self._get_auth_headers()
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{PIPEDREAM_API_BASE}/connect/accounts/{account_id}",
-                headers=headers,
-            )
+        cache_key = f"account:{account_id}"
+        cached = await self._account_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-            if response.status_code == 404:
-                return None
+        response = await self._get_with_auth(f"{PIPEDREAM_API_BASE}/connect/accounts/{account_id}")
 
-            if response.status_code != 200:
-                logger.error(f"Failed to get account: {response.status_code}")
-                return None
+        if response.status_code == 404:
+            return None
 
-            return response.json()
+        if response.status_code != 200:
+            logger.error(f"Failed to get account: {response.status_code}")
+            return None
+
+        account = response.json()
+        await self._account_cache.set(cache_key, account)
+        return account
 
     async def get_accounts_for_user(
         self,
@@ -300,6 +329,8 @@ class PipedreamService:
         if not self.is_configured:
             return False
 
+        await self.invalidate_account(account_id)
+
         headers = await self._get_auth_headers()
         async with httpx.AsyncClient() as client:
             response = await client.delete(
@@ -327,18 +358,20 @@ class PipedreamService:
         if not self.is_configured:
             return None
 
-        headers = await self._get_auth_headers()
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{PIPEDREAM_API_BASE}/connect/accounts/{account_id}/credentials",
-                headers=headers,
-            )
+        cache_key = f"credentials:{account_id}"
+        cached = await self._account_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-            if response.status_code != 200:
-                logger.error(f"Failed to get credentials: {response.status_code}")
-                return None
+        response = await self._get_with_auth(f"{PIPEDREAM_API_BASE}/connect/accounts/{account_id}/credentials")
 
-            return response.json()
+        if response.status_code != 200:
+            logger.error(f"Failed to get credentials: {response.status_code}")
+            return None
+
+        credentials = response.json()
+        await self._account_cache.set(cache_key, credentials)
+        return credentials
 
     async def proxy_request(
         self,
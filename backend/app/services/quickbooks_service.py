@@ -330,6 +330,19 @@ class QuickBooksService:
 
         return False
 
+    async def warm_up(self) -> bool:
+        """
+        Load stored tokens ahead of the first API call (called on app startup).
+
+        Returns:
+            True if tokens are loaded
+        """
+        if self._access_token:
+            return True
+        if not (self.is_configured or self.pipedream_configured):
+            return False
+        return await self._load_tokens()
+
     async def _ensure_valid_token(self) -> str:
         """
         Ensure we have a valid access token, refreshing if necessary.
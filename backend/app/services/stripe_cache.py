@@ -0,0 +1,65 @@
+"""
+Short-lived cache of active Stripe subscriptions
+
+The revenue projection endpoints each need the full list of active
+subscriptions, and a dashboard load hits all of them at once. Fetches are
+coalesced behind a lock and reused for SUBSCRIPTIONS_CACHE_TTL_SECONDS, so a
+dashboard load costs one Stripe fetch instead of one per endpoint.
+
+If Stripe fails after a successful fetch, the last good snapshot is returned
+with a warning instead of an error.
+"""
+import asyncio
+import logging
+from typing import NamedTuple, Optional
+
+from app.services.cache_service import InMemoryCache
+from app.services.stripe_service import StripeService
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTIONS_CACHE_TTL_SECONDS = 30
+STALE_WARNING = "Stripe is unavailable; showing subscriptions from the last successful fetch"
+
+_SUBS_CACHE_KEY = "active_subscriptions"
+_cache = InMemoryCache(default_ttl=SUBSCRIPTIONS_CACHE_TTL_SECONDS)
+_lock = asyncio.Lock()
+_last_subs: Optional[list[dict]] = None
+
+
+class SubscriptionSnapshot(NamedTuple):
+    subscriptions: list[dict]
+    warning: Optional[str] = None  # Set when serving a stale snapshot
+
+
+async def get_subs_cached() -> SubscriptionSnapshot:
+    """
+    Return active subscriptions, fetching from Stripe at most once per TTL
+
+    Concurrent callers on a cold cache wait for a single fetch. On a failed
+    fetch the last good snapshot is returned with a warning; with no snapshot
+    the error propagates.
+    """
+    global _last_subs
+
+    subs = await _cache.get(_SUBS_CACHE_KEY)
+    if subs is not None:
+        return SubscriptionSnapshot(subs)
+
+    async with _lock:
+        # Another request may have filled the cache while we waited
+        subs = await _cache.get(_SUBS_CACHE_KEY)
+        if subs is not None:
+            return SubscriptionSnapshot(subs)
+
+        try:
+            subs = await StripeService.get_active_subscriptions()
+        except Exception as e:
+            if _last_subs is None:
+                raise
+            logger.warning(f"Stripe subscription fetch failed, serving stale snapshot: {e}")
+            return SubscriptionSnapshot(_last_subs, STALE_WARNING)
+
+        await _cache.set(_SUBS_CACHE_KEY, subs)
+        _last_subs = subs
+        return SubscriptionSnapshot(subs)
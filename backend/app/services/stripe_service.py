@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Any, Callable, Optional
 
@@ -14,6 +16,14 @@ stripe.api_key = settings.STRIPE_SECRET_KEY
 DEFAULT_PAGE_SIZE = 100
 MAX_ITERATIONS = 100  # Safety limit to prevent infinite loops
 
+# Concurrent subscription listing: Stripe cursors are sequential within one
+# listing, so the active set is split into creation-date windows that are
+# paged independently. Stay well under Stripe's 100 req/s live-mode limit
+# and lower the concurrency if 429s show up.
+SUBSCRIPTION_FETCH_CONCURRENCY = 8
+SUBSCRIPTION_WINDOW_DAYS = 90
+SUBSCRIPTION_WINDOWS = 12  # The oldest window is open-ended
+
 
 class StripeService:
     """Service for interacting with Stripe API and calculating metrics"""
@@ -55,7 +65,8 @@ class StripeService:
             if starting_after:
                 page_params["starting_after"] = starting_after
 
-            response = list_fn(**page_params)
+            # Stripe's client is blocking; keep it off the event loop
+            response = await asyncio.to_thread(list_fn, **page_params)
             page_count = len(response.data)
             total_fetched += page_count
 
@@ -150,39 +161,82 @@ class StripeService:
     async def get_active_subscriptions(
         customer_ids: Optional[list[str]] = None,
     ) -> list[dict]:
-        """Fetch active subscriptions, optionally filtered by customer IDs"""
-        customer_id_set = set(customer_ids) if customer_ids else None
+        """
+        Fetch active subscriptions, optionally filtered by customer IDs
 
-        def process_subscription(sub):
-            return {
-                "id": sub.id,
-                "customer": sub.customer,
-                "status": sub.status,
-                "current_period_start": sub.current_period_start,
-                "current_period_end": sub.current_period_end,
-                "items": [
-                    {
-                        "price": item.price.id,
-                        "amount": item.price.unit_amount,
-                        "currency": item.price.currency,
-                        "interval": item.price.recurring.interval if item.price.recurring else None,
-                        "interval_count": item.price.recurring.interval_count if item.price.recurring else 1,
-                    }
-                    for item in sub["items"].data  # Stripe objects support dict-style access
-                ],
-            }
+        One unwindowed page is fetched first; only if Stripe reports more does
+        the listing switch to get_active_subscriptions_concurrent, which pages
+        creation-date windows in parallel. An active set that fits on one page
+        costs a single request. Items and prices come embedded in the list
+        response; no per-subscription requests are made.
+        """
+        first_page = await asyncio.to_thread(
+            stripe.Subscription.list, status="active", limit=DEFAULT_PAGE_SIZE
+        )
+        if first_page.has_more:
+            subscriptions = await StripeService.get_active_subscriptions_concurrent()
+        else:
+            subscriptions = [StripeService._process_subscription(sub) for sub in first_page.data]
 
-        def filter_by_customer(sub):
-            if not customer_id_set:
-                return True
-            return sub.customer in customer_id_set
+        if not customer_ids:
+            return subscriptions
 
-        return await StripeService._paginate_stripe_list(
-            list_fn=stripe.Subscription.list,
-            params={"status": "active"},
-            item_processor=process_subscription,
-            filter_fn=filter_by_customer if customer_ids else None,
-        )
+        customer_id_set = set(customer_ids)
+        return [sub for sub in subscriptions if sub["customer"] in customer_id_set]
+
+    @staticmethod
+    async def get_active_subscriptions_concurrent(
+        concurrency: int = SUBSCRIPTION_FETCH_CONCURRENCY,
+    ) -> list[dict]:
+        """
+        Fetch all active subscriptions, paging several creation-date windows at once
+
+        Returns subscriptions in Stripe's listing order (newest first): windows
+        are paged newest first and are disjoint (gte/lt bounds), so nothing is
+        listed twice.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        now = int(time.time())
+        window_seconds = SUBSCRIPTION_WINDOW_DAYS * 86400
+        windows = []
+        upper = None
+        for i in range(1, SUBSCRIPTION_WINDOWS):
+            lower = now - i * window_seconds
+            windows.append({"gte": lower} if upper is None else {"gte": lower, "lt": upper})
+            upper = lower
+        windows.append({"lt": upper})
+
+        async def fetch_window(created: dict[str, int]) -> list[dict]:
+            async with semaphore:
+                return await StripeService._paginate_stripe_list(
+                    list_fn=stripe.Subscription.list,
+                    params={"status": "active", "created": created},
+                    item_processor=StripeService._process_subscription,
+                )
+
+        pages = await asyncio.gather(*(fetch_window(created) for created in windows))
+        return [sub for page in pages for sub in page]
+
+    @staticmethod
+    def _process_subscription(sub) -> dict:
+        return {
+            "id": sub.id,
+            "customer": sub.customer,
+            "status": sub.status,
+            "current_period_start": sub.current_period_start,
+            "current_period_end": sub.current_period_end,
+            "items": [
+                {
+                    "price": item.price.id,
+                    "amount": item.price.unit_amount,
+                    "currency": item.price.currency,
+                    "interval": item.price.recurring.interval if item.price.recurring else None,
+                    "interval_count": item.price.recurring.interval_count if item.price.recurring else 1,
+                }
+                for item in sub["items"].data  # Stripe objects support dict-style access
+            ],
+        }
 
     @staticmethod
     async def calculate_mrr(subscriptions: list[dict]) -> float:
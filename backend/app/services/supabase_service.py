@@ -2,12 +2,42 @@ import logging
 from datetime import datetime
 from typing import Any, Optional
 
+import httpx
+from fastapi import HTTPException, status
+from postgrest.utils import SyncClient
 from supabase import Client, create_client
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# PostgREST session settings for long-lived clients. httpx drops idle
+# keep-alive connections after 5s by default, which on low-traffic admin
+# endpoints means a fresh TLS handshake on most requests.
+POSTGREST_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30)
+POSTGREST_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+
+def create_pooled_client(supabase_url: str, supabase_key: str) -> Client:
+    """
+    create_client() with its PostgREST session swapped for one tuned for reuse
+
+    Keeps the base URL and auth headers supabase-py set up; only the
+    connection pool limits and timeouts change.
+    """
+    client = create_client(supabase_url, supabase_key)
+    session = client.postgrest.session
+    client.postgrest.session = SyncClient(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=POSTGREST_TIMEOUT,
+        limits=POSTGREST_LIMITS,
+        follow_redirects=True,
+        http2=True,
+    )
+    session.close()
+    return client
+
 
 class SupabaseService:
     """Service for Supabase operations - fetch Stripe data and calculate metrics"""
@@ -23,7 +53,7 @@ class SupabaseService:
 
         try:
             logger.info(f"Connecting to Supabase: {settings.SUPABASE_URL}")
-            cls.client = create_client(
+            cls.client = create_pooled_client(
                 settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY
             )
             logger.info("✅ Connected to Supabase successfully")
@@ -31,6 +61,14 @@ class SupabaseService:
             logger.error(f"❌ Failed to connect to Supabase: {e}", exc_info=True)
             cls.client = None
 
+    @classmethod
+    def disconnect(cls):
+        """Close the PostgREST connection pool (called on app shutdown)"""
+        if cls.client is None:
+            return
+        cls.client.postgrest.session.close()
+        cls.client = None
+
     @classmethod
     def get_active_subscriptions(
         cls, product_category: Optional[str] = None
@@ -257,3 +295,26 @@ class SupabaseService:
             "arr": total_arr,
             "revenue_trend": revenue_trend,
         }
+
+
+async def get_supabase_client() -> Client:
+    """
+    FastAPI dependency returning the shared Supabase client
+
+    Connects lazily on first use and reuses SupabaseService.client afterwards.
+    Declared async so it runs on the event loop rather than the threadpool:
+    connect() is synchronous, so concurrent requests cannot race it.
+
+    Raises:
+        HTTPException: 503 if the client cannot be created
+    """
+    client = SupabaseService.client
+    if client is None:
+        SupabaseService.connect()
+        client = SupabaseService.client
+    if client is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection unavailable"
+        )
+    return client
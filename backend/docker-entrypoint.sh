@@ -11,6 +11,19 @@ fi
 # Default to 8000 if not set
 PORT=${PORT:-8000}
 
+# Two workers unless WEB_CONCURRENCY is set. Not nproc: in a container it
+# reports the host's CPUs, and every worker runs its own startup pre-warm
+# (Stripe listings, QuickBooks reads), blocking-IO thread pool and asyncpg
+# pool (up to POOL_MAX_SIZE=20 connections), so workers multiply the load on
+# Stripe and on Supavisor/Postgres.
+WORKERS=${WEB_CONCURRENCY:-2}
+
+# --limit-concurrency applies per worker; split the single-process budget of
+# 1000 so adding workers doesn't multiply requests queued on the DB pools
+LIMIT_CONCURRENCY=${LIMIT_CONCURRENCY:-$((1000 / WORKERS))}
+
 # Run the application
-exec uvicorn app.main:app --host 0.0.0.0 --port $PORT
+exec uvicorn app.main:app --host 0.0.0.0 --port $PORT \
+    --loop uvloop --http httptools \
+    --workers $WORKERS --limit-concurrency $LIMIT_CONCURRENCY --timeout-keep-alive 30
 
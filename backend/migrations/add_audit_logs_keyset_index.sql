@@ -0,0 +1,13 @@
+-- =====================================================
+-- Keyset Pagination Index for Audit Logs
+-- =====================================================
+-- Supports /audit/logs cursor paging, which orders by
+-- (created_at DESC, id DESC) and seeks past the last row
+-- instead of scanning and discarding an OFFSET
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at_id
+ON audit_logs(created_at DESC, id DESC);
+
+-- Superseded by the composite index above
+DROP INDEX IF EXISTS idx_audit_logs_created_at;
@@ -0,0 +1,25 @@
+-- =====================================================
+-- Singleton Key for Card Layouts
+-- =====================================================
+-- card_layouts holds a single master layout. A unique,
+-- always-true singleton column gives PUT /layouts a
+-- conflict target so it can save with one upsert instead
+-- of looking up the row id first
+-- =====================================================
+
+-- Keep only the most recently updated layout if duplicates crept in
+DELETE FROM card_layouts
+WHERE id NOT IN (
+    SELECT id FROM card_layouts
+    ORDER BY updated_at DESC
+    LIMIT 1
+);
+
+ALTER TABLE card_layouts
+    ADD COLUMN IF NOT EXISTS singleton BOOLEAN NOT NULL DEFAULT TRUE;
+
+ALTER TABLE card_layouts
+    DROP CONSTRAINT IF EXISTS card_layouts_singleton_key,
+    ADD CONSTRAINT card_layouts_singleton_key UNIQUE (singleton),
+    DROP CONSTRAINT IF EXISTS card_layouts_singleton_check,
+    ADD CONSTRAINT card_layouts_singleton_check CHECK (singleton);
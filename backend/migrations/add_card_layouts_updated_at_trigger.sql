@@ -0,0 +1,20 @@
+-- =====================================================
+-- Server-side updated_at for Card Layouts
+-- =====================================================
+-- updated_at already defaults to NOW() on insert; this trigger
+-- sets it on every update so the API no longer sends it
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION update_card_layouts_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_card_layouts_updated_at ON card_layouts;
+CREATE TRIGGER trigger_card_layouts_updated_at
+    BEFORE UPDATE ON card_layouts
+    FOR EACH ROW
+    EXECUTE FUNCTION update_card_layouts_updated_at();
@@ -0,0 +1,24 @@
+-- =====================================================
+-- Atomic Sync Metadata Update for Pipedream Connections
+-- =====================================================
+-- POST /integrations/sync/{app} records the last sync time and
+-- status in metadata. Setting the two keys in place avoids
+-- reading the whole metadata blob and writing it back, which
+-- could drop keys written concurrently
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION update_sync_metadata(
+    conn_id UUID,
+    sync_ts TIMESTAMPTZ,
+    sync_status TEXT
+)
+RETURNS VOID AS $$
+    UPDATE pipedream_connections
+    SET metadata = COALESCE(metadata, '{}'::jsonb)
+            || jsonb_build_object('last_sync', sync_ts, 'last_sync_status', sync_status)
+    WHERE id = conn_id;
+$$ LANGUAGE sql;
+
+-- updated_at is set by trigger_pipedream_connections_updated_at
+
+GRANT EXECUTE ON FUNCTION update_sync_metadata(UUID, TIMESTAMPTZ, TEXT) TO service_role;
@@ -0,0 +1,47 @@
+-- =====================================================
+-- Add Email to User Profiles
+-- =====================================================
+-- Lets the admin user listing filter, sort and limit
+-- in SQL instead of pulling every auth user
+-- =====================================================
+
+ALTER TABLE user_profiles ADD COLUMN IF NOT EXISTS email TEXT;
+
+-- Backfill from auth.users
+UPDATE user_profiles p
+SET email = u.email
+FROM auth.users u
+WHERE p.id = u.id AND p.email IS DISTINCT FROM u.email;
+
+-- Index for ORDER BY email in /admin/users
+CREATE INDEX IF NOT EXISTS idx_user_profiles_email ON user_profiles(email);
+
+-- Capture email on signup
+CREATE OR REPLACE FUNCTION public.handle_new_user()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO public.user_profiles (id, email, role, app_access, full_name)
+  VALUES (
+    NEW.id,
+    NEW.email,
+    COALESCE(NEW.raw_user_meta_data->>'role', 'investor'),
+    ARRAY[COALESCE(NEW.raw_user_meta_data->>'app_access', 'investor-deck')],
+    COALESCE(NEW.raw_user_meta_data->>'full_name', split_part(NEW.email, '@', 1))
+  );
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Keep email in sync when it changes in auth
+CREATE OR REPLACE FUNCTION public.sync_user_profile_email()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE public.user_profiles SET email = NEW.email WHERE id = NEW.id;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_auth_user_email_updated ON auth.users;
+CREATE TRIGGER on_auth_user_email_updated
+  AFTER UPDATE OF email ON auth.users
+  FOR EACH ROW EXECUTE FUNCTION public.sync_user_profile_email();
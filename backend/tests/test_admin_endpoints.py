@@ -3,11 +3,17 @@ Tests for admin API endpoints
 """
 
 from datetime import datetime
+from unittest.mock import MagicMock, patch
 
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
+from app.api.v1 import admin
 from app.api.v1.admin import UserProfile, UsersListResponse
 from app.main import app
+from app.services.auth import require_admin
+from app.services.supabase_service import get_supabase_client
 
 client = TestClient(app)
 
@@ -117,6 +123,111 @@ class TestAdminEndpoints:
         assert response.status_code in [401, 403]
 
 
+class TestListUsers:
+    """Tests for /api/v1/admin/users query building"""
+
+    @pytest.fixture
+    def mock_client(self):
+        admin._users_cache._cache.clear()
+        mock_client = MagicMock()
+        app.dependency_overrides[require_admin] = lambda: "admin-1"
+        app.dependency_overrides[get_supabase_client] = lambda: mock_client
+        yield mock_client
+        app.dependency_overrides.clear()
+
+    def test_filters_in_supabase(self, mock_client):
+        """Should filter, order and limit in the profiles query"""
+        query = mock_client.table.return_value.select.return_value
+        query.not_.in_.return_value = query
+        query.order.return_value.limit.return_value.execute.return_value = MagicMock(
+            data=[{"id": "1", "email": "a@test.com", "role": "investor"}],
+            count=42,
+        )
+
+        response = client.get("/api/v1/admin/users?limit=5")
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 42
+        assert response.json()["users"][0]["email"] == "a@test.com"
+        mock_client.table.assert_called_once_with("user_profiles")
+        query.not_.in_.assert_called_once_with("role", ["admin", "super_admin"])
+        query.order.assert_called_once_with("email")
+        query.order.return_value.limit.assert_called_once_with(5)
+        mock_client.auth.admin.list_users.assert_not_called()
+
+    def test_empty_profiles_result_is_returned(self, mock_client):
+        """Should return an empty listing without scanning auth users"""
+        query = mock_client.table.return_value.select.return_value
+        query.eq.return_value = query
+        query.not_.in_.return_value = query
+        query.order.return_value.limit.return_value.execute.return_value = MagicMock(data=[], count=0)
+
+        response = client.get("/api/v1/admin/users?role_filter=sales")
+
+        assert response.status_code == 200
+        assert response.json() == {"users": [], "total": 0}
+        mock_client.auth.admin.list_users.assert_not_called()
+
+    def test_falls_back_to_auth_users(self, mock_client):
+        """Should use the auth admin listing when the profiles query fails"""
+        query = mock_client.table.return_value.select.return_value
+        query.not_.in_.return_value = query
+        query.order.return_value.limit.return_value.execute.side_effect = RuntimeError("relation does not exist")
+        mock_client.auth.admin.list_users.return_value = [
+            MagicMock(id="2", email="b@test.com", user_metadata={"role": "sales"}, created_at=None),
+            MagicMock(id="1", email="A@test.com", user_metadata={}, created_at=None),
+            MagicMock(id="3", email="c@test.com", user_metadata={"role": "admin"}, created_at=None),
+        ]
+
+        response = client.get("/api/v1/admin/users")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert [u["email"] for u in data["users"]] == ["A@test.com", "b@test.com"]
+
+    def test_repeat_requests_are_cached(self, mock_client):
+        """Should serve a repeated listing from the cache"""
+        query = mock_client.table.return_value.select.return_value
+        query.not_.in_.return_value = query
+        query.order.return_value.limit.return_value.execute.return_value = MagicMock(
+            data=[{"id": "1", "email": "a@test.com", "role": "investor"}],
+            count=1,
+        )
+
+        first = client.get("/api/v1/admin/users")
+        second = client.get("/api/v1/admin/users")
+
+        assert first.json() == second.json()
+        mock_client.table.assert_called_once_with("user_profiles")
+
+
+class TestGetSupabaseClient:
+    """Tests for the shared Supabase client dependency"""
+
+    @pytest.mark.asyncio
+    async def test_returns_existing_client(self):
+        """Should reuse the connected client without reconnecting"""
+        mock_client = MagicMock()
+
+        with patch("app.services.supabase_service.SupabaseService") as mock_supabase:
+            mock_supabase.client = mock_client
+
+            assert await get_supabase_client() is mock_client
+            mock_supabase.connect.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unavailable_client(self):
+        """Should raise 503 when the client cannot be created"""
+        with patch("app.services.supabase_service.SupabaseService") as mock_supabase:
+            mock_supabase.client = None
+
+            with pytest.raises(HTTPException) as exc_info:
+                await get_supabase_client()
+            assert exc_info.value.status_code == 503
+            mock_supabase.connect.assert_called_once()
+
+
 class TestAdminEndpointModels:
     """Tests for admin endpoint model validation"""
 
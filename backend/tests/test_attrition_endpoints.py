@@ -0,0 +1,65 @@
+"""
+Tests for attrition API endpoints
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1 import attrition
+
+
+@pytest.fixture(autouse=True)
+def clear_attrition_cache():
+    attrition._attrition_cache._cache.clear()
+    attrition._attrition_inflight.clear()
+    yield
+    attrition._attrition_cache._cache.clear()
+    attrition._attrition_inflight.clear()
+
+
+class TestLtvMemoization:
+    """Tests for /api/v1/attrition/ltv caching"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_calculation(self):
+        """Should compute LTV once for concurrent callers and serve repeats from cache"""
+        calls = 0
+
+        async def slow_ltv():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"ltv_value": 14847}
+
+        with patch.object(attrition.RetentionService, "get_ltv_calculation", side_effect=slow_ltv), \
+                patch.object(attrition.MetricsCacheService, "save_metrics"):
+            results = await asyncio.gather(*(attrition.get_ltv_calculation() for _ in range(5)))
+            again = await attrition.get_ltv_calculation()
+
+        assert calls == 1
+        assert all(r == {"ltv_value": 14847} for r in results)
+        assert again == {"ltv_value": 14847}
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_memoized(self):
+        """Should retry the calculation on the next request after an error"""
+        with patch.object(attrition.RetentionService, "get_ltv_calculation", side_effect=RuntimeError("stripe down")), \
+                patch.object(attrition.MetricsCacheService, "get_latest_metrics", return_value=None), \
+                pytest.raises(HTTPException):
+            await attrition.get_ltv_calculation()
+
+        assert await attrition._attrition_cache.get("ltv") is None
+
+    @pytest.mark.asyncio
+    async def test_inflight_entries_are_released(self):
+        """Should drop the in-flight entry once the computation finishes"""
+
+        async def compute():
+            return {"ok": True}
+
+        await attrition._single_flight("summary:60:6:0.734", compute)
+
+        assert attrition._attrition_inflight == {}
@@ -0,0 +1,314 @@
+"""
+Tests for audit logging endpoints
+"""
+
+import base64
+import csv
+import io
+import re
+from uuid import UUID
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.api.v1 import audit
+from app.main import app
+from app.services import audit_writer as audit_writer_module, db_pool
+from app.services.audit_writer import AuditWriter
+from app.services.auth import get_current_user, require_admin
+from app.services.supabase_service import get_supabase_client
+
+
+class FakeQuery:
+    """Minimal stand-in for a PostgREST select builder over in-memory rows"""
+
+    def __init__(self, rows, calls, inserts=None):
+        self._rows = rows
+        self._calls = calls
+        self._inserts = inserts
+        self._filters = []
+        self._range = None
+        self._limit = None
+        self._after = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def insert(self, rows):
+        self._inserts.append(rows)
+        return self
+
+    def eq(self, column, value):
+        self._filters.append((column, value))
+        return self
+
+    def gte(self, column, value):
+        return self
+
+    def lte(self, column, value):
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def or_(self, filters):
+        # Only the keyset filter is used: created_at < ts OR (created_at = ts AND id < id)
+        created_at, _, log_id = re.findall(r'"([^"]*)"', filters)
+        self._after = (created_at, log_id)
+        return self
+
+    def limit(self, size):
+        self._limit = size
+        return self
+
+    def execute(self):
+        self._calls.append(self._range)
+        rows = [r for r in self._rows if all(r.get(c) == v for c, v in self._filters)]
+        if self._after:
+            rows = [r for r in rows if (r["created_at"], r["id"]) < self._after]
+        if self._range:
+            start, end = self._range
+            rows = rows[start:end + 1]
+        if self._limit:
+            rows = rows[:self._limit]
+
+        response = type("Response", (), {})()
+        response.data = rows
+        response.count = len(rows)
+        return response
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+        self.inserts = []
+
+    def table(self, name):
+        return FakeQuery(self.rows, self.calls, self.inserts)
+
+
+def make_log(i, action_type="login"):
+    return {
+        "id": f"log-{i}",
+        "user_id": "user-1",
+        "action_type": action_type,
+        "action_data": {"n": i},
+        "ip_address": "127.0.0.1",
+        "user_agent": "pytest",
+        "created_at": f"2025-11-01T00:00:{i % 60:02d}+00:00",
+    }
+
+
+@pytest.fixture
+def fake_client():
+    client = FakeClient([])
+    app.dependency_overrides[require_admin] = lambda: "admin-1"
+    app.dependency_overrides[get_current_user] = lambda: "user-1"
+    app.dependency_overrides[get_supabase_client] = lambda: client
+    yield client
+    app.dependency_overrides.clear()
+
+
+class TestAuditLogCreate:
+    """Tests for AuditLogCreate validation"""
+
+    def test_accepts_known_action_type(self):
+        log = audit.AuditLogCreate(action_type="impersonation_start")
+        assert log.action_type == "impersonation_start"
+
+    def test_rejects_unknown_action_type(self):
+        with pytest.raises(ValidationError):
+            audit.AuditLogCreate(action_type="login_extra")
+
+
+class TestCreateAuditLog:
+    """Tests for /api/v1/audit/log and the batched writer"""
+
+    def test_create_writes_directly_without_flusher(self, fake_client):
+        """Should insert immediately when the background writer isn't running"""
+        response = TestClient(app).post("/api/v1/audit/log", json={"action_type": "login"})
+
+        assert response.status_code == 202
+        body = response.json()
+        assert body["user_id"] == "user-1"
+        assert len(fake_client.inserts) == 1
+        assert fake_client.inserts[0][0]["id"] == body["id"]
+
+    @pytest.mark.asyncio
+    async def test_writer_batches_queued_rows(self, monkeypatch):
+        """Should write queued rows in a single insert and flush on stop"""
+        client = FakeClient([])
+        monkeypatch.setattr(audit_writer_module.SupabaseService, "client", client)
+        writer = AuditWriter()
+
+        await writer.start()
+        for i in range(3):
+            await writer.write({"id": f"log-{i}"}, client)
+        await writer.stop()
+
+        assert client.inserts == [[{"id": "log-0"}, {"id": "log-1"}, {"id": "log-2"}]]
+
+    @pytest.mark.asyncio
+    async def test_writer_uses_pool_when_configured(self):
+        """Should write batches through the asyncpg pool instead of PostgREST"""
+
+        class FakePool:
+            def __init__(self):
+                self.batches = []
+
+            async def executemany(self, sql, records):
+                self.batches.append(records)
+
+        pool = FakePool()
+        writer = AuditWriter()
+        writer._pool = pool
+
+        await writer._flush([dict(make_log(1), action_data=None), make_log(2)])
+
+        assert [r[0] for r in pool.batches[0]] == ["log-1", "log-2"]
+        assert pool.batches[0][0][3] is None
+        assert pool.batches[0][1][3] == {"n": 2}
+
+    def test_rejects_invalid_ip_address(self, fake_client):
+        """Should 422 on a malformed ip_address instead of queueing it"""
+        response = TestClient(app).post(
+            "/api/v1/audit/log", json={"action_type": "login", "ip_address": "not-an-ip"}
+        )
+
+        assert response.status_code == 422
+        assert fake_client.inserts == []
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_retries_rows_individually(self):
+        """Should write the good rows of a batch when one row fails"""
+
+        class FlakyPool:
+            def __init__(self):
+                self.written = []
+
+            async def executemany(self, sql, records):
+                if any(r[0] == "log-bad" for r in records):
+                    raise ValueError("invalid input syntax for type inet")
+                self.written.extend(r[0] for r in records)
+
+        pool = FlakyPool()
+        writer = AuditWriter()
+        writer._pool = pool
+
+        await writer._flush([make_log(1), dict(make_log(2), id="log-bad"), make_log(3)])
+
+        assert pool.written == ["log-1", "log-3"]
+
+    @pytest.mark.asyncio
+    async def test_jsonb_codec_round_trips_with_orjson(self):
+        """Should register a jsonb codec that encodes dicts with orjson"""
+
+        class FakeConnection:
+            async def set_type_codec(self, typename, *, encoder, decoder, schema):
+                self.codec = (typename, schema, encoder, decoder)
+
+        conn = FakeConnection()
+        await db_pool._init_connection(conn)
+
+        typename, schema, encoder, decoder = conn.codec
+        assert (typename, schema) == ("jsonb", "pg_catalog")
+        assert decoder(encoder({"n": 1})) == {"n": 1}
+
+
+class TestGetAuditLogs:
+    """Tests for /api/v1/audit/logs"""
+
+    def test_returns_validated_page(self, fake_client):
+        """Should return the requested page shaped by the response model"""
+        fake_client.rows.extend(make_log(i) for i in range(3))
+
+        response = TestClient(app).get("/api/v1/audit/logs?page=1&page_size=2")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [log["id"] for log in body["logs"]] == ["log-0", "log-1"]
+        assert body["logs"][0]["created_at"] == "2025-11-01T00:00:00Z"
+        assert body["page_size"] == 2
+        assert body["next_cursor"]
+
+    def test_cursor_pages_past_last_row(self, fake_client):
+        """Should continue after the cursor row and stop on a short page"""
+        # Newest first, as the query orders by created_at DESC
+        fake_client.rows.extend(dict(make_log(i), id=str(UUID(int=i))) for i in reversed(range(3)))
+
+        first = TestClient(app).get("/api/v1/audit/logs?page_size=2").json()
+        second = TestClient(app).get(
+            f"/api/v1/audit/logs?page_size=2&cursor={first['next_cursor']}"
+        ).json()
+
+        assert [log["id"] for log in first["logs"]] == [str(UUID(int=2)), str(UUID(int=1))]
+        assert [log["id"] for log in second["logs"]] == [str(UUID(int=0))]
+        assert second["next_cursor"] is None
+
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            "not-a-cursor",
+            # Decodes and splits, but would rewrite the PostgREST or_ filter
+            '2024-01-01",id.gt."0|x',
+            f"yesterday|{UUID(int=1)}",
+            "2025-11-01T00:00:00+00:00|log-1",
+        ],
+    )
+    def test_invalid_cursor(self, fake_client, raw):
+        """Should reject a cursor that isn't a timestamp and UUID"""
+        cursor = raw if raw == "not-a-cursor" else base64.urlsafe_b64encode(raw.encode()).decode()
+        response = TestClient(app).get("/api/v1/audit/logs", params={"cursor": cursor})
+
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Invalid cursor"}
+        assert fake_client.calls == []
+
+
+class TestExportAuditLogs:
+    """Tests for /api/v1/audit/logs/export"""
+
+    def test_export_streams_all_pages(self, fake_client, monkeypatch):
+        """Should keyset-page through Supabase and emit every row once"""
+        monkeypatch.setattr(audit, "EXPORT_PAGE_SIZE", 2)
+        # Newest first, as the query orders by created_at DESC
+        fake_client.rows.extend(make_log(i) for i in reversed(range(5)))
+
+        response = TestClient(app).get("/api/v1/audit/logs/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert re.fullmatch(
+            r'attachment; filename="audit_logs_\d{8}_\d{6}\.csv"', response.headers["content-disposition"]
+        )
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == ["id", "user_id", "action_type", "action_data", "ip_address", "user_agent", "created_at"]
+        assert [r[0] for r in rows[1:]] == [f"log-{i}" for i in reversed(range(5))]
+        # Keyset pages never fall back to OFFSET ranges
+        assert fake_client.calls == [None, None, None]
+
+    def test_export_pages_past_created_at_ties(self, fake_client, monkeypatch):
+        """Should not skip or repeat rows that share a created_at across pages"""
+        monkeypatch.setattr(audit, "EXPORT_PAGE_SIZE", 2)
+        for i in reversed(range(5)):
+            fake_client.rows.append({**make_log(i), "created_at": "2025-11-01T00:00:00+00:00"})
+
+        response = TestClient(app).get("/api/v1/audit/logs/export")
+
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert [r[0] for r in rows[1:]] == [f"log-{i}" for i in reversed(range(5))]
+
+    def test_export_empty(self, fake_client):
+        """Should return only the header when there are no logs"""
+        response = TestClient(app).get("/api/v1/audit/logs/export")
+
+        assert response.status_code == 200
+        assert response.text.strip().splitlines() == [
+            "id,user_id,action_type,action_data,ip_address,user_agent,created_at"
+        ]
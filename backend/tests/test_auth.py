@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from fastapi import HTTPException
 
+from app.services import auth
 from app.services.auth import (
     get_current_user,
     get_user_role,
@@ -15,6 +16,13 @@ from app.services.auth import (
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    auth._token_cache._cache.clear()
+    yield
+    auth._token_cache._cache.clear()
+
+
 class TestGetCurrentUser:
     """Tests for get_current_user function"""
 
@@ -50,6 +58,24 @@ class TestGetCurrentUser:
             assert user_id == "user-123"
             mock_client.auth.get_user.assert_called_once_with("valid_token")
 
+    @pytest.mark.asyncio
+    async def test_valid_token_is_cached(self):
+        """Should validate a token with Supabase once and reuse the user_id"""
+        mock_user = MagicMock()
+        mock_user.user.id = "user-123"
+
+        mock_client = MagicMock()
+        mock_client.auth.get_user.return_value = mock_user
+
+        with patch("app.services.auth.SupabaseService") as mock_supabase:
+            mock_supabase.client = mock_client
+
+            assert await get_current_user(authorization="Bearer valid_token") == "user-123"
+            assert await get_current_user(authorization="Bearer valid_token") == "user-123"
+
+        mock_client.auth.get_user.assert_called_once_with("valid_token")
+        assert "valid_token" not in str(auth._token_cache._cache)
+
     @pytest.mark.asyncio
     async def test_invalid_token(self):
         """Should raise 401 when token is invalid"""
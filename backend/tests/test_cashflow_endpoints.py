@@ -0,0 +1,125 @@
+"""
+Tests for CashFlow API endpoints
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1 import cashflow
+from app.main import app
+
+
+def cached_summary(age_seconds: int) -> dict:
+    fetched_at = datetime.now(timezone.utc) - timedelta(seconds=age_seconds)
+    return {"data": {"totals": {"total_cash_available": 100.0}}, "fetched_at": fetched_at.isoformat()}
+
+
+class TestCashflowSummaryCache:
+    """Tests for /api/v1/cashflow/summary stale-while-revalidate"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_cache_is_served_without_refresh(self):
+        """Should return fresh cached data and not touch the service"""
+        with patch.object(cashflow.MetricsCacheService, "get_latest_metrics", new_callable=AsyncMock,
+                          return_value=cached_summary(60)), \
+                patch.object(cashflow.CashFlowService, "get_cashflow_summary", new_callable=AsyncMock) as refresh:
+            result = orjson.loads((await cashflow.get_cashflow_summary(_admin=True, force_refresh=False)).body)
+
+        assert result["is_cached"] is True
+        assert result["is_stale"] is False
+        refresh.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_stale_cache_is_served_and_refreshed_once(self):
+        """Should return stale data immediately and refresh once in the background"""
+        with patch.object(cashflow.MetricsCacheService, "get_latest_metrics", new_callable=AsyncMock,
+                          return_value=cached_summary(600)), \
+                patch.object(cashflow.CashFlowService, "get_cashflow_summary", new_callable=AsyncMock) as refresh:
+            responses = await asyncio.gather(
+                *(cashflow.get_cashflow_summary(_admin=True, force_refresh=False) for _ in range(3))
+            )
+            results = [orjson.loads(r.body) for r in responses]
+            await cashflow._refresh_task
+
+        assert all(r["is_stale"] is True for r in results)
+        assert results[0]["totals"]["total_cash_available"] == 100.0
+        refresh.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_expired_cache_blocks_on_refresh(self):
+        """Should fetch fresh data once the cache is past the stale window"""
+        with patch.object(cashflow.MetricsCacheService, "get_latest_metrics", new_callable=AsyncMock,
+                          return_value=cached_summary(3600)), \
+                patch.object(cashflow.CashFlowService, "get_cashflow_summary", new_callable=AsyncMock,
+                             return_value={"fresh": True}):
+            result = orjson.loads((await cashflow.get_cashflow_summary(_admin=True, force_refresh=False)).body)
+
+        assert result == {"fresh": True}
+
+
+class TestCashflowStatus:
+    """Tests for /api/v1/cashflow/status"""
+
+    @pytest.mark.asyncio
+    async def test_status_reads_both_caches(self):
+        """Should look up the QuickBooks and summary caches and report each"""
+
+        async def latest(metric_type):
+            return cached_summary(60) if metric_type == "cashflow_summary" else None
+
+        with patch.object(cashflow.MetricsCacheService, "get_latest_metrics", side_effect=latest) as lookup:
+            result = await cashflow.get_cashflow_status()
+
+        assert {c.args[0] for c in lookup.call_args_list} == {"quickbooks_cash_position", "cashflow_summary"}
+        assert result["quickbooks"]["has_cached_data"] is False
+        assert result["cache"]["has_summary"] is True
+        assert result["cache"]["is_fresh"] is True
+
+
+class TestCashflowErrors:
+    """Tests for unexpected errors in cashflow endpoints"""
+
+    def test_service_error_returns_generic_500(self):
+        """Should return a sanitized 500 without the underlying error text"""
+        app.dependency_overrides[cashflow.verify_admin] = lambda: True
+        try:
+            with patch.object(cashflow.CashFlowService, "get_bank_balances", new_callable=AsyncMock,
+                              side_effect=RuntimeError("qb token abc123 expired")):
+                response = TestClient(app, raise_server_exceptions=False).get("/api/v1/cashflow/bank-balances")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 500
+        assert response.json() == {"detail": "Internal server error"}
+        assert "abc123" not in response.text
+
+    def test_service_error_keeps_cors_headers(self):
+        """Should return the 500 through CORSMiddleware so the browser can read it"""
+        app.dependency_overrides[cashflow.verify_admin] = lambda: True
+        try:
+            with patch.object(cashflow.CashFlowService, "get_bank_balances", new_callable=AsyncMock,
+                              side_effect=RuntimeError("qb down")):
+                response = TestClient(app, raise_server_exceptions=False).get(
+                    "/api/v1/cashflow/bank-balances", headers={"Origin": "http://localhost:3000"}
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 500
+        assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+        assert response.json() == {"detail": "Internal server error"}
+
+    def test_validation_errors_are_not_sanitized(self):
+        """Should still return 422 for invalid query params"""
+        app.dependency_overrides[cashflow.verify_admin] = lambda: True
+        try:
+            response = TestClient(app).get("/api/v1/cashflow/summary?force_refresh=maybe")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 422
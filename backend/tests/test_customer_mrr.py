@@ -2,18 +2,28 @@
 Tests for Customer MRR API endpoints
 """
 
+import asyncio
 from datetime import datetime
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
+from app.api.v1 import customer_mrr
 from app.main import app
 
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def clear_mrr_cache():
+    """Each test patches Stripe with its own data, so start from a cold cache"""
+    customer_mrr._mrr_cache._cache.clear()
+    yield
+    customer_mrr._mrr_cache._cache.clear()
+
+
 # Sample subscription data for testing
 def create_mock_subscription(
     customer_id: str,
@@ -48,7 +58,7 @@ class TestCustomerMRRList:
     async def test_empty_subscriptions_list(self):
         """Should return empty list when no subscriptions"""
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -67,7 +77,7 @@ class TestCustomerMRRList:
             create_mock_subscription("cus_1", "sub_1", 9900, "month"),  # $99/mo
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -85,7 +95,7 @@ class TestCustomerMRRList:
             create_mock_subscription("cus_1", "sub_1", 120000, "year"),  # $1200/yr = $100/mo
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -102,7 +112,7 @@ class TestCustomerMRRList:
             create_mock_subscription("cus_1", "sub_1", 2500, "week"),  # $25/wk = ~$108.33/mo
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -119,7 +129,7 @@ class TestCustomerMRRList:
             create_mock_subscription("cus_1", "sub_1", 100, "day"),  # $1/day = $30/mo
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -135,7 +145,7 @@ class TestCustomerMRRList:
             create_mock_subscription("cus_1", "sub_1", 30000, "month", interval_count=3),  # $300/3mo = $100/mo
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -152,7 +162,7 @@ class TestCustomerMRRList:
             create_mock_subscription("cus_2", "sub_2", 9900, "month"),  # $99/mo
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -170,7 +180,7 @@ class TestCustomerMRRList:
             create_mock_subscription("cus_2", "sub_2", 15000, "month"),  # $150/mo
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -189,7 +199,7 @@ class TestCustomerMRRList:
             create_mock_subscription("cus_3", "sub_3", 10000, "month"),  # $100/mo
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -207,7 +217,7 @@ class TestCustomerMRRList:
             create_mock_subscription("cus_2", "sub_2", 15000, "month"),
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -225,7 +235,7 @@ class TestCustomerMRRList:
             create_mock_subscription("cus_a", "sub_2", 15000, "month"),
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -235,6 +245,26 @@ class TestCustomerMRRList:
             customer_ids = [c["customer_id"] for c in data["customers"]]
             assert customer_ids == ["cus_a", "cus_z"]
 
+    @pytest.mark.asyncio
+    async def test_limit_returns_top_n_by_mrr(self):
+        """Should return the N highest-MRR customers while totals cover all"""
+        mock_subs = [
+            create_mock_subscription("cus_1", "sub_1", 5000, "month"),  # $50/mo
+            create_mock_subscription("cus_2", "sub_2", 20000, "month"),  # $200/mo
+            create_mock_subscription("cus_3", "sub_3", 10000, "month"),  # $100/mo
+        ]
+        with patch(
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
+            new_callable=AsyncMock,
+            return_value=mock_subs,
+        ):
+            response = client.get("/api/v1/customer-mrr/list?limit=2")
+            assert response.status_code == 200
+            data = response.json()
+            assert [c["customer_id"] for c in data["customers"]] == ["cus_2", "cus_3"]
+            assert data["total_customers"] == 3
+            assert data["total_mrr"] == 350.0
+
 
 class TestMRRByTier:
     """Tests for /customer-mrr/summary-by-tier endpoint"""
@@ -243,7 +273,7 @@ class TestMRRByTier:
     async def test_empty_tier_summary(self):
         """Should return empty tiers when no subscriptions"""
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -265,7 +295,7 @@ class TestMRRByTier:
             create_mock_subscription("cus_starter", "sub_5", 5000, "month"),  # $50/mo - Starter
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -292,7 +322,7 @@ class TestMRRByTier:
             create_mock_subscription("cus_2", "sub_2", 30000, "month"),  # $300/mo - Growth
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -313,15 +343,17 @@ class TestCustomerMRRExport:
     async def test_export_csv_empty(self):
         """Should return CSV with header only when no data"""
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=[],
         ):
             response = client.get("/api/v1/customer-mrr/export-csv")
             assert response.status_code == 200
-            data = response.json()
-            assert data["row_count"] == 0
-            assert "Customer ID,Subscription ID,MRR" in data["csv"]
+            assert response.headers["content-type"].startswith("text/csv")
+            assert response.headers["content-disposition"].startswith('attachment; filename="customer_mrr_')
+            assert response.text.splitlines() == [
+                "Customer ID,Subscription ID,MRR,Interval,Amount,Next Invoice,Status"
+            ]
 
     @pytest.mark.asyncio
     async def test_export_csv_with_data(self):
@@ -330,19 +362,19 @@ class TestCustomerMRRExport:
             create_mock_subscription("cus_test123", "sub_test456", 9900, "month"),
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
             response = client.get("/api/v1/customer-mrr/export-csv")
             assert response.status_code == 200
-            data = response.json()
-            
-            assert data["row_count"] == 1
-            assert "cus_test123" in data["csv"]
-            assert "sub_test456" in data["csv"]
-            assert "99.00" in data["csv"]
-            assert "month" in data["csv"]
+            rows = response.text.splitlines()
+
+            assert len(rows) == 2
+            assert "cus_test123" in rows[1]
+            assert "sub_test456" in rows[1]
+            assert "99.00" in rows[1]
+            assert "month" in rows[1]
 
     @pytest.mark.asyncio
     async def test_export_csv_skips_zero_mrr(self):
@@ -352,14 +384,98 @@ class TestCustomerMRRExport:
             create_mock_subscription("cus_paid", "sub_paid", 9900, "month"),
         ]
         with patch(
-            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions",
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
             response = client.get("/api/v1/customer-mrr/export-csv")
             assert response.status_code == 200
-            data = response.json()
-            
-            assert data["row_count"] == 1
-            assert "cus_free" not in data["csv"]
-            assert "cus_paid" in data["csv"]
+
+            assert len(response.text.splitlines()) == 2
+            assert "cus_free" not in response.text
+            assert "cus_paid" in response.text
+
+    @pytest.mark.asyncio
+    async def test_export_csv_streams_in_chunks(self, monkeypatch):
+        """Should emit every row once across chunk boundaries"""
+        monkeypatch.setattr("app.api.v1.customer_mrr.EXPORT_CHUNK_ROWS", 2)
+        mock_subs = [
+            create_mock_subscription(f"cus_{i}", f"sub_{i}", 9900, "month")
+            for i in range(5)
+        ]
+        with patch(
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
+            new_callable=AsyncMock,
+            return_value=mock_subs,
+        ):
+            response = client.get("/api/v1/customer-mrr/export-csv")
+
+            rows = response.text.splitlines()
+            assert [r.split(",")[0] for r in rows[1:]] == [f"cus_{i}" for i in range(5)]
+
+
+class TestCustomerMRRCache:
+    """Tests for the shared subscription normalization cache"""
+
+    @pytest.mark.asyncio
+    async def test_endpoints_share_one_stripe_fetch(self):
+        """Should fetch subscriptions once for list, tier summary and export"""
+        mock_subs = [
+            create_mock_subscription("cus_1", "sub_1", 10000, "month"),
+            create_mock_subscription("cus_2", "sub_2", 2500, "week"),
+        ]
+        with patch(
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
+            new_callable=AsyncMock,
+            return_value=mock_subs,
+        ) as mock_fetch:
+            list_data = client.get("/api/v1/customer-mrr/list").json()
+            tier_data = client.get("/api/v1/customer-mrr/summary-by-tier").json()
+            export_csv = client.get("/api/v1/customer-mrr/export-csv").text
+
+            mock_fetch.assert_awaited_once()
+            # Every view now agrees on MRR, including weekly billing
+            assert list_data["total_mrr"] == tier_data["total_mrr"] == 208.33
+            assert len(export_csv.splitlines()) == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_fetch(self):
+        """Should run a single Stripe fetch for concurrent cache misses"""
+
+        async def slow_fetch():
+            await asyncio.sleep(0.01)
+            return [create_mock_subscription("cus_1", "sub_1", 10000, "month")]
+
+        with patch(
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
+            side_effect=slow_fetch,
+        ) as mock_fetch:
+            results = await asyncio.gather(
+                *(customer_mrr._get_normalized_subscriptions() for _ in range(5))
+            )
+
+        assert mock_fetch.call_count == 1
+        assert all(r is results[0] for r in results)
+        assert customer_mrr._mrr_inflight is None
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_reaches_all_waiters_and_is_not_cached(self):
+        """Should fail every waiter from one fetch and retry on the next miss"""
+
+        async def failing_fetch():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("rate limited")
+
+        with patch(
+            "app.api.v1.customer_mrr.StripeService.get_active_subscriptions_concurrent",
+            side_effect=failing_fetch,
+        ) as mock_fetch:
+            results = await asyncio.gather(
+                *(customer_mrr._get_normalized_subscriptions() for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        assert mock_fetch.call_count == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert customer_mrr._mrr_inflight is None
+        assert await customer_mrr._mrr_cache.get(customer_mrr._MRR_CACHE_KEY) is None
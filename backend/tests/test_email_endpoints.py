@@ -0,0 +1,51 @@
+"""
+Tests for email endpoints
+"""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.api.v1 import emails
+from app.main import app
+
+client = TestClient(app)
+
+
+class TestEmailValidation:
+    """Tests for the cached email address validation"""
+
+    def test_normalizes_like_email_str(self):
+        """Should lowercase the domain the same way EmailStr does"""
+        request = emails.WelcomeEmailRequest(to_email="Investor@VC-Firm.com", user_name="Jo")
+        assert request.to_email == "Investor@vc-firm.com"
+
+    def test_rejects_invalid_address_every_time(self):
+        """Should keep rejecting a bad address on repeat, not cache a pass"""
+        for _ in range(2):
+            with pytest.raises(ValidationError):
+                emails.WelcomeEmailRequest(to_email="not-an-email", user_name="Jo")
+
+    def test_repeat_addresses_hit_the_cache(self):
+        """Should validate a repeated address once"""
+        emails._normalize_email.cache_clear()
+        for _ in range(3):
+            emails.WelcomeEmailRequest(to_email="repeat@example.com", user_name="Jo")
+
+        info = emails._normalize_email.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
+    def test_invalid_address_returns_422(self):
+        """Should reject the request before any email is sent"""
+        with patch.object(emails.EmailService, "send_welcome_email") as send:
+            response = client.post("/api/v1/emails/welcome", json={"to_email": "nope", "user_name": "Jo"})
+
+        assert response.status_code == 422
+        send.assert_not_called()
+
+    def test_openapi_keeps_email_format(self):
+        """Should still document the field as an email string"""
+        schema = client.get("/openapi.json").json()["components"]["schemas"]["WelcomeEmailRequest"]
+        assert schema["properties"]["to_email"]["format"] == "email"
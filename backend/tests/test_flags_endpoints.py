@@ -0,0 +1,129 @@
+"""
+Tests for feature flags endpoints
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1 import flags
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def clear_flags_cache():
+    flags.clear_cached_flags()
+    yield
+    flags.clear_cached_flags()
+
+
+class TestFlagsCache:
+    """Tests for the in-memory flags snapshot"""
+
+    def test_cached_flags_expire(self, monkeypatch):
+        """Should serve cached flags until the TTL passes"""
+        now = [1_000_000_000]
+        monkeypatch.setattr(flags.time, "monotonic_ns", lambda: now[0])
+
+        flags.cache_flags({"maintenance_mode": True})
+        now[0] += flags.FLAGS_CACHE_TTL * 1_000_000_000 - 1
+        assert flags.get_cached_flags() == {"maintenance_mode": True}
+
+        now[0] += 1
+        assert flags.get_cached_flags() is None
+
+    def test_get_flags_uses_cache_after_first_read(self, monkeypatch):
+        """Should read the environment once and then serve from cache"""
+        monkeypatch.setenv("FEATURE_FLAG_MAINTENANCE_MODE", "true")
+        client = TestClient(app)
+
+        first = client.get("/api/v1/flags").json()
+        second = client.get("/api/v1/flags").json()
+
+        assert first["source"] == "environment"
+        assert second["source"] == "cache"
+        assert second["flags"]["maintenance_mode"] is True
+
+    def test_refresh_bypasses_cache(self, monkeypatch):
+        """Should drop the cached snapshot and re-read the source"""
+        flags.cache_flags({"maintenance_mode": True})
+        monkeypatch.setenv("FEATURE_FLAG_MAINTENANCE_MODE", "false")
+
+        body = TestClient(app).post("/api/v1/flags/refresh").json()
+
+        assert body["source"] == "environment"
+        assert body["flags"]["maintenance_mode"] is False
+
+    def test_defaults_are_shared_without_overrides(self, monkeypatch):
+        """Should return the read-only defaults as-is and still serialize them"""
+        for _, env_key in flags._ENV_KEYS:
+            monkeypatch.delenv(env_key, raising=False)
+
+        assert flags.get_flags_from_env() is flags.DEFAULT_FLAGS
+        with pytest.raises(TypeError):
+            flags.DEFAULT_FLAGS["maintenance_mode"] = True
+
+        client = TestClient(app)
+        assert client.get("/api/v1/flags").json()["flags"] == dict(flags.DEFAULT_FLAGS)
+        assert client.get("/api/v1/flags/defaults").json()["flags"] == dict(flags.DEFAULT_FLAGS)
+
+
+class TestEdgeConfigFlags:
+    """Tests for reading flags from Vercel Edge Config"""
+
+    @pytest.fixture
+    def edge_config(self, monkeypatch):
+        """Point EDGE_CONFIG at a mock transport and record each request"""
+        monkeypatch.setenv("EDGE_CONFIG", "https://edge-config.vercel.com/ecfg_test?token=tok")
+        requests = []
+        state = {"handler": None}
+
+        async def transport(request):
+            requests.append(request)
+            return await state["handler"](request)
+
+        monkeypatch.setattr(
+            flags, "_edge_client", httpx.AsyncClient(transport=httpx.MockTransport(transport))
+        )
+        return requests, state
+
+    def test_item_url(self):
+        """Should address the flags item and keep the token"""
+        url = flags._edge_config_item_url("https://edge-config.vercel.com/ecfg_1?token=abc", "feature_flags")
+        assert url == "https://edge-config.vercel.com/ecfg_1/item/feature_flags?token=abc"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_fetch_once(self, edge_config):
+        """Should make one Edge Config request for concurrent cache misses"""
+        requests, state = edge_config
+
+        async def handler(request):
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"maintenance_mode": True})
+
+        state["handler"] = handler
+
+        results = await asyncio.gather(*(flags.get_feature_flags() for _ in range(5)))
+
+        assert len(requests) == 1
+        assert requests[0].url.path == "/ecfg_test/item/feature_flags"
+        assert all(r["flags"]["maintenance_mode"] is True for r in results)
+        assert sorted(r["source"] for r in results) == ["cache"] * 4 + ["edge_config"]
+
+    @pytest.mark.asyncio
+    async def test_timeout_falls_back_to_environment(self, edge_config, monkeypatch):
+        """Should use environment flags when Edge Config doesn't answer in time"""
+        _, state = edge_config
+        monkeypatch.setenv("FEATURE_FLAG_READ_ONLY_MODE", "true")
+
+        async def handler(request):
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        state["handler"] = handler
+
+        result = await flags.get_feature_flags()
+
+        assert result["source"] == "environment"
+        assert result["flags"]["read_only_mode"] is True
@@ -0,0 +1,406 @@
+"""
+Tests for integrations endpoints
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.v1 import integrations
+from app.main import app
+from app.services import supabase_service
+
+
+@pytest.fixture(autouse=True)
+def clear_client_cache(monkeypatch):
+    integrations._build_supabase_client.cache_clear()
+    integrations._status_cache._cache.clear()
+    monkeypatch.setattr(integrations, "_last_status", None)
+    yield
+    integrations._build_supabase_client.cache_clear()
+    integrations._status_cache._cache.clear()
+
+
+class TestSupabaseClient:
+    """Tests for the integrations Supabase client"""
+
+    @pytest.mark.asyncio
+    async def test_client_is_created_once(self, monkeypatch):
+        """Should build the service-role client once and reuse it"""
+        monkeypatch.setattr(integrations.settings, "SUPABASE_URL", "https://example.supabase.co")
+        monkeypatch.setattr(integrations.settings, "SUPABASE_SERVICE_ROLE_KEY", "service-key")
+
+        with patch.object(integrations, "create_pooled_client", return_value=object()) as create:
+            first = await integrations.get_supabase_client()
+            second = await integrations.get_supabase_client()
+
+        assert first is second
+        create.assert_called_once_with("https://example.supabase.co", "service-key")
+
+    def test_pooled_client_keeps_auth_and_tunes_session(self):
+        """Should keep supabase-py's URL and headers but use the pooled session settings"""
+        client = supabase_service.create_pooled_client("https://example.supabase.co", "a.b.c")
+        session = client.postgrest.session
+
+        assert str(session.base_url) == "https://example.supabase.co/rest/v1/"
+        assert session.headers["apikey"] == "a.b.c"
+        assert session.timeout == supabase_service.POSTGREST_TIMEOUT
+        session.close()
+
+
+class FakePool:
+    def __init__(self, rows):
+        self.rows = rows
+        self.args = None
+
+    async def fetch(self, sql, *args):
+        self.args = list(args)
+        return self.rows
+
+
+class TestStoredConnections:
+    """Tests for reading stored connections"""
+
+    @pytest.mark.asyncio
+    async def test_reads_over_pool_when_running(self, monkeypatch):
+        """Should read connections with one pooled query instead of PostgREST"""
+
+        pool = FakePool([{"app": "slack", "status": "active", "account_id": "apn_1",
+                          "connected_at": "2025-11-01T00:00:00+00:00",
+                          "last_sync": None, "pipedream_sync": None}])
+        monkeypatch.setattr(integrations.db_pool, "pool", pool)
+
+        rows = await integrations._fetch_stored_connections(None)
+
+        assert rows[0]["app"] == "slack"
+        assert rows[0]["connected_at"] == "2025-11-01T00:00:00+00:00"
+        assert pool.args == [["quickbooks", "stripe", "google_sheets", "slack"]]
+
+    @pytest.mark.asyncio
+    async def test_status_merges_stored_rows_per_supported_app(self, monkeypatch):
+        """Should report every supported app once, filled from stored rows"""
+        pool = FakePool([{"app": "quickbooks", "status": "active", "account_id": "apn_qb",
+                          "connected_at": "2025-11-01T00:00:00+00:00",
+                          "last_sync": "2025-11-02T00:00:00+00:00", "pipedream_sync": None}])
+        monkeypatch.setattr(integrations.db_pool, "pool", pool)
+        monkeypatch.setattr(integrations.pipedream_service, "project_id", "proj")
+        monkeypatch.setattr(integrations.pipedream_service, "client_id", "id")
+        monkeypatch.setattr(integrations.pipedream_service, "client_secret", "secret")
+        monkeypatch.setattr(integrations.pipedream_service, "get_accounts_for_user", AsyncMock(return_value=[]))
+        monkeypatch.setattr(integrations.settings, "STRIPE_SECRET_KEY", "")
+
+        response = await integrations.get_all_connection_status(_admin=True, user_id=None)
+        result = orjson.loads(response.body)
+
+        by_app = {c["app"]: c for c in result["connections"]}
+        assert list(by_app) == ["quickbooks", "stripe", "google_sheets", "slack"]
+        assert by_app["quickbooks"]["app_name"] == "QuickBooks Online"
+        assert by_app["quickbooks"]["status"] == "active"
+        assert by_app["quickbooks"]["last_sync"] == "2025-11-02T00:00:00+00:00"
+        assert by_app["slack"]["status"] == "disconnected"
+
+
+class TestStatusCache:
+    """Tests for caching the connection status response"""
+
+    @pytest.mark.asyncio
+    async def test_status_is_cached_until_invalidated(self):
+        """Should compute once per TTL and recompute after a connection change"""
+        payload = {"connections": [], "summary": {}}
+        with patch.object(integrations, "_compute_connection_status", return_value=payload) as compute:
+            first = await integrations._cached_connection_status()
+            second = await integrations._cached_connection_status()
+            await integrations._invalidate_status()
+            await integrations._cached_connection_status()
+
+        assert first is second
+        assert compute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_serves_last_good_status(self):
+        """Should fall back to the last good payload, flagged stale"""
+        payload = {"connections": [], "summary": {}}
+        with patch.object(integrations, "_compute_connection_status", return_value=payload):
+            await integrations._cached_connection_status()
+        await integrations._invalidate_status()
+
+        with patch.object(integrations, "_compute_connection_status", side_effect=RuntimeError("down")):
+            result = await integrations._cached_connection_status()
+
+        assert result == {**payload, "is_stale": True}
+
+
+class RecordingTable:
+    """Records PostgREST write calls made against a table"""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def upsert(self, row, on_conflict=None):
+        self.calls.append(("upsert", row, on_conflict))
+        return self
+
+    def execute(self):
+        return type("Response", (), {"data": []})()
+
+
+class TestCallback:
+    """Tests for the Pipedream callback"""
+
+    @pytest.mark.asyncio
+    async def test_connect_is_a_single_upsert(self, monkeypatch):
+        """Should store a connect event with one upsert keyed on app"""
+        calls = []
+        client = type("Client", (), {"table": lambda self, name: RecordingTable(calls)})()
+        monkeypatch.setattr(integrations, "get_supabase_client", AsyncMock(return_value=client))
+
+        request = AsyncMock()
+        request.body.return_value = orjson.dumps({"event": "connect", "app": "slack", "account_id": "apn_1"})
+        result = await integrations.handle_callback(request, _admin=True)
+
+        assert result == {"status": "ok", "event": "connect"}
+        [(method, row, on_conflict)] = calls
+        assert (method, on_conflict) == ("upsert", "app")
+        assert row["account_id"] == "apn_1"
+        assert row["connected_at"] == row["updated_at"]
+        assert "user_id" not in row
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "external_user_id, expected",
+        [
+            ("eqho-admin", None),
+            ("5f0c6a8e-3b52-4d8e-9a8f-2f4b7f1d9c11", "5f0c6a8e-3b52-4d8e-9a8f-2f4b7f1d9c11"),
+        ],
+    )
+    async def test_connect_only_stores_uuid_user_id(self, monkeypatch, external_user_id, expected):
+        """Should leave user_id out of the upsert unless external_user_id is a UUID"""
+        calls = []
+        client = type("Client", (), {"table": lambda self, name: RecordingTable(calls)})()
+        monkeypatch.setattr(integrations, "get_supabase_client", AsyncMock(return_value=client))
+
+        request = AsyncMock()
+        request.body.return_value = orjson.dumps(
+            {"event": "connect", "app": "slack", "account_id": "apn_1", "external_user_id": external_user_id}
+        )
+        await integrations.handle_callback(request, _admin=True)
+
+        [(_, row, _)] = calls
+        assert row.get("user_id") == expected
+
+
+class FakeSelect:
+    """Select/update builder returning fixed rows, with an optional delay"""
+
+    def __init__(self, rows, calls, delay=0.0):
+        self.rows = rows
+        self.calls = calls
+        self.delay = delay
+
+    def select(self, *args):
+        return self
+
+    def update(self, row):
+        self.calls.append(("update", row))
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def limit(self, size):
+        return self
+
+    def execute(self):
+        time.sleep(self.delay)
+        return type("Response", (), {"data": self.rows})()
+
+
+class TestConcurrentPipedreamCalls:
+    """Tests for overlapping Supabase and Pipedream calls"""
+
+    @pytest.fixture
+    def pipedream(self, monkeypatch):
+        monkeypatch.setattr(integrations.pipedream_service, "project_id", "proj")
+        monkeypatch.setattr(integrations.pipedream_service, "client_id", "id")
+        monkeypatch.setattr(integrations.pipedream_service, "client_secret", "secret")
+        return integrations.pipedream_service
+
+    @pytest.mark.asyncio
+    async def test_disconnect_overlaps_delete_and_update(self, monkeypatch, pipedream):
+        """Should delete from Pipedream while the database update runs"""
+        calls = []
+        rows = [{"id": "row-1", "account_id": "apn_1"}]
+        client = type("Client", (), {"table": lambda self, name: FakeSelect(rows, calls, delay=0.1)})()
+        monkeypatch.setattr(integrations, "get_supabase_client", AsyncMock(return_value=client))
+
+        async def delete_account(account_id):
+            await asyncio.sleep(0.1)
+            return True
+
+        monkeypatch.setattr(pipedream, "delete_account", delete_account)
+
+        start = time.perf_counter()
+        result = await integrations.disconnect_app("slack", conn=rows[0])
+        elapsed = time.perf_counter() - start
+
+        assert result["success"] is True
+        assert calls[0][1]["status"] == "disconnected"
+        # max(delete, update) rather than their sum
+        assert elapsed < 0.15
+
+    @pytest.mark.asyncio
+    async def test_status_verifies_known_account_during_read(self, monkeypatch, pipedream):
+        """Should verify the last known account while reading the database"""
+        rows = [{"status": "active", "account_id": "apn_1", "connected_at": None}]
+        client = type("Client", (), {"table": lambda self, name: FakeSelect(rows, [], delay=0.1)})()
+        monkeypatch.setattr(integrations, "get_supabase_client", AsyncMock(return_value=client))
+        monkeypatch.setattr(integrations, "_last_status", {"connections": [{"app": "slack", "account_id": "apn_1"}]})
+
+        async def get_account(account_id):
+            await asyncio.sleep(0.1)
+            return {"id": account_id}
+
+        monkeypatch.setattr(pipedream, "get_account", get_account)
+
+        start = time.perf_counter()
+        result = await integrations.get_connection_status("slack")
+        elapsed = time.perf_counter() - start
+
+        assert result["pipedream_verified"] is True
+        assert elapsed < 0.15
+
+    @pytest.mark.asyncio
+    async def test_status_reverifies_when_account_changed(self, monkeypatch, pipedream):
+        """Should verify the stored account when it differs from the last known one"""
+        rows = [{"status": "active", "account_id": "apn_2", "connected_at": None}]
+        client = type("Client", (), {"table": lambda self, name: FakeSelect(rows, [])})()
+        monkeypatch.setattr(integrations, "get_supabase_client", AsyncMock(return_value=client))
+        monkeypatch.setattr(integrations, "_last_status", {"connections": [{"app": "slack", "account_id": "apn_1"}]})
+        verified = []
+
+        async def get_account(account_id):
+            verified.append(account_id)
+            return {"id": account_id}
+
+        monkeypatch.setattr(pipedream, "get_account", get_account)
+
+        result = await integrations.get_connection_status("slack")
+
+        assert result["pipedream_verified"] is True
+        assert verified[-1] == "apn_2"
+
+
+class TestRequireSupported:
+    """Tests for the supported-app guard"""
+
+    def test_rejects_unknown_app_with_supported_list(self):
+        """Should raise a 400 naming the supported apps"""
+        with pytest.raises(HTTPException) as exc:
+            integrations._require_supported("hubspot")
+
+        assert exc.value.status_code == 400
+        assert exc.value.detail == (
+            "Unsupported app: hubspot. Supported: ['quickbooks', 'stripe', 'google_sheets', 'slack']"
+        )
+        integrations._require_supported("slack")
+
+
+class TestConnectionDependency:
+    """Tests for resolving the path app and its connection row"""
+
+    @pytest.fixture
+    def admin(self):
+        app.dependency_overrides[integrations.verify_admin] = lambda: True
+        yield
+        app.dependency_overrides.clear()
+
+    def test_unsupported_app_is_rejected_before_reading(self, admin, monkeypatch):
+        """Should 400 on an unknown app without touching Supabase"""
+        get_client = AsyncMock()
+        monkeypatch.setattr(integrations, "get_supabase_client", get_client)
+
+        response = TestClient(app).delete("/api/v1/integrations/hubspot")
+
+        assert response.status_code == 400
+        get_client.assert_not_called()
+
+    def test_sync_requires_active_connection(self, admin, monkeypatch):
+        """Should 400 when the stored connection isn't active"""
+        rows = [{"id": "row-1", "status": "disconnected", "account_id": "apn_1", "metadata": {}}]
+        client = type("Client", (), {"table": lambda self, name: FakeSelect(rows, [])})()
+        monkeypatch.setattr(integrations, "get_supabase_client", AsyncMock(return_value=client))
+
+        response = TestClient(app).post("/api/v1/integrations/sync/slack")
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "slack is not connected. Please connect first."
+
+
+class RpcRecordingClient:
+    def __init__(self):
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return self
+
+    def execute(self):
+        return type("Response", (), {"data": None})()
+
+
+class TestTriggerSync:
+    """Tests for manual syncs"""
+
+    @pytest.mark.asyncio
+    async def test_sync_metadata_is_updated_with_one_rpc(self, monkeypatch):
+        """Should record the sync server-side without rewriting metadata"""
+        client = RpcRecordingClient()
+        monkeypatch.setattr(integrations, "get_supabase_client", AsyncMock(return_value=client))
+        monkeypatch.setattr(integrations, "_sync_app_data", AsyncMock(return_value={"success": True}))
+
+        conn = {"id": "row-1", "status": "active", "account_id": "apn_1"}
+        result = await integrations.trigger_sync("slack", conn=conn)
+
+        [(name, params)] = client.calls
+        assert name == "update_sync_metadata"
+        assert params == {"conn_id": "row-1", "sync_ts": result["timestamp"], "sync_status": "success"}
+
+
+
+class TestPipedreamUnconfigured:
+    """Tests for status reads when Pipedream credentials are missing"""
+
+    @pytest.fixture(autouse=True)
+    def unconfigured(self, monkeypatch):
+        monkeypatch.setattr(integrations.pipedream_service, "project_id", "")
+        get_client = AsyncMock()
+        monkeypatch.setattr(integrations, "get_supabase_client", get_client)
+        monkeypatch.setattr(integrations.db_pool, "pool", FakePool([{"app": "slack", "status": "active"}]))
+        return get_client
+
+    @pytest.mark.asyncio
+    async def test_status_skips_database(self, unconfigured, monkeypatch):
+        """Should report apps as disconnected without reading stored rows"""
+        monkeypatch.setattr(integrations.settings, "STRIPE_SECRET_KEY", "sk_test")
+
+        result = await integrations._cached_connection_status()
+
+        by_app = {c["app"]: c["status"] for c in result["connections"]}
+        assert by_app == {"quickbooks": "disconnected", "stripe": "active",
+                          "google_sheets": "disconnected", "slack": "disconnected"}
+        unconfigured.assert_not_called()
+        assert integrations.db_pool.pool.args is None
+
+    @pytest.mark.asyncio
+    async def test_single_app_status_skips_database(self, unconfigured):
+        """Should return the precomputed disconnected status"""
+        result = await integrations.get_connection_status("slack")
+
+        assert result == {"app": "slack", "app_name": "Slack", "status": "disconnected",
+                          "account_id": None, "connected_at": None}
+        unconfigured.assert_not_called()
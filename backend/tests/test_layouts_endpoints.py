@@ -0,0 +1,206 @@
+"""
+Tests for card layout endpoints
+"""
+
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1 import layouts
+from app.main import app
+from app.services.auth import get_current_user, require_admin
+from app.services.db_pool import db_pool
+from app.services.supabase_service import get_supabase_client
+
+
+class FakePool:
+    def __init__(self, row):
+        self.row = row
+        self.queries = []
+
+    async def fetchrow(self, sql):
+        self.queries.append(sql)
+        return self.row
+
+
+class UnusedClient:
+    def table(self, name):
+        raise AssertionError("Supabase should not be queried when the pool has the row")
+
+
+class ThreadRecordingClient:
+    """Returns one layout row and records which thread ran each query"""
+
+    def __init__(self, row):
+        self.row = row
+        self.threads = []
+
+    def table(self, name):
+        return self
+
+    def select(self, *args):
+        return self
+
+    def limit(self, size):
+        return self
+
+    def execute(self):
+        self.threads.append(threading.get_ident())
+        return type("Response", (), {"data": [self.row]})()
+
+
+@pytest.fixture(autouse=True)
+def clear_layout_cache():
+    layouts._layout_cache._cache.clear()
+    yield
+    layouts._layout_cache._cache.clear()
+
+
+@pytest.fixture
+def overrides():
+    app.dependency_overrides[get_current_user] = lambda: "user-1"
+    app.dependency_overrides[get_supabase_client] = lambda: UnusedClient()
+    yield
+    app.dependency_overrides.clear()
+
+
+class TestGetLayout:
+    """Tests for GET /api/v1/layouts"""
+
+    def test_reads_layout_over_pool(self, overrides, monkeypatch):
+        """Should serve the layout from the asyncpg pool without touching Supabase"""
+        now = datetime(2025, 11, 1, tzinfo=timezone.utc)
+        pool = FakePool({
+            "id": "layout-1",
+            "layout_data": [{"card": "mrr"}],
+            "updated_by": None,
+            "updated_at": now,
+            "created_at": now,
+        })
+        monkeypatch.setattr(db_pool, "pool", pool)
+
+        response = TestClient(app).get("/api/v1/layouts")
+
+        assert response.status_code == 200
+        assert response.json()["layout_data"] == [{"card": "mrr"}]
+        assert len(pool.queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_supabase_read_runs_off_event_loop(self):
+        """Should run the blocking Supabase query in a worker thread"""
+        client = ThreadRecordingClient({
+            "id": "layout-1",
+            "layout_data": [],
+            "updated_by": None,
+            "updated_at": "2025-11-01T00:00:00+00:00",
+            "created_at": "2025-11-01T00:00:00+00:00",
+        })
+
+        layout = await layouts.get_layout(user_id="user-1", client=client)
+
+        assert layout.id == "layout-1"
+        assert client.threads and client.threads[0] != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_layout_is_cached_between_reads(self, monkeypatch):
+        """Should serve repeat reads from the in-process cache"""
+        now = datetime(2025, 11, 1, tzinfo=timezone.utc)
+        pool = FakePool({"id": "layout-1", "layout_data": [], "updated_by": None,
+                         "updated_at": now, "created_at": now})
+        monkeypatch.setattr(db_pool, "pool", pool)
+
+        first = await layouts.get_layout(user_id="user-1", client=UnusedClient())
+        second = await layouts.get_layout(user_id="user-1", client=UnusedClient())
+
+        assert first is second
+        assert len(pool.queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_default_layout_created_idempotently(self):
+        """Should create the default with ON CONFLICT DO NOTHING and read back if it lost the race"""
+        row = {"id": "layout-1", "layout_data": [], "updated_by": None,
+               "updated_at": "2025-11-01T00:00:00+00:00", "created_at": "2025-11-01T00:00:00+00:00"}
+        client = DefaultLayoutClient(row)
+
+        layout = await layouts.get_layout(user_id="user-1", client=client)
+
+        assert layout.id == "layout-1"
+        assert client.upserts == [({"layout_data": []}, "singleton", True)]
+        assert client.selects == 2
+
+
+class DefaultLayoutClient:
+    """Empty table whose default-row upsert loses a race to another writer"""
+
+    def __init__(self, row):
+        self.row = row
+        self.selects = 0
+        self.upserts = []
+        self._op = None
+
+    def table(self, name):
+        return self
+
+    def select(self, *args):
+        self._op = "select"
+        return self
+
+    def limit(self, size):
+        return self
+
+    def upsert(self, row, on_conflict=None, ignore_duplicates=False):
+        self._op = "upsert"
+        self.upserts.append((row, on_conflict, ignore_duplicates))
+        return self
+
+    def execute(self):
+        if self._op == "select":
+            self.selects += 1
+            # Empty on the first read; the other writer's row on the read back
+            data = [self.row] if self.selects > 1 else []
+        else:
+            data = []
+        return type("Response", (), {"data": data})()
+
+
+class UpsertRecordingClient:
+    """Records upserts and echoes the row back like PostgREST"""
+
+    def __init__(self):
+        self.calls = []
+
+    def table(self, name):
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.calls.append((row, on_conflict))
+        self.row = row
+        return self
+
+    def execute(self):
+        now = "2025-11-01T00:00:00+00:00"
+        data = [{"id": "layout-1", **self.row, "updated_at": now, "created_at": now}]
+        return type("Response", (), {"data": data})()
+
+
+class TestUpdateLayout:
+    """Tests for PUT /api/v1/layouts"""
+
+    def test_saves_with_single_upsert(self):
+        """Should write the layout with one upsert on the singleton row"""
+        client = UpsertRecordingClient()
+        app.dependency_overrides[require_admin] = lambda: "admin-1"
+        app.dependency_overrides[get_supabase_client] = lambda: client
+        try:
+            response = TestClient(app).put("/api/v1/layouts", json={"layout_data": [{"card": "arr"}]})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["layout_data"] == [{"card": "arr"}]
+        [(row, on_conflict)] = client.calls
+        assert on_conflict == "singleton"
+        assert row == {"singleton": True, "layout_data": [{"card": "arr"}], "updated_by": "admin-1"}
+        assert layouts._layout_cache._cache["layout"]["value"].layout_data == [{"card": "arr"}]
@@ -19,8 +19,10 @@ class TestMetricsCacheService:
     def reset_client(self):
         """Reset the client before each test"""
         MetricsCacheService.client = None
+        MetricsCacheService._latest_cache._cache.clear()
         yield
         MetricsCacheService.client = None
+        MetricsCacheService._latest_cache._cache.clear()
 
     @pytest.fixture
     def mock_supabase_client(self):
@@ -95,6 +97,39 @@ class TestMetricsCacheService:
         # Assert
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_get_latest_metrics_cached_until_save(self, mock_supabase_client):
+        """Test latest reads are served in process until the metric is saved again"""
+        select = mock_supabase_client.table.return_value.select.return_value.eq.return_value.order.return_value.limit.return_value
+        select.execute.return_value.data = []
+        mock_supabase_client.table.return_value.insert.return_value.execute.return_value.data = [{"id": "test-id"}]
+        MetricsCacheService.client = mock_supabase_client
+
+        assert await MetricsCacheService.get_latest_metrics("test_metric") is None
+        assert await MetricsCacheService.get_latest_metrics("test_metric") is None
+        assert select.execute.call_count == 1
+
+        await MetricsCacheService.save_metrics("test_metric", {"value": 1}, source="test")
+        await MetricsCacheService.get_latest_metrics("test_metric")
+        assert select.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_startup_prewarm_fills_latest_cache(self, mock_supabase_client):
+        """Test the startup pre-warm caches fallbacks and tolerates failing steps"""
+        from app import main
+
+        select = mock_supabase_client.table.return_value.select.return_value.eq.return_value.order.return_value.limit.return_value
+        select.execute.return_value.data = []
+        MetricsCacheService.client = mock_supabase_client
+
+        with patch.object(main.quickbooks_service, "warm_up", side_effect=RuntimeError("boom")), \
+                patch.object(main.settings, "STRIPE_SECRET_KEY", ""):
+            await main.prewarm_caches()
+
+        assert select.execute.call_count == len(main.PREWARM_METRIC_TYPES)
+        await MetricsCacheService.get_latest_metrics("quickbooks_pl")
+        assert select.execute.call_count == len(main.PREWARM_METRIC_TYPES)
+
     @pytest.mark.asyncio
     async def test_get_all_latest_metrics(self, mock_supabase_client):
         """Test retrieving all cached metrics"""
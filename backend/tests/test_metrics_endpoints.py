@@ -0,0 +1,91 @@
+"""
+Tests for metrics endpoints
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1 import metrics
+from app.main import app
+from app.services.cache_service import cache_service
+from app.services.metrics_calculator import MetricsCalculator
+
+TOWPILOT_METRICS = {
+    "customer_metrics": {"towpilot_customers": 3},
+    "revenue_metrics": {"arr": 1200, "mrr": 100, "acv": 400},
+    "ltv_metrics": {"average_ltv": 14100, "ltv_cac_ratio": 17.0, "cac_payback_months": 2.0},
+    "cac_metrics": {"total_cac": 831},
+    "financial_metrics": {"gross_margin_percentage": 55.8},
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics_cache():
+    cache_service.memory_cache._cache.clear()
+    yield
+    cache_service.memory_cache._cache.clear()
+
+
+class TestMetricsCache:
+    """Tests for sharing TowPilot metrics between endpoints"""
+
+    def test_summary_and_towpilot_share_one_computation(self, monkeypatch):
+        """Should compute once and report MISS then HIT"""
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return TOWPILOT_METRICS
+
+        monkeypatch.setattr(MetricsCalculator, "_compute_towpilot_metrics", compute)
+        client = TestClient(app)
+
+        summary = client.get("/api/v1/metrics/summary")
+        towpilot = client.get("/api/v1/metrics/towpilot")
+
+        assert summary.headers["X-Cache"] == "MISS"
+        assert summary.json()["towpilot"]["arr"] == 1200
+        assert towpilot.headers["X-Cache"] == "HIT"
+        assert towpilot.json() == TOWPILOT_METRICS
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_coalesce(self):
+        """Should run the calculator once for concurrent cache misses"""
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return TOWPILOT_METRICS
+
+        results = await asyncio.gather(
+            *(cache_service.get_metrics("towpilot", compute) for _ in range(5))
+        )
+
+        assert len(calls) == 1
+        assert all(r is TOWPILOT_METRICS for r in results)
+
+
+class TestSummaryProjection:
+    """Tests for projecting TowPilot metrics to the summary"""
+
+    def test_projects_all_fields_once_per_metrics_dict(self):
+        """Should map every summary field and reuse the result for the same dict"""
+        summary = metrics._summarize(TOWPILOT_METRICS)
+
+        assert summary == {
+            "customers": 3,
+            "arr": 1200,
+            "mrr": 100,
+            "acv": 400,
+            "ltv": 14100,
+            "cac": 831,
+            "ltv_cac_ratio": 17.0,
+            "cac_payback_months": 2.0,
+            "gross_margin": 55.8,
+        }
+        assert metrics._summarize(TOWPILOT_METRICS) is summary
+        assert metrics._summarize(dict(TOWPILOT_METRICS)) is not summary
@@ -0,0 +1,79 @@
+"""
+Tests for the Pipedream Connect service
+"""
+
+import httpx
+import pytest
+
+from app.services import pipedream_service as pipedream_module
+from app.services.pipedream_service import PipedreamService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Configured service whose HTTP calls go to a recording mock transport"""
+    requests = []
+    state = {"reject_token": None}
+
+    def handler(request):
+        requests.append((request.method, request.url.path))
+        if request.url.path == "/v1/oauth/token":
+            return httpx.Response(200, json={"access_token": f"token-{len(requests)}", "expires_in": 3600})
+        if request.headers["Authorization"] == f"Bearer {state['reject_token']}":
+            return httpx.Response(401)
+        if request.url.path.endswith("/credentials"):
+            return httpx.Response(200, json={"access_token": "qb"})
+        if request.method == "DELETE":
+            return httpx.Response(204)
+        return httpx.Response(200, json={"id": request.url.path.rsplit("/", 1)[-1], "name": "QBO"})
+
+    transport = httpx.MockTransport(handler)
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(pipedream_module.httpx, "AsyncClient", lambda **kw: real_client(transport=transport))
+
+    svc = PipedreamService()
+    svc.project_id, svc.client_id, svc.client_secret = "proj", "id", "secret"
+    svc.requests = requests
+    svc.state = state
+    return svc
+
+
+class TestAccountCache:
+    """Tests for caching account and credential lookups"""
+
+    @pytest.mark.asyncio
+    async def test_account_lookups_are_cached(self, service):
+        """Should call Pipedream once per account and reuse the result"""
+        first = await service.get_account("apn_1")
+        second = await service.get_account("apn_1")
+        await service.get_account_credentials("apn_1")
+        await service.get_account_credentials("apn_1")
+
+        assert first == second == {"id": "apn_1", "name": "QBO"}
+        account_calls = [r for r in service.requests if r[1].startswith("/v1/connect/accounts")]
+        assert account_calls == [
+            ("GET", "/v1/connect/accounts/apn_1"),
+            ("GET", "/v1/connect/accounts/apn_1/credentials"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates_cached_account(self, service):
+        """Should look the account up again after it is deleted"""
+        await service.get_account("apn_1")
+        await service.delete_account("apn_1")
+        await service.get_account("apn_1")
+
+        gets = [r for r in service.requests if r == ("GET", "/v1/connect/accounts/apn_1")]
+        assert len(gets) == 2
+
+    @pytest.mark.asyncio
+    async def test_rejected_token_is_refreshed_and_retried(self, service):
+        """Should fetch a new OAuth token and retry once on 401"""
+        await service._get_oauth_token()
+        service.state["reject_token"] = service._access_token
+
+        account = await service.get_account("apn_1")
+
+        assert account == {"id": "apn_1", "name": "QBO"}
+        token_calls = [r for r in service.requests if r[1] == "/v1/oauth/token"]
+        assert len(token_calls) == 2
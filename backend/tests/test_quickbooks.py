@@ -4,11 +4,13 @@ Tests for QuickBooks service and endpoints
 Tests OAuth flow, P&L fetching, and caching behavior.
 """
 
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
+from app.api.v1 import quickbooks
 from app.main import app
 from app.services.quickbooks_service import QuickBooksService
 
@@ -46,6 +48,33 @@ class TestQuickBooksService:
 
         assert "sandbox" not in service.api_base_url
 
+    @pytest.mark.asyncio
+    async def test_warm_up_loads_stored_tokens(self):
+        """Test warm_up loads cached OAuth tokens once configured"""
+        service = QuickBooksService()
+        service.client_id = "test_id"
+        service.client_secret = "test_secret"
+        service.redirect_uri = "http://localhost/callback"
+
+        cached = {"data": {"access_token": "access", "refresh_token": "refresh"}, "fetched_at": "2025-11-25T12:00:00+00:00"}
+        with patch(
+            "app.services.quickbooks_service.MetricsCacheService.get_latest_metrics",
+            new_callable=AsyncMock,
+            return_value=cached,
+        ) as mock_lookup, patch.object(QuickBooksService, "pipedream_configured", False):
+            assert await service.warm_up() is True
+            assert await service.warm_up() is True
+
+        assert service._access_token == "access"
+        assert mock_lookup.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_warm_up_skips_when_not_configured(self):
+        """Test warm_up does nothing without QuickBooks or Pipedream config"""
+        service = QuickBooksService()
+        with patch.object(QuickBooksService, "pipedream_configured", False):
+            assert await service.warm_up() is False
+
     def test_parse_pl_report_empty(self):
         """Test P&L parsing handles empty data"""
         service = QuickBooksService()
@@ -69,6 +98,42 @@ class TestQuickBooksEndpoints:
         assert "is_connected" in data
         assert "timestamp" in data
 
+    def test_quickbooks_status_caches_token_lookup(self):
+        """Test repeated status pings reuse the token lookup"""
+        quickbooks._status_cache._cache.clear()
+        with patch(
+            "app.api.v1.quickbooks.MetricsCacheService.get_latest_metrics",
+            new_callable=AsyncMock,
+            return_value={"fetched_at": "2025-11-25T12:00:00+00:00"},
+        ) as mock_lookup:
+            first = client.get("/api/v1/quickbooks/status").json()
+            second = client.get("/api/v1/quickbooks/status").json()
+        quickbooks._status_cache._cache.clear()
+
+        assert mock_lookup.await_count == 1
+        assert first["is_connected"] is second["is_connected"] is True
+        assert second["last_token_refresh"] == "2025-11-25T12:00:00+00:00"
+
+    def test_auth_callback_invalidates_status(self):
+        """Test a completed OAuth callback drops the cached token status"""
+        quickbooks._status_cache._cache.clear()
+        with patch(
+            "app.api.v1.quickbooks.MetricsCacheService.get_latest_metrics",
+            new_callable=AsyncMock,
+            side_effect=[None, {"fetched_at": "2025-11-25T12:00:00+00:00"}],
+        ), patch(
+            "app.api.v1.quickbooks.quickbooks_service.exchange_code_for_tokens",
+            new_callable=AsyncMock,
+        ):
+            before = client.get("/api/v1/quickbooks/status").json()
+            callback = client.get("/api/v1/quickbooks/auth/callback?code=abc")
+            after = client.get("/api/v1/quickbooks/status").json()
+        quickbooks._status_cache._cache.clear()
+
+        assert callback.status_code == 200
+        assert before["is_connected"] is False
+        assert after["is_connected"] is True
+
     def test_quickbooks_auth_url_not_configured(self):
         """Test auth URL endpoint returns error when not configured"""
         response = client.get("/api/v1/quickbooks/auth/url")
@@ -89,6 +154,19 @@ class TestQuickBooksEndpoints:
             # Should indicate it's cached or have a warning
             assert "warning" in data or "is_cached" in data
 
+    def test_profit_loss_serializes_live_report(self):
+        """Test live P&L is returned through orjson with an ISO timestamp"""
+        with patch("app.api.v1.quickbooks.quickbooks_service") as mock_service:
+            mock_service.is_configured = True
+            mock_service.get_profit_and_loss = AsyncMock(return_value={"total_revenue": 635390.5})
+            response = client.get("/api/v1/quickbooks/profit-loss")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["data"] == {"total_revenue": 635390.5}
+        assert data["is_cached"] is False
+        assert datetime.fromisoformat(data["timestamp"])
+
     def test_quickbooks_payroll_not_configured(self):
         """Test payroll endpoint returns error when not configured"""
         response = client.get("/api/v1/quickbooks/payroll")
@@ -2,18 +2,29 @@
 Tests for Revenue Projections API endpoints
 """
 
+import asyncio
 from datetime import datetime
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
+from app.api.v1.revenue_projections import _bucket_by_invoice_month, _summarize_sub
 from app.main import app
-
+from app.services import stripe_cache
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def clear_subscription_cache():
+    stripe_cache._cache._cache.clear()
+    stripe_cache._last_subs = None
+    yield
+    stripe_cache._cache._cache.clear()
+    stripe_cache._last_subs = None
+
+
 def create_mock_subscription(
     customer_id: str,
     sub_id: str,
@@ -52,7 +63,7 @@ class TestCurrentMonthProjections:
     async def test_empty_subscriptions(self):
         """Should return zeros when no subscriptions"""
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -76,7 +87,7 @@ class TestCurrentMonthProjections:
         ]
         
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -97,7 +108,7 @@ class TestCurrentMonthProjections:
         ]
         
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -111,7 +122,7 @@ class TestCurrentMonthProjections:
     async def test_weekly_breakdown_present(self):
         """Should include weekly breakdown"""
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -123,6 +134,27 @@ class TestCurrentMonthProjections:
             assert isinstance(data["collection_by_week"], list)
 
 
+    def test_weekly_breakdown_groups_by_day(self):
+        """Should group invoices into 7-day weeks and omit empty weeks"""
+        now = datetime.now()
+        mock_subs = [
+            create_mock_subscription("cus_1", "sub_1", 10000, period_end_ts=int(datetime(now.year, now.month, 1).timestamp())),
+            create_mock_subscription("cus_2", "sub_2", 20000, period_end_ts=int(datetime(now.year, now.month, 7, 12).timestamp())),
+            create_mock_subscription("cus_3", "sub_3", 30000, period_end_ts=int(datetime(now.year, now.month, 22).timestamp())),
+        ]
+
+        with patch(
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
+            new_callable=AsyncMock,
+            return_value=mock_subs,
+        ):
+            weeks = client.get("/api/v1/revenue/current-month").json()["collection_by_week"]
+
+        assert [w["week_number"] for w in weeks] == [1, 4]
+        assert weeks[0]["customers"] == ["cus_1", "cus_2"]
+        assert weeks[0]["total_amount"] == 300.0
+        assert weeks[1]["date_range"] == f"{now.month}/22-28"
+
 class TestMonthDetail:
     """Tests for /revenue/month-detail endpoint"""
 
@@ -130,7 +162,7 @@ class TestMonthDetail:
     async def test_default_to_current_month(self):
         """Should default to current month when no params"""
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -146,7 +178,7 @@ class TestMonthDetail:
     async def test_specific_month(self):
         """Should return data for specific month"""
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -169,7 +201,7 @@ class TestMonthDetail:
     async def test_month_zero_defaults_to_current(self):
         """Month=0 is falsy, so it defaults to current month"""
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -191,7 +223,7 @@ class TestMonthDetail:
         ]
         
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -211,7 +243,7 @@ class TestQuarterlyForecast:
     async def test_default_four_quarters(self):
         """Should return 4 quarters by default"""
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -226,7 +258,7 @@ class TestQuarterlyForecast:
     async def test_custom_quarter_count(self):
         """Should return requested number of quarters"""
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -247,7 +279,7 @@ class TestQuarterlyForecast:
     async def test_quarter_structure(self):
         """Should return proper quarter structure"""
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -271,7 +303,7 @@ class TestAnnualForecast:
     async def test_returns_twelve_months(self):
         """Should return 12 months of projections"""
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -286,7 +318,7 @@ class TestAnnualForecast:
     async def test_monthly_structure(self):
         """Should return proper monthly structure"""
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -313,7 +345,7 @@ class TestAnnualForecast:
         ]
         
         with patch(
-            "app.api.v1.revenue_projections.StripeService.get_active_subscriptions",
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
             new_callable=AsyncMock,
             return_value=mock_subs,
         ):
@@ -325,3 +357,160 @@ class TestAnnualForecast:
             total_projected = sum(m["projected_invoice_amount"] for m in data["monthly_projections"])
             # May or may not have matches depending on timing
             assert isinstance(total_projected, float)
+
+
+class TestProjectionBundle:
+    """Tests for /revenue/bundle endpoint"""
+
+    def test_bundle_matches_individual_endpoints(self):
+        """Should return the three projections from a single Stripe fetch"""
+        now = datetime.now()
+        mock_subs = [
+            create_mock_subscription("cus_1", "sub_1", 99900, period_end_ts=int(datetime(now.year, now.month, 20).timestamp())),
+        ]
+
+        with patch(
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
+            new_callable=AsyncMock,
+            return_value=mock_subs,
+        ) as mock_fetch:
+            response = client.get("/api/v1/revenue/bundle?quarters=2")
+            quarterly = client.get("/api/v1/revenue/quarterly-forecast?quarters=2").json()
+            annual = client.get("/api/v1/revenue/annual-forecast").json()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert mock_fetch.await_count == 1
+        assert set(data) == {"current", "quarterly", "annual"}
+        assert data["current"]["summary"]["customers_invoicing"] == 1
+        assert data["quarterly"]["quarters"] == quarterly["quarters"]
+        assert data["annual"]["monthly_projections"] == annual["monthly_projections"]
+
+class TestSubscriptionBuckets:
+    """Tests for the shared per-subscription summary and month buckets"""
+
+    def test_summarize_sums_priced_items(self):
+        """Should sum amount and MRR across items and skip $0 items"""
+        sub = create_mock_subscription("cus_1", "sub_1", 120000, "year")
+        sub["items"].append({"price": "price_free", "amount": 0, "interval": "month", "interval_count": 1})
+        sub["items"].append({"price": "price_addon", "amount": 5000, "interval": "month", "interval_count": 1})
+
+        billing = _summarize_sub(sub)
+
+        assert billing.amount == 1250.0
+        assert billing.mrr == 150.0
+        assert billing.interval == "month"
+
+    def test_buckets_by_invoice_month(self):
+        """Should index each subscription once under its invoice (year, month), in invoice order"""
+        jan = int(datetime(2026, 1, 10).timestamp())
+        feb = int(datetime(2026, 2, 10).timestamp())
+        subs = [
+            create_mock_subscription("cus_1", "sub_1", 10000, period_end_ts=jan),
+            create_mock_subscription("cus_3", "sub_3", 30000, period_end_ts=feb + 3600),
+            create_mock_subscription("cus_2", "sub_2", 20000, period_end_ts=feb),
+        ]
+
+        buckets = _bucket_by_invoice_month(subs)
+
+        assert [b.sub["id"] for b in buckets[(2026, 1)]] == ["sub_1"]
+        assert [b.sub["id"] for b in buckets[(2026, 2)]] == ["sub_2", "sub_3"]
+        assert (2026, 3) not in buckets
+
+
+    def test_buckets_reused_for_same_snapshot(self):
+        """Should reuse buckets for the same list and rebuild for a new one"""
+        subs = [create_mock_subscription("cus_1", "sub_1", 10000)]
+
+        first = _bucket_by_invoice_month(subs)
+
+        assert _bucket_by_invoice_month(subs) is first
+        assert _bucket_by_invoice_month(list(subs)) is not first
+
+class TestSubscriptionCache:
+    """Tests for the shared active-subscription cache"""
+
+    def test_endpoints_share_one_fetch(self):
+        """Should fetch from Stripe once across projection endpoints"""
+        with patch(
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
+            new_callable=AsyncMock,
+            return_value=[create_mock_subscription("cus_1", "sub_1", 50000)],
+        ) as mock_fetch:
+            for path in ("current-month", "month-detail", "quarterly-forecast", "annual-forecast"):
+                response = client.get(f"/api/v1/revenue/{path}")
+                assert response.status_code == 200
+                assert "warning" not in response.json()
+
+        assert mock_fetch.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_coalesce(self):
+        """Should make a single Stripe call for concurrent cold-cache callers"""
+        calls = 0
+
+        async def slow_fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return []
+
+        with patch("app.services.stripe_cache.StripeService.get_active_subscriptions", side_effect=slow_fetch):
+            results = await asyncio.gather(*(stripe_cache.get_subs_cached() for _ in range(5)))
+
+        assert calls == 1
+        assert all(r.subscriptions == [] for r in results)
+
+    def test_serves_stale_snapshot_on_failure(self):
+        """Should return the last good subscriptions with a warning when Stripe fails"""
+        subs = [create_mock_subscription("cus_1", "sub_1", 50000)]
+        with patch(
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
+            new_callable=AsyncMock,
+            return_value=subs,
+        ):
+            fresh = client.get("/api/v1/revenue/current-month").json()
+
+        stripe_cache._cache._cache.clear()
+        with patch(
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
+            new_callable=AsyncMock,
+            side_effect=RuntimeError("stripe down"),
+        ):
+            stale = client.get("/api/v1/revenue/current-month").json()
+
+        assert stale["summary"] == fresh["summary"]
+        assert stale["warning"] == stripe_cache.STALE_WARNING
+
+    @pytest.mark.asyncio
+    async def test_failure_without_snapshot_raises(self):
+        """Should propagate the error when there is no snapshot to fall back on"""
+        with patch(
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
+            new_callable=AsyncMock,
+            side_effect=RuntimeError("stripe down"),
+        ), pytest.raises(RuntimeError):
+            await stripe_cache.get_subs_cached()
+
+
+class TestResponseCompression:
+    """Tests for gzip on projection responses"""
+
+    def test_large_projection_is_gzipped(self):
+        """Should gzip responses over the minimum size when the client accepts it"""
+        with patch(
+            "app.services.stripe_cache.StripeService.get_active_subscriptions",
+            new_callable=AsyncMock,
+            return_value=[],
+        ):
+            response = client.get("/api/v1/revenue/annual-forecast", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["monthly_projections"]) == 12
+
+    def test_small_response_not_compressed(self):
+        """Should leave responses under the minimum size uncompressed"""
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
@@ -4,12 +4,15 @@ Tests for Stripe API endpoints
 Tests the Stripe data endpoints including caching functionality.
 """
 
+import threading
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.services import stripe_service
 from app.services.stripe_service import StripeService
 
 client = TestClient(app)
@@ -228,6 +231,70 @@ class TestStripePagination:
         # Should only return cus_1's subscription
         assert len(subscriptions) == 1
         assert subscriptions[0]["customer"] == "cus_1"
+        # Everything fit on the first page, so no creation windows were listed
+        mock_list.assert_called_once_with(status="active", limit=stripe_service.DEFAULT_PAGE_SIZE)
+
+    @pytest.mark.asyncio
+    @patch('stripe.Subscription.list')
+    async def test_listing_switches_to_windows_when_has_more(self, mock_list):
+        """Should page creation windows only when the first page isn't everything"""
+        first_page = MagicMock(data=[], has_more=True)
+        empty = MagicMock(data=[], has_more=False)
+        mock_list.side_effect = lambda **params: empty if "created" in params else first_page
+
+        await StripeService.get_active_subscriptions()
+
+        assert mock_list.call_count == 1 + stripe_service.SUBSCRIPTION_WINDOWS
+
+    @pytest.mark.asyncio
+    @patch('stripe.Subscription.list')
+    async def test_concurrent_listing_covers_windows_once(self, mock_list):
+        """Should page disjoint creation windows and return each subscription once"""
+        # One subscription in each of the three newest windows, one in the open-ended tail
+        now = int(time.time())
+        created = [now - 3600 - i * stripe_service.SUBSCRIPTION_WINDOW_DAYS * 86400 for i in range(3)]
+        created.append(created[-1] - 10 * 365 * 86400)
+        subs = [
+            MagicMock(
+                id=f"sub_{i}",
+                customer=f"cus_{i}",
+                status="active",
+                current_period_start=ts,
+                current_period_end=ts,
+                __getitem__=lambda self, key: MagicMock(data=[]) if key == "items" else None,
+            )
+            for i, ts in enumerate(created)
+        ]
+
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def list_window(**params):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+
+            window = params["created"]
+            response = MagicMock()
+            response.data = [
+                s for s, ts in zip(subs, created)
+                if ts >= window.get("gte", float("-inf")) and ts < window.get("lt", float("inf"))
+            ]
+            response.has_more = False
+            return response
+
+        mock_list.side_effect = list_window
+
+        subscriptions = await StripeService.get_active_subscriptions_concurrent(concurrency=3)
+
+        assert [s["id"] for s in subscriptions] == ["sub_0", "sub_1", "sub_2", "sub_3"]
+        assert mock_list.call_count == stripe_service.SUBSCRIPTION_WINDOWS
+        assert peak <= 3
 
 
 class TestStripeIntegration: